@@ -0,0 +1,42 @@
+import zlib
+from config import BODY_COLLECTION_NAME
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Champs volumineux stockés hors du document de métadonnées
+BODY_FIELDS = ('content', 'images', 'table_of_contents')
+
+
+def decompress_content(data, compression):
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("Contenu compressé avec zstd mais le module zstandard n'est pas installé")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    else:
+        data = zlib.decompress(data)
+    return data.decode('utf-8')
+
+
+class ArticleBodyStore:
+    """Lecture du corps des articles (contenu compressé, images, sommaire), stocké par URL."""
+
+    def __init__(self, db):
+        self.bodies = db[BODY_COLLECTION_NAME]
+
+    def get_body(self, url):
+        document = self.bodies.find_one({'url': url}, {'_id': 0})
+        if not document:
+            return {}
+        body = {k: v for k, v in document.items() if k in BODY_FIELDS}
+        if isinstance(body.get('content'), bytes):
+            body['content'] = decompress_content(bytes(body['content']), document.get('compression', 'zlib'))
+        return body
+
+    def load_article(self, article):
+        """Complète un document de métadonnées avec son corps (les anciens articles l'intègrent déjà)."""
+        if article.get('url'):
+            article.update(self.get_body(article['url']))
+        return article
@@ -4,3 +4,13 @@ DB_NAME = "blogdumoderateur"
 DEBUG = True
 HOST = "0.0.0.0"
 PORT = 5000
+BODY_COLLECTION_NAME = "article_bodies"  # Contenu compressé, images et sommaire des articles
+INGEST_STATE_COLLECTION_NAME = "ingest_state"  # Compteur de génération incrémenté par le scraper
+SEARCH_PAGE_SIZE = 20       # Articles par page de résultats
+SEARCH_MAX_PAGE_SIZE = 100  # Taille de page maximale demandée par l'API (paramètre limit)
+SEARCH_MAX_RELEVANCE_OFFSET = 1000  # Rang maximal atteint par la pagination du tri par pertinence
+METADATA_CACHE_TTL = 300                 # Durée de vie (s) des filtres et statistiques en cache
+METADATA_GENERATION_CHECK_INTERVAL = 5   # Intervalle (s) entre deux lectures du compteur de génération
+METADATA_CHANGE_STREAM = True            # Invalidation par flux de modifications (replica set uniquement)
+FACET_LIMIT = 20                         # Valeurs par facette affichées avec les résultats d'une recherche
+METADATA_CACHE_MAX_ENTRIES = 1000        # Entrées en cache (facettes des recherches comprises)
@@ -0,0 +1,83 @@
+import threading
+import time
+from config import METADATA_CACHE_TTL, METADATA_GENERATION_CHECK_INTERVAL, METADATA_CACHE_MAX_ENTRIES
+
+
+class MetadataCache:
+    """
+    Cache en mémoire des données agrégées sur la collection (valeurs des
+    filtres, statistiques, facettes), communes à toutes les requêtes.
+
+    Chaque valeur expire après `ttl` secondes. Le cache est aussi vidé dès
+    que la collection change :
+    - compteur de génération incrémenté par le scraper à chaque écriture
+      (document `key` de la collection `state`), relu au plus toutes les
+      `check_interval` secondes ;
+    - ou flux de modifications MongoDB (watch), si le serveur le permet.
+    Une erreur de chargement n'est pas mise en cache ; au-delà de
+    `max_entries` valeurs, les plus anciennes sont retirées.
+    """
+
+    def __init__(self, state=None, key='articles', ttl=METADATA_CACHE_TTL,
+                 check_interval=METADATA_GENERATION_CHECK_INTERVAL, max_entries=METADATA_CACHE_MAX_ENTRIES):
+        self.state = state
+        self.key = key
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.max_entries = max_entries
+        self._values = {}
+        self._lock = threading.Lock()
+        self._generation = None
+        self._checked_at = float('-inf')
+
+    def get(self, name, loader):
+        """Valeur en cache, ou résultat de `loader()` mis en cache."""
+        self._check_generation()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._values.get(name)
+        if entry and entry[1] > now:
+            return entry[0]
+        value = loader()
+        with self._lock:
+            self._values.pop(name, None)
+            while len(self._values) >= self.max_entries:
+                del self._values[next(iter(self._values))]
+            self._values[name] = (value, now + self.ttl)
+        return value
+
+    def invalidate(self):
+        """Vide le cache : les prochaines lectures interrogent la base."""
+        with self._lock:
+            self._values.clear()
+
+    def _check_generation(self):
+        now = time.monotonic()
+        if self.state is None or now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        try:
+            document = self.state.find_one({'_id': self.key}, {'generation': 1})
+        except Exception as e:
+            print(f"Erreur lecture du compteur de génération: {e}")
+            return
+        generation = document.get('generation') if document else None
+        if generation != self._generation:
+            self._generation = generation
+            self.invalidate()
+
+    def watch(self, collection):
+        """
+        Vide le cache à chaque modification de `collection` (flux de
+        modifications, réservé aux replica sets). Sans flux disponible, le
+        compteur de génération et le TTL restent seuls en place.
+        """
+        def run():
+            try:
+                with collection.watch() as stream:
+                    for _ in stream:
+                        self.invalidate()
+            except Exception as e:
+                print(f"Flux de modifications indisponible, invalidation par compteur de génération: {e}")
+
+        threading.Thread(target=run, name='metadata-cache-watch', daemon=True).start()
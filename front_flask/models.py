@@ -1,7 +1,150 @@
-from pymongo import MongoClient
+import base64
+import json
+import os
+import re
+import sys
+from pymongo import MongoClient, DESCENDING
+from pymongo.errors import OperationFailure
 from datetime import datetime
 from bson import ObjectId
-from config import MONGO_URI, DB_NAME
+from bson.errors import InvalidId
+from config import (
+    MONGO_URI, DB_NAME, INGEST_STATE_COLLECTION_NAME, SEARCH_PAGE_SIZE, SEARCH_MAX_PAGE_SIZE,
+    SEARCH_MAX_RELEVANCE_OFFSET, METADATA_CHANGE_STREAM, FACET_LIMIT
+)
+from article_store import ArticleBodyStore
+from metadata_cache import MetadataCache
+
+# Clés des filtres : module partagé avec le scraper (ajouté en fin de chemin
+# de recherche pour ne pas masquer les modules du front de même nom)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scrapper'))
+from filter_keys import normalize_key  # noqa: E402
+
+# Champs affichés dans les résultats (page HTML et API) : ni corps ni empreintes
+RESULT_PROJECTION = {
+    field: 1 for field in
+    ('title', 'author', 'publication_date', 'category', 'subcategory', 'summary', 'thumbnail', 'url')
+}
+
+# Ordre des résultats : du plus récent au plus ancien, _id départageant les dates identiques
+RESULT_SORT = [('publication_date', DESCENDING), ('_id', DESCENDING)]
+
+# Recherche plein texte (index texte pondéré titre / résumé / contenu) : tri par pertinence
+TEXT_SCORE = {'$meta': 'textScore'}
+RELEVANCE_SORT = [('score', TEXT_SCORE), ('_id', DESCENDING)]
+
+# Code d'erreur MongoDB d'une requête $text sans index texte (IndexNotFound)
+INDEX_NOT_FOUND_ERROR = 27
+
+
+class TextSearchUnavailable(Exception):
+    """Recherche plein texte impossible : l'index texte n'existe pas (encore) sur la collection."""
+
+    def __init__(self):
+        super().__init__(
+            "Recherche plein texte indisponible : l'index texte des articles n'existe pas "
+            "(il est créé par le scraper, ex. python index_manager.py)"
+        )
+
+
+def has_text_index(collection):
+    """Vrai si la collection porte un index texte (créé par index_manager du scraper)."""
+    return any('textIndexVersion' in index for index in collection.list_indexes())
+
+
+# Facettes : champ de chaque facette, en valeurs multiples pour les sous-catégories
+# (tableau `subcategories`, ou chaîne `subcategory` découpée pour les anciens articles)
+FACET_FIELDS = {
+    'category': '$category',
+    'subcategory': {'$ifNull': ['$subcategories', {'$split': ['$subcategory', ', ']}]},
+    'author': '$author',
+}
+
+
+def facet_pipeline(field_value, limit=None):
+    """Étapes d'une facette : compte des articles par valeur non vide, du plus fréquent au plus rare."""
+    stages = [
+        {'$project': {'value': field_value}},
+        {'$unwind': '$value'},
+        {'$match': {'value': {'$nin': [None, '']}}},
+        {'$group': {'_id': '$value', 'count': {'$sum': 1}}},
+        {'$sort': {'count': DESCENDING, '_id': 1}},
+    ]
+    if limit:
+        stages.append({'$limit': limit})
+    return stages
+
+
+def encode_cursor(position):
+    """Jeton opaque de pagination à partir d'une position (liste de valeurs JSON)."""
+    data = json.dumps(position)
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Position contenue dans un jeton ; ValueError si le jeton est invalide."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Curseur de pagination invalide: {token}") from e
+    if not isinstance(position, list):
+        raise ValueError(f"Curseur de pagination invalide: {token}")
+    return position
+
+
+def date_position(token):
+    """Position (date, ObjectId) d'un jeton du tri par date."""
+    try:
+        publication_date, article_id = decode_cursor(token)
+        return publication_date, ObjectId(article_id)
+    except (ValueError, TypeError, InvalidId) as e:
+        raise ValueError(f"Curseur de pagination invalide: {token}") from e
+
+
+def relevance_offset(token):
+    """
+    Rang de reprise d'un jeton du tri par pertinence. Le score n'étant pas
+    un champ filtrable, la reprise se fait par rang, borné à
+    SEARCH_MAX_RELEVANCE_OFFSET.
+    """
+    position = decode_cursor(token)
+    if len(position) != 2 or position[0] != 'rank' or not isinstance(position[1], int) \
+            or not 0 <= position[1] <= SEARCH_MAX_RELEVANCE_OFFSET:
+        raise ValueError(f"Curseur de pagination invalide: {token}")
+    return position[1]
+
+
+def after_position(publication_date, article_id):
+    """
+    Filtre des articles situés après (date, _id) dans l'ordre RESULT_SORT.
+    Les articles sans date sont classés en dernier (null précède les chaînes
+    dans l'ordre croissant de MongoDB).
+    """
+    if publication_date is None:
+        return {'publication_date': None, '_id': {'$lt': article_id}}
+    return {'$or': [
+        {'publication_date': {'$lt': publication_date}},
+        {'publication_date': publication_date, '_id': {'$lt': article_id}},
+        {'publication_date': None}
+    ]}
+
+
+def clamp_page_size(value, default=SEARCH_PAGE_SIZE):
+    """Taille de page demandée, bornée entre 1 et SEARCH_MAX_PAGE_SIZE."""
+    try:
+        page_size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(page_size, SEARCH_MAX_PAGE_SIZE))
+
+def clamp_facet_limit(value, default=None):
+    """Nombre de valeurs par facette demandé, borné entre 1 et FACET_LIMIT."""
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, FACET_LIMIT))
 
 class ArticleSearcher:
     def __init__(self, mongo_uri=MONGO_URI, db_name=DB_NAME):
@@ -10,32 +153,42 @@ class ArticleSearcher:
             self.client = MongoClient(mongo_uri)
             self.db = self.client[db_name]
             self.collection = self.db.articles
+            self.bodies = ArticleBodyStore(self.db)
+            # Filtres et statistiques de la page d'accueil, invalidés à chaque écriture du scraper
+            self.metadata = MetadataCache(self.db[INGEST_STATE_COLLECTION_NAME], self.collection.name)
+            if METADATA_CHANGE_STREAM:
+                self.metadata.watch(self.collection)
+            # Index de pagination et index texte (critère q) : créés par le scraper
+            # (index_manager.ensure_indexes), l'index texte est seulement vérifié ici
+            self.text_index_ready = has_text_index(self.collection)
+            if not self.text_index_ready:
+                print(f"Attention: {TextSearchUnavailable()}")
             print(f"Connexion MongoDB établie - Base: {db_name}")
         except Exception as e:
             print(f"Erreur connexion MongoDB: {e}")
             raise
 
-    def search_articles(self, filters):
-        """
-        Recherche des articles selon les critères fournis
-        """
+    def build_query(self, filters):
+        """Requête MongoDB correspondant aux critères de recherche"""
         query = {}
         
-        # Recherche par titre (sous-chaîne)
+        # Recherche plein texte
+        if filters.get('q'):
+            query['$text'] = {'$search': filters['q']}
+        
+        # Recherche par titre (sous-chaîne, saisie échappée)
         if filters.get('title'):
-            query['title'] = {'$regex': filters['title'], '$options': 'i'}
+            query['title'] = {'$regex': re.escape(filters['title']), '$options': 'i'}
         
-        # Recherche par auteur
+        # Listes déroulantes : égalité exacte sur les clés normalisées (index composés avec la date)
         if filters.get('author'):
-            query['author'] = {'$regex': filters['author'], '$options': 'i'}
+            query['author_key'] = normalize_key(filters['author'])
         
-        # Recherche par catégorie
         if filters.get('category'):
-            query['category'] = {'$regex': filters['category'], '$options': 'i'}
+            query['category_key'] = normalize_key(filters['category'])
         
-        # Recherche par sous-catégorie
         if filters.get('subcategory'):
-            query['subcategory'] = {'$regex': filters['subcategory'], '$options': 'i'}
+            query['subcategory_keys'] = normalize_key(filters['subcategory'])
         
         # Recherche par plage de dates
         date_query = {}
@@ -56,56 +209,133 @@ class ArticleSearcher:
         if date_query:
             query['publication_date'] = date_query
         
+        return query
+
+    def search_articles(self, filters, cursor=None, page_size=SEARCH_PAGE_SIZE, sort=None):
+        """
+        Recherche des articles selon les critères fournis, une page à la fois.
+
+        Pagination par position (keyset) : `cursor` est le jeton renvoyé avec
+        la page précédente, la page suivante reprend juste après son dernier
+        article au lieu de sauter les N premiers résultats. Seuls les champs
+        affichés sont lus. Renvoie (articles, jeton de la page suivante ou None).
+        ValueError si le jeton est invalide.
+
+        Le critère `q` interroge l'index texte (mots du titre, du résumé et du
+        début du contenu, analysés en français) ; les résultats sont alors
+        classés par pertinence, sauf si `sort` vaut 'date'.
+        TextSearchUnavailable si l'index texte n'existe pas.
+        """
+        if filters.get('q'):
+            self.require_text_index()
+        query = self.build_query(filters)
+        relevance = bool(filters.get('q')) and sort != 'date'
+        
+        offset = 0
+        if cursor and relevance:
+            offset = relevance_offset(cursor)
+        elif cursor:
+            position = after_position(*date_position(cursor))
+            query = {'$and': [query, position]} if query else position
+
         # Exécution de la requête
         try:
-            cursor = self.collection.find(query).sort('publication_date', -1)
-            articles = list(cursor)
-            
-            # Conversion des ObjectId en string pour JSON
-            for article in articles:
-                article['_id'] = str(article['_id'])
-            
-            return articles
+            # Un article de plus que la page : indique s'il existe une page suivante
+            if relevance:
+                projection = dict(RESULT_PROJECTION, score=TEXT_SCORE)
+                results = self.collection.find(query, projection).sort(RELEVANCE_SORT).skip(offset)
+            else:
+                results = self.collection.find(query, RESULT_PROJECTION).sort(RESULT_SORT)
+            articles = list(results.limit(page_size + 1))
+        except OperationFailure as e:
+            if e.code == INDEX_NOT_FOUND_ERROR:
+                # Index supprimé depuis la dernière vérification
+                self.text_index_ready = False
+                raise TextSearchUnavailable() from e
+            print(f"Erreur lors de la recherche: {e}")
+            return [], None
         except Exception as e:
             print(f"Erreur lors de la recherche: {e}")
-            return []
+            return [], None
+
+        next_cursor = None
+        if len(articles) > page_size:
+            articles = articles[:page_size]
+            if not relevance:
+                last = articles[-1]
+                next_cursor = encode_cursor([last.get('publication_date'), str(last['_id'])])
+            elif offset + page_size <= SEARCH_MAX_RELEVANCE_OFFSET:
+                next_cursor = encode_cursor(['rank', offset + page_size])
+
+        # Conversion des ObjectId en string pour JSON
+        for article in articles:
+            article['_id'] = str(article['_id'])
+
+        return articles, next_cursor
+
+    def require_text_index(self):
+        """Vérifie (de nouveau tant qu'il manque) la présence de l'index texte."""
+        if not self.text_index_ready:
+            self.text_index_ready = has_text_index(self.collection)
+        if not self.text_index_ready:
+            raise TextSearchUnavailable()
+
+    def get_article(self, article_id):
+        """Article complet (métadonnées et corps) pour la page de détail"""
+        article = self.collection.find_one({'_id': ObjectId(article_id)})
+        if article:
+            article['_id'] = str(article['_id'])
+            # Copie du contenu réservée à l'index texte : le corps est lu dans article_bodies
+            article.pop('search_text', None)
+            self.bodies.load_article(article)
+        return article
 
     def get_unique_values(self, field):
-        """Récupère les valeurs uniques d'un champ pour les filtres"""
+        """Récupère les valeurs uniques d'un champ pour les filtres (en cache)"""
         try:
-            values = self.collection.distinct(field)
-            return [v for v in values if v and v.strip()]
+            return self.metadata.get(('distinct', field), lambda: [
+                v for v in self.collection.distinct(field) if v and v.strip()
+            ])
         except Exception as e:
             print(f"Erreur récupération valeurs uniques pour {field}: {e}")
             return []
 
     def get_unique_subcategories(self):
-        """Récupère les sous-catégories uniques en séparant celles qui contiennent des virgules"""
+        """Sous-catégories uniques (une par élément de la liste de chaque article), triées"""
+        return sorted(facet['value'] for facet in self.get_facets()['subcategory'])
+
+    def get_facets(self, filters=None, limit=None):
+        """
+        Nombre d'articles par catégorie, sous-catégorie et auteur, en une
+        agrégation ($facet). Sans critère : toute la collection ; sinon les
+        articles correspondant à la recherche. Les résultats sont en cache
+        (invalidé à chaque écriture du scraper). `limit` borne le nombre de
+        valeurs par facette.
+        """
+        query = self.build_query(filters or {})
+        key = ('facets', json.dumps(query, sort_keys=True, default=str), limit)
         try:
-            # Récupération de toutes les sous-catégories
-            subcategories_raw = self.collection.distinct('subcategory')
-            unique_subcategories = set()
-            
-            for subcategory in subcategories_raw:
-                if subcategory and subcategory.strip():
-                    if ',' in subcategory:
-                        # Séparer par virgule et nettoyer chaque élément
-                        parts = [part.strip() for part in subcategory.split(',')]
-                        unique_subcategories.update(parts)
-                    else:
-                        unique_subcategories.add(subcategory.strip())
-            
-            # Retourner une liste triée en supprimant les valeurs vides
-            return sorted([sub for sub in unique_subcategories if sub])
-            
+            return self.metadata.get(key, lambda: self._load_facets(query, limit))
         except Exception as e:
-            print(f"Erreur récupération sous-catégories uniques: {e}")
-            return []
+            print(f"Erreur calcul des facettes: {e}")
+            return {name: [] for name in FACET_FIELDS}
+
+    def _load_facets(self, query, limit):
+        pipeline = [{'$match': query}] if query else []
+        pipeline.append({'$facet': {
+            name: facet_pipeline(field_value, limit) for name, field_value in FACET_FIELDS.items()
+        }})
+        result = next(self.collection.aggregate(pipeline), {})
+        return {
+            name: [{'value': entry['_id'], 'count': entry['count']} for entry in result.get(name, [])]
+            for name in FACET_FIELDS
+        }
 
     def get_stats(self):
         """Récupère les statistiques de la base"""
         try:
-            total_articles = self.collection.count_documents({})
+            # Nombre d'articles issu des métadonnées de la collection (sans parcours)
+            total_articles = self.metadata.get('total_articles', self.collection.estimated_document_count)
             total_authors = len(self.get_unique_values('author'))
             total_categories = len(self.get_unique_values('category'))
             
@@ -117,3 +347,7 @@ class ArticleSearcher:
         except Exception as e:
             print(f"Erreur récupération statistiques: {e}")
             return {'total_articles': 0, 'total_authors': 0, 'total_categories': 0}
+
+    def invalidate_metadata(self):
+        """Vide le cache des filtres et statistiques (après un import manuel par exemple)"""
+        self.metadata.invalidate()
@@ -1,6 +1,10 @@
 from flask import render_template, request, jsonify
-from bson import ObjectId
 import re
+from models import clamp_page_size, clamp_facet_limit, TextSearchUnavailable
+from config import FACET_LIMIT
+
+# Critères de recherche acceptés par le formulaire et par l'API
+FILTER_FIELDS = ('q', 'title', 'author', 'category', 'subcategory', 'date_start', 'date_end')
 
 def convert_video_links(content):
     """Convertit les liens vidéo en balises HTML video"""
@@ -46,55 +50,71 @@ def process_content(content):
     
     return content
 
+def read_filters(values):
+    """Critères non vides d'un formulaire ou d'une chaîne de requête"""
+    filters = {field: values.get(field, '').strip() for field in FILTER_FIELDS}
+    return {k: v for k, v in filters.items() if v}
+
+def refine_filters(filters, field, value):
+    """Critères d'une recherche restreinte à une valeur de facette"""
+    return dict(filters, **{field: value})
+
+def read_sort(values):
+    """Ordre demandé : 'relevance' (défaut d'une recherche plein texte) ou 'date'"""
+    return 'date' if values.get('sort') == 'date' else 'relevance'
+
 def init_routes(app, searcher):
     """Initialise toutes les routes de l'application"""
     
     app.jinja_env.filters['process_content'] = process_content
+    app.jinja_env.globals['refine_filters'] = refine_filters
     
     @app.route('/')
     def index():
         """Page d'accueil avec formulaire de recherche"""
-        # Récupération des valeurs pour les listes déroulantes
-        authors = searcher.get_unique_values('author')
-        categories = searcher.get_unique_values('category')
-        subcategories = searcher.get_unique_subcategories()
+        # Valeurs des listes déroulantes avec leur nombre d'articles (facettes en cache)
+        facets = searcher.get_facets()
         stats = searcher.get_stats()
         
         return render_template('index.html', 
-                             authors=authors, 
-                             categories=categories,
-                             subcategories=subcategories,
+                             authors=sorted(facets['author'], key=lambda facet: facet['value']), 
+                             categories=sorted(facets['category'], key=lambda facet: facet['value']),
+                             subcategories=sorted(facets['subcategory'], key=lambda facet: facet['value']),
                              stats=stats)
 
-    @app.route('/search', methods=['POST'])
+    @app.route('/search', methods=['GET', 'POST'])
     def search():
-        """Endpoint de recherche"""
-        filters = {
-            'title': request.form.get('title', '').strip(),
-            'author': request.form.get('author', '').strip(),
-            'category': request.form.get('category', '').strip(),
-            'subcategory': request.form.get('subcategory', '').strip(),
-            'date_start': request.form.get('date_start', '').strip(),
-            'date_end': request.form.get('date_end', '').strip()
-        }
+        """Endpoint de recherche (formulaire en POST, pages suivantes en GET)"""
+        filters = read_filters(request.values)
+        sort = read_sort(request.values)
         
-        # Suppression des filtres vides
-        filters = {k: v for k, v in filters.items() if v}
-        
-        articles = searcher.search_articles(filters)
+        error = None
+        try:
+            try:
+                articles, next_cursor = searcher.search_articles(
+                    filters, cursor=request.values.get('cursor'), sort=sort
+                )
+            except ValueError:
+                # Jeton de pagination invalide : retour à la première page
+                articles, next_cursor = searcher.search_articles(filters, sort=sort)
+        except TextSearchUnavailable as e:
+            articles, next_cursor, error = [], None, str(e)
         
         return render_template('results.html', 
                              articles=articles, 
                              filters=filters,
-                             total_results=len(articles))
+                             facets=None if error else searcher.get_facets(filters, limit=FACET_LIMIT),
+                             sort=sort,
+                             total_results=len(articles),
+                             next_cursor=next_cursor,
+                             error=error)
 
     @app.route('/article/<article_id>')
     def article_detail(article_id):
         """Page de détail d'un article"""
         try:
-            article = searcher.collection.find_one({'_id': ObjectId(article_id)})
+            article = searcher.get_article(article_id)
             if article:
-                article['_id'] = str(article['_id'])
                 return render_template('article_detail.html', article=article)
             else:
                 return "Article non trouvé", 404
@@ -103,24 +123,45 @@ def init_routes(app, searcher):
 
     @app.route('/api/search', methods=['GET'])
     def api_search():
-        """API de recherche (format JSON)"""
-        filters = {
-            'title': request.args.get('title', '').strip(),
-            'author': request.args.get('author', '').strip(),
-            'category': request.args.get('category', '').strip(),
-            'subcategory': request.args.get('subcategory', '').strip(),
-            'date_start': request.args.get('date_start', '').strip(),
-            'date_end': request.args.get('date_end', '').strip()
-        }
-        
-        # Suppression des filtres vides
-        filters = {k: v for k, v in filters.items() if v}
+        """
+        API de recherche (format JSON), paginée : `limit` articles par page,
+        `cursor` = valeur de next_cursor renvoyée avec la page précédente.
+        `q` = recherche plein texte, classée par pertinence (score) sauf avec sort=date
+        """
+        filters = read_filters(request.args)
+        sort = read_sort(request.args)
+        page_size = clamp_page_size(request.args.get('limit'))
         
-        articles = searcher.search_articles(filters)
+        try:
+            articles, next_cursor = searcher.search_articles(
+                filters, cursor=request.args.get('cursor'), page_size=page_size, sort=sort
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        except TextSearchUnavailable as e:
+            return jsonify({'success': False, 'error': str(e)}), 503
         
         return jsonify({
             'success': True,
             'total_results': len(articles),
             'filters': filters,
-            'articles': articles
+            'sort': sort if filters.get('q') else 'date',
+            'articles': articles,
+            'next_cursor': next_cursor
+        })
+
+    @app.route('/api/facets', methods=['GET'])
+    def api_facets():
+        """
+        Nombre d'articles par catégorie, sous-catégorie et auteur (format JSON),
+        pour toute la base ou pour les critères de recherche fournis.
+        `limit` = nombre de valeurs par facette (toutes par défaut, FACET_LIMIT au plus)
+        """
+        filters = read_filters(request.args)
+        limit = clamp_facet_limit(request.args.get('limit'))
+        
+        return jsonify({
+            'success': True,
+            'filters': filters,
+            'facets': searcher.get_facets(filters, limit=limit)
         })
@@ -1,7 +1,13 @@
+import os
+import sys
 import pymongo
 from pymongo import MongoClient
 import logging
 
+# Clé normalisée enregistrée par le scraper : module partagé du scraper
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scrapper'))
+from filter_keys import normalize_key
+
 # Configuration du logging pour suivre l'exécution et les erreurs
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -28,9 +34,8 @@ class ArticleFetcher:
     def get_articles_by_category(self, category_name):
 
         # Construction de la requête MongoDB :
-        # - "$regex" pour une recherche insensible à la casse
-        # - "^...$" pour une correspondance exacte (pas de sous-chaîne)
-        query = {"category": {"$regex": f"^{category_name}$", "$options": "i"}}
+        # égalité exacte sur la clé normalisée (insensible à la casse), servie par l'index category_key
+        query = {"category_key": normalize_key(category_name)}
 
         # Exécution de la requête et retour des résultats (sans le champ "_id")
         return list(self.collection.find(query, {"_id": 0}))
@@ -38,8 +43,8 @@ class ArticleFetcher:
     def get_articles_by_subcategory(self, subcategory_name):
 
         # Construction de la requête MongoDB :
-        # - "$regex" pour une recherche insensible à la casse dans le tableau "subcategories"
-        query = {"subcategories": {"$regex": f"^{subcategory_name}$", "$options": "i"}}
+        # égalité exacte sur un élément du tableau des clés normalisées "subcategory_keys" (index multiclé)
+        query = {"subcategory_keys": normalize_key(subcategory_name)}
 
         # Exécution de la requête et retour des résultats (sans le champ "_id")
         return list(self.collection.find(query, {"_id": 0}))
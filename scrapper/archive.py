@@ -0,0 +1,143 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from config import logger, ARCHIVE_DIR, ARCHIVE_MAX_FILE_BYTES
+
+INDEX_NAME = "index.sqlite"
+
+
+def build_record(url, content, fetched_at):
+    """Enregistrement WARC 'resource' (page HTML brute, sans en-têtes HTTP)."""
+    date = datetime.fromtimestamp(fetched_at, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    header = (
+        "WARC/1.0\r\n"
+        "WARC-Type: resource\r\n"
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+        f"WARC-Date: {date}\r\n"
+        f"WARC-Target-URI: {url}\r\n"
+        "Content-Type: text/html\r\n"
+        f"Content-Length: {len(content)}\r\n"
+        "\r\n"
+    )
+    return header.encode('utf-8') + content + b"\r\n\r\n"
+
+
+def parse_record(record):
+    """Renvoie (en-têtes WARC, corps) d'un enregistrement décompressé."""
+    head, _, rest = record.partition(b"\r\n\r\n")
+    headers = {}
+    for line in head.decode('utf-8').split("\r\n")[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip()] = value.strip()
+    length = int(headers.get('Content-Length', len(rest)))
+    return headers, rest[:length]
+
+
+def read_record(directory, file_name, offset, length):
+    """Lit le corps d'un enregistrement à partir de sa position dans l'index."""
+    with open(os.path.join(directory, file_name), 'rb') as f:
+        f.seek(offset)
+        data = f.read(length)
+    return parse_record(gzip.decompress(data))[1]
+
+
+class HtmlArchive:
+    """
+    Archive des pages d'articles téléchargées, pour ré-extraire les données
+    sans nouvelle requête au site.
+
+    Les pages sont ajoutées à des fichiers .warc.gz (un membre gzip par
+    enregistrement, lisible par les outils WARC), jamais réécrits ; un
+    nouveau fichier est ouvert au-delà de `max_bytes`. Un index SQLite
+    associe à chaque URL sa version la plus récente (fichier, position,
+    taille, empreinte) : une page identique à la version archivée n'est pas
+    ajoutée une seconde fois.
+    """
+
+    def __init__(self, directory=ARCHIVE_DIR, max_bytes=ARCHIVE_MAX_FILE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, INDEX_NAME), timeout=30, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS records (
+                url TEXT PRIMARY KEY,
+                file TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+        self._file = None
+        self._file_name = None
+        self.stored = 0
+        self.unchanged = 0
+
+    def _open(self):
+        # Un fichier par processus : plusieurs workers peuvent archiver en parallèle
+        self._file_name = f"pages-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.warc.gz"
+        self._file = open(os.path.join(self.directory, self._file_name), 'ab')
+
+    def store(self, url, content):
+        """Archive le HTML brut d'une page (ignoré s'il est identique à la version archivée)."""
+        digest = hashlib.sha1(content).hexdigest()
+        fetched_at = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT digest FROM records WHERE url = ?", (url,)).fetchone()
+            if row and row[0] == digest:
+                self.unchanged += 1
+                return
+
+            if self._file is None or self._file.tell() >= self.max_bytes:
+                if self._file:
+                    self._file.close()
+                self._open()
+            data = gzip.compress(build_record(url, content, fetched_at))
+            offset = self._file.tell()
+            self._file.write(data)
+            self._file.flush()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO records (url, file, offset, length, digest, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, self._file_name, offset, len(data), digest, fetched_at)
+            )
+            self._conn.commit()
+            self.stored += 1
+
+    def entries(self, since=None):
+        """Entrées de l'index (url, fichier, position, taille), éventuellement archivées depuis `since`."""
+        query = "SELECT url, file, offset, length FROM records"
+        params = ()
+        if since is not None:
+            query += " WHERE fetched_at >= ?"
+            params = (since,)
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY file, offset", params).fetchall()
+
+    def get(self, url):
+        """HTML archivé d'une URL, ou None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file, offset, length FROM records WHERE url = ?", (url,)
+            ).fetchone()
+        return read_record(self.directory, *row) if row else None
+
+    def stats(self):
+        return {'stored': self.stored, 'unchanged': self.unchanged}
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+            self._conn.close()
+        logger.info(f"Archive HTML: {self.stats()}")
@@ -0,0 +1,209 @@
+import zlib
+from bson import Binary
+from pymongo import UpdateOne
+from config import logger, BODY_COLLECTION_NAME, BODY_COMPRESSION, BODY_COMPRESSION_LEVEL, SEARCH_TEXT_MAX_CHARS
+from filter_keys import filter_keys
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Champs volumineux stockés hors du document de métadonnées
+BODY_FIELDS = ('content', 'images', 'table_of_contents')
+
+
+def get_compression(compression=BODY_COMPRESSION):
+    """Algorithme de compression utilisable : 'zstd' se replie sur 'zlib' si zstandard est absent."""
+    if compression == 'zstd' and not ZSTD_AVAILABLE:
+        logger.warning("zstandard n'est pas installé, compression zlib")
+        return 'zlib'
+    return compression
+
+
+def compress_content(content, compression, level=BODY_COMPRESSION_LEVEL):
+    data = content.encode('utf-8')
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return zlib.compress(data, level)
+
+
+def decompress_content(data, compression):
+    if compression == 'zstd':
+        data = zstandard.ZstdDecompressor().decompress(data)
+    else:
+        data = zlib.decompress(data)
+    return data.decode('utf-8')
+
+
+def make_search_text(content, max_chars=SEARCH_TEXT_MAX_CHARS):
+    """
+    Texte du champ `search_text` des métadonnées, couvert par l'index texte
+    (avec le titre et le résumé) : début du contenu en clair, borné pour
+    garder les documents de métadonnées légers.
+    """
+    return (content or "")[:max_chars]
+
+
+def split_article(article_data):
+    """
+    Sépare un article en document de métadonnées (recherche, listes) et corps.
+    Les métadonnées reçoivent le texte indexé pour la recherche plein texte
+    et les clés normalisées des filtres.
+    """
+    metadata = {k: v for k, v in article_data.items() if k not in BODY_FIELDS}
+    body = {k: article_data[k] for k in BODY_FIELDS if k in article_data}
+    if 'content' in article_data:
+        metadata['search_text'] = make_search_text(article_data['content'])
+    metadata.update(filter_keys(article_data))
+    return metadata, body
+
+
+class ArticleStore:
+    """
+    Couche d'accès aux articles stockés en deux collections :
+    - `articles` : métadonnées légères utilisées par la recherche et les listes ;
+    - `article_bodies` : contenu compressé, images et sommaire, clé = URL.
+    Les articles enregistrés avant la séparation (corps intégré au document
+    de métadonnées) restent lisibles.
+    """
+
+    def __init__(self, collection, compression=BODY_COMPRESSION):
+        self.collection = collection
+        self.bodies = collection.database[BODY_COLLECTION_NAME]
+        self.compression = get_compression(compression)
+        self.bodies.create_index([('url', 1)], unique=True)
+
+    def encode_body(self, url, body):
+        document = {'url': url}
+        content = body.get('content')
+        if content is not None:
+            document['content'] = Binary(compress_content(content, self.compression))
+            document['compression'] = self.compression
+            document['content_length'] = len(content)
+        for field in BODY_FIELDS:
+            if field != 'content' and field in body:
+                document[field] = body[field]
+        return document
+
+    @staticmethod
+    def decode_body(document):
+        body = {k: v for k, v in document.items() if k in BODY_FIELDS}
+        if isinstance(body.get('content'), bytes):
+            body['content'] = decompress_content(bytes(body['content']), document.get('compression', 'zlib'))
+        return body
+
+    def body_operation(self, url, body):
+        """Upsert du corps d'un article (pour un bulk_write sur self.bodies)."""
+        return UpdateOne({'url': url}, {'$set': self.encode_body(url, body)}, upsert=True)
+
+    def get_body(self, url):
+        document = self.bodies.find_one({'url': url}, {'_id': 0})
+        return self.decode_body(document) if document else {}
+
+    def get_article(self, query):
+        """Article complet (métadonnées + corps) correspondant à `query`, ou None."""
+        article = self.collection.find_one(query)
+        if article:
+            article.update(self.get_body(article['url']))
+        return article
+
+    def migrate_embedded_bodies(self, batch_size=100):
+        """Déplace le corps des articles encore intégré aux métadonnées vers le stockage séparé."""
+        migrated = 0
+        query = {'content': {'$exists': True}}
+        while True:
+            documents = list(self.collection.find(query, ['url', *BODY_FIELDS]).limit(batch_size))
+            if not documents:
+                break
+            self.bodies.bulk_write(
+                [self.body_operation(doc['url'], split_article(doc)[1]) for doc in documents], ordered=False
+            )
+            self.collection.bulk_write([
+                UpdateOne({'_id': doc['_id']}, {
+                    '$set': {'search_text': make_search_text(doc.get('content'))},
+                    '$unset': {field: "" for field in BODY_FIELDS}
+                })
+                for doc in documents
+            ], ordered=False)
+            migrated += len(documents)
+        logger.info(f"{migrated} corps d'articles déplacés vers {BODY_COLLECTION_NAME}")
+        return migrated
+
+    def backfill_search_text(self, batch_size=100):
+        """Renseigne `search_text` pour les articles enregistrés avant la recherche plein texte."""
+        filled = 0
+        last_id = None
+        while True:
+            query = {'search_text': {'$exists': False}}
+            if last_id is not None:
+                query['_id'] = {'$gt': last_id}
+            documents = list(self.collection.find(query, ['url']).sort('_id', 1).limit(batch_size))
+            if not documents:
+                break
+            last_id = documents[-1]['_id']
+            bodies = {
+                body['url']: self.decode_body(body)
+                for body in self.bodies.find({'url': {'$in': [doc['url'] for doc in documents]}})
+            }
+            self.collection.bulk_write([
+                UpdateOne({'_id': doc['_id']}, {'$set': {
+                    'search_text': make_search_text(bodies.get(doc['url'], {}).get('content'))
+                }})
+                for doc in documents
+            ], ordered=False)
+            filled += len(documents)
+        logger.info(f"{filled} articles complétés pour la recherche plein texte")
+        return filled
+
+    def shrink_search_text(self, max_chars=SEARCH_TEXT_MAX_CHARS, batch_size=1000):
+        """Tronque les `search_text` enregistrés avec une limite plus grande que `max_chars`."""
+        shrunk = 0
+        last_id = None
+        while True:
+            query = {'search_text': {'$exists': True}}
+            if last_id is not None:
+                query['_id'] = {'$gt': last_id}
+            documents = list(self.collection.find(query, ['search_text']).sort('_id', 1).limit(batch_size))
+            if not documents:
+                break
+            last_id = documents[-1]['_id']
+            operations = [
+                UpdateOne({'_id': doc['_id']}, {'$set': {'search_text': doc['search_text'][:max_chars]}})
+                for doc in documents if len(doc['search_text'] or "") > max_chars
+            ]
+            if operations:
+                self.collection.bulk_write(operations, ordered=False)
+            shrunk += len(operations)
+        logger.info(f"{shrunk} textes de recherche ramenés à {max_chars} caractères")
+        return shrunk
+
+    def backfill_filter_keys(self, batch_size=1000):
+        """Renseigne les clés normalisées des filtres pour les articles enregistrés avant leur ajout."""
+        filled = 0
+        fields = ['author', 'category', 'subcategory', 'subcategories']
+        while True:
+            documents = list(self.collection.find({'category_key': {'$exists': False}}, fields).limit(batch_size))
+            if not documents:
+                break
+            self.collection.bulk_write([
+                UpdateOne({'_id': doc['_id']}, {'$set': filter_keys(doc)}) for doc in documents
+            ], ordered=False)
+            filled += len(documents)
+        logger.info(f"{filled} articles complétés avec les clés des filtres")
+        return filled
+
+
+if __name__ == "__main__":
+    # Migration des articles existants : stockage séparé du corps, texte de recherche, clés des filtres
+    from mongo_utils import get_mongo_connection
+    client, collection = get_mongo_connection()
+    try:
+        store = ArticleStore(collection)
+        store.migrate_embedded_bodies()
+        store.backfill_search_text()
+        store.shrink_search_text()
+        store.backfill_filter_keys()
+    finally:
+        client.close()
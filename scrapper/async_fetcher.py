@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from config import USER_AGENT, MAX_CONCURRENCY, PER_HOST_CONCURRENCY, REQUEST_TIMEOUT
+from http_client import fetch_url
+
+
+class AsyncFetcher:
+    """
+    Moteur de récupération concurrente basé sur asyncio.
+
+    Les requêtes HTTP sont exécutées via requests dans un pool de threads
+    (une session par thread), tandis qu'asyncio orchestre la concurrence :
+    un sémaphore global et un sémaphore par hôte. Le débit est régulé par
+    le limiteur partagé (rate_limiter), consulté avant chaque requête.
+    """
+
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, per_host_concurrency=PER_HOST_CONCURRENCY,
+                 rate_limiter=None, timeout=REQUEST_TIMEOUT, cache=None):
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+        self.cache = cache
+
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._local = threading.local()
+        self._loop = None
+        self._global_semaphore = None
+        self._host_semaphores = {}
+
+    def _get_session(self):
+        # Une session requests par thread du pool (requests.Session n'est pas thread-safe)
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({'User-Agent': USER_AGENT})
+            self._local.session = session
+        return session
+
+    def _fetch_blocking(self, url, skip_unchanged=False, stop_marker=None):
+        return fetch_url(self._get_session(), url, limiter=self.rate_limiter, timeout=self.timeout,
+                         cache=self.cache, skip_unchanged=skip_unchanged, stop_marker=stop_marker)
+
+    def _host_semaphore(self, url):
+        host = urlparse(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return self._host_semaphores[host]
+
+    async def fetch(self, url, skip_unchanged=False, stop_marker=None):
+        """Récupère le contenu brut d'une URL en respectant les limites de concurrence."""
+        async with self._global_semaphore:
+            async with self._host_semaphore(url):
+                loop = asyncio.get_running_loop()
+                content = await loop.run_in_executor(
+                    self._executor, self._fetch_blocking, url, skip_unchanged, stop_marker
+                )
+                return url, content
+
+    def _ensure_loop(self):
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._global_semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._loop
+
+    def fetch_many(self, urls, skip_unchanged=False, stop_marker=None):
+        """
+        Générateur synchrone : lance la récupération de toutes les URLs et
+        renvoie les couples (url, contenu) au fur et à mesure qu'ils sont terminés.
+        """
+        loop = self._ensure_loop()
+        pending = {loop.create_task(self.fetch(url, skip_unchanged, stop_marker)) for url in urls}
+        try:
+            while pending:
+                done, pending = loop.run_until_complete(
+                    asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                )
+                for task in done:
+                    yield task.result()
+        finally:
+            # Annulation des requêtes restantes si le consommateur s'arrête en cours de route
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+
+    def fetch_one(self, url, skip_unchanged=False, stop_marker=None):
+        """Récupère une seule URL (utilisé pour les pages de catégories)."""
+        loop = self._ensure_loop()
+        _, content = loop.run_until_complete(self.fetch(url, skip_unchanged, stop_marker))
+        return content
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        if self._loop is not None:
+            self._loop.close()
+            self._loop = None
@@ -0,0 +1,385 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from urllib.parse import urlparse
+
+import requests
+from bs4 import BeautifulSoup, Comment
+from config import BASE_URL, USER_AGENT
+from http_client import fetch_url
+from parsing import make_soup
+from extractors import (
+    extract_title,
+    extract_thumbnail,
+    extract_categories,
+    extract_table_of_contents,
+    extract_summary,
+    extract_date,
+    extract_author,
+    extract_article_content,
+    extract_images
+)
+from extraction_engine import extract_single_pass
+from scraper import extract_article_data, parse_article_html, extract_listing_urls
+
+# Corpus de pages enregistrées : article_*.html (pages d'article) et
+# category_*.html (pages de liste d'une catégorie). Les pages réelles du site
+# s'y ajoutent avec --record-article / --record-category (allégées par
+# trim_page) ; hors enregistrement, le banc d'essai ne fait aucune requête réseau.
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_fixtures')
+BASELINE_PATH = os.path.join(FIXTURES_DIR, 'baseline.json')
+
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.25   # Régression si une mesure dépasse la référence de plus de 25 %
+NOISE_FLOOR = 0.0005       # Écarts inférieurs à 0,5 ms ignorés (bruit de mesure)
+
+# Extracteurs de référence, dans l'ordre d'extract_all (extract_article_content
+# nettoie la zone de contenu avant extract_images)
+ARTICLE_EXTRACTORS = [
+    ('title', extract_title),
+    ('thumbnail', extract_thumbnail),
+    ('categories', extract_categories),
+    ('table_of_contents', extract_table_of_contents),
+    ('summary', extract_summary),
+    ('date', extract_date),
+    ('author', extract_author),
+    ('content', extract_article_content),
+    ('images', extract_images),
+]
+
+
+# --- Génération du corpus synthétique
+
+def _article_page(title, body, tags=('Réseaux sociaux', 'Facebook')):
+    tag_items = ''.join(f'<li><a class="post-tags" href="#">{tag}</a></li>' for tag in tags)
+    return (
+        '<html><head><meta name="description" content="Description de test">'
+        '<meta property="og:image" content="/uploads/thumbnail.jpg">'
+        '<meta property="article:published_time" content="2024-03-01T10:00:00+00:00"></head>'
+        '<body><header><nav>' + '<a href="/">menu</a>' * 40 + '</nav></header>'
+        f'<main><article><h1 class="entry-title">{title}</h1>'
+        '<div class="post-thumbnail"><img src="/uploads/thumbnail.jpg" width="800"></div>'
+        '<div class="summary-section"><ul class="summary-inner">'
+        '<li><a href="#partie-1">Première partie</a></li><li><a href="#partie-2">Deuxième partie</a></li>'
+        '</ul></div>'
+        '<span class="entry-author">Par Jean Dupont</span><time datetime="2024-03-01T10:00:00">1 mars 2024</time>'
+        f'<div class="entry-content">{body}<aside>Publicité</aside><script>var tracking = 1;</script>'
+        '<a class="btn" href="/formations/">Formation</a></div>'
+        f'<div id="section-meta"><ul class="tags-list">{tag_items}</ul></div>'
+        '</article></main><footer>' + '<a href="/">lien</a>' * 40 + '</footer></body></html>'
+    )
+
+
+def _paragraph(rng, words=40):
+    vocabulary = ['réseau', 'données', 'marketing', 'contenu', 'audience', 'plateforme',
+                  'intelligence', 'artificielle', 'stratégie', 'utilisateurs', 'croissance', 'outil']
+    return ' '.join(rng.choice(vocabulary) for _ in range(words))
+
+
+def _figure(i, srcset=False):
+    sources = f' srcset="/uploads/img{i}-300.jpg 300w, /uploads/img{i}-1024.jpg 1024w"' if srcset else ''
+    return (
+        f'<figure><a href="/uploads/img{i}.png"><img src="/uploads/img{i}-600.jpg"{sources} '
+        f'alt="Image {i}" width="600" height="400"></a><figcaption>Légende {i}</figcaption></figure>'
+    )
+
+
+def build_fixtures(seed=42):
+    """Construit le corpus synthétique (pages ordinaires et pathologiques) : {nom de fichier: HTML}."""
+    rng = random.Random(seed)
+    fixtures = {}
+
+    body = ''.join(
+        f'<h2 id="partie-{i}">Partie {i}</h2><p>{_paragraph(rng)}</p><p>{_paragraph(rng)}</p>'
+        f'<ul><li>{_paragraph(rng, 6)}</li><li>{_paragraph(rng, 6)}</li></ul>'
+        for i in range(1, 6)
+    ) + _figure(1) + '<blockquote>Une citation marquante</blockquote>'
+    fixtures['article_standard.html'] = _article_page("Article standard", body)
+
+    # Article très long : plusieurs milliers de blocs de texte
+    body = ''.join(
+        (f'<h2>Section {i}</h2>' if i % 20 == 0 else '') + f'<p>{_paragraph(rng, 40)}</p>'
+        + (f'<ul><li>{_paragraph(rng, 8)}</li><li>{_paragraph(rng, 8)}</li></ul>' if i % 7 == 0 else '')
+        for i in range(1500)
+    )
+    fixtures['article_long.html'] = _article_page("Article très long", body)
+
+    # Centaines d'images (figures, srcset, images paresseuses et décoratives)
+    body = ''.join(
+        f'<p>{_paragraph(rng, 15)}</p>' + _figure(i, srcset=i % 3 == 0)
+        + (f'<img data-src="//cdn.example.com/lazy{i}.jpg" title="Image paresseuse {i}">' if i % 5 == 0 else '')
+        + ('<img src="/icons/share.png" width="20">' if i % 4 == 0 else '')
+        for i in range(400)
+    )
+    fixtures['article_many_images.html'] = _article_page("Article avec beaucoup d'images", body)
+
+    # Divs profondément imbriquées (constructeurs de pages, blocs de mise en forme)
+    depth = 200
+    nested = ''.join('<div class="wp-block-group">' for _ in range(depth))
+    nested += ''.join(f'<div>Texte direct dans un bloc imbriqué numéro {i}</div>' for i in range(50))
+    nested += '</div>' * depth
+    body = f'<p>{_paragraph(rng)}</p>' + nested * 5 + f'<p>{_paragraph(rng)}</p>'
+    fixtures['article_deep_nesting.html'] = _article_page("Article profondément imbriqué", body)
+
+    # Pages de liste : ordinaire, puis avec une barre latérale et un menu très chargés
+    cards = ''.join(
+        f'<article class="post-card"><a href="{BASE_URL}/article-{i}/"><img src="/uploads/card{i}.jpg"></a>'
+        f'<h3 class="entry-title"><a href="{BASE_URL}/article-{i}/">Article {i}</a></h3>'
+        f'<p>{_paragraph(rng, 25)}</p></article>'
+        for i in range(24)
+    )
+    fixtures['category_standard.html'] = (
+        f'<html><head><title>Catégorie</title></head><body><header><nav>menu</nav></header>'
+        f'<main>{cards}</main><footer>pied</footer></body></html>'
+    )
+    sidebar = ''.join(f'<li><a href="{BASE_URL}/tag-{i}/">Étiquette {i}</a></li>' for i in range(1000))
+    fixtures['category_heavy_sidebar.html'] = (
+        f'<html><head><title>Catégorie</title><script>{"var a = 1;" * 1000}</script></head><body>'
+        f'<header><nav><ul>{sidebar}</ul></nav></header><main>{cards}</main>'
+        f'<aside><ul>{sidebar}</ul></aside><footer>pied</footer></body></html>'
+    )
+    return fixtures
+
+
+def generate_fixtures(directory=FIXTURES_DIR):
+    os.makedirs(directory, exist_ok=True)
+    for name, html in build_fixtures().items():
+        with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+            f.write(html)
+    print(f"Corpus généré dans {directory}")
+
+
+# --- Enregistrement de pages réelles
+
+# Balises sans effet sur l'extraction (retirées des zones de contenu par les
+# extracteurs) : supprimées des pages enregistrées pour alléger le corpus
+TRIMMED_TAGS = ['script', 'style', 'svg', 'iframe']
+
+
+def trim_page(content):
+    """Allège une page enregistrée : scripts, styles, SVG, iframes et commentaires retirés, structure conservée."""
+    soup = BeautifulSoup(content, 'html.parser')
+    for element in soup.find_all(TRIMMED_TAGS):
+        element.decompose()
+    for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
+        comment.extract()
+    return str(soup).encode('utf-8')
+
+
+def record_fixture(url, kind, directory=FIXTURES_DIR):
+    """
+    Télécharge une page du site et l'ajoute au corpus, allégée par trim_page(),
+    sous le nom <kind>_<dernier segment de l'URL>.html. Renvoie le chemin écrit.
+    """
+    with requests.Session() as session:
+        session.headers.update({'User-Agent': USER_AGENT})
+        content = fetch_url(session, url)
+    if content is None:
+        raise RuntimeError(f"Page indisponible: {url}")
+    slug = urlparse(url).path.strip('/').split('/')[-1] or 'accueil'
+    path = os.path.join(directory, f"{kind}_{slug.replace('-', '_')}.html")
+    with open(path, 'wb') as f:
+        f.write(trim_page(content))
+    print(f"Page enregistrée: {path}")
+    return path
+
+
+def load_fixtures(directory=FIXTURES_DIR):
+    """Charge les pages du corpus : liste de (nom, type, contenu) triée par nom."""
+    fixtures = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith('.html'):
+            continue
+        kind = filename.split('_', 1)[0]
+        if kind not in ('article', 'category'):
+            continue
+        with open(os.path.join(directory, filename), 'rb') as f:
+            fixtures.append((filename[:-len('.html')], kind, f.read()))
+    return fixtures
+
+
+# --- Mesures
+
+def _timed(function, *args):
+    # Le meilleur temps des répétitions est retenu : c'est la mesure la moins sensible au bruit
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+# Champs ajoutés par scrape_article après l'extraction (date, empreinte SimHash du
+# contenu) : exclus de l'empreinte du résultat, qui ne suit que les extracteurs
+NON_EXTRACTED_FIELDS = ('scraped_at', 'simhash', 'simhash_bands')
+
+
+def _result_digest(fields):
+    # Empreinte des données extraites pour détecter un changement de résultat
+    fields = {k: v for k, v in fields.items() if k not in NON_EXTRACTED_FIELDS}
+    return hashlib.sha1(json.dumps(fields, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def _measure_memory(function):
+    """Pic mémoire et mémoire encore allouée (arbre + résultat) pendant l'exécution de `function`."""
+    tracemalloc.start()
+    try:
+        result = function()  # Conservé jusqu'à l'instantané
+        current, peak = tracemalloc.get_traced_memory()
+        blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+    finally:
+        tracemalloc.stop()
+    del result
+    return {'peak_kb': round(peak / 1024, 1), 'alloc_kb': round(current / 1024, 1), 'alloc_blocks': blocks}
+
+
+def benchmark_article(name, content, repeat):
+    url = f"{BASE_URL}/{name}/"
+    timings = {}
+
+    def record(metric, seconds):
+        timings.setdefault(metric, []).append(seconds)
+
+    for _ in range(repeat):
+        # Extracteurs de référence, chacun sur le même arbre (comme extract_all)
+        seconds, soup = _timed(make_soup, content, 'article')
+        record('parse', seconds)
+        for extractor_name, extractor in ARTICLE_EXTRACTORS:
+            record(extractor_name, _timed(extractor, soup)[0])
+
+        record('single_pass', _timed(extract_single_pass, make_soup(content, 'article'))[0])
+
+        # Chemin complet de scrape_article une fois la page téléchargée
+        seconds, article_data = _timed(parse_article_html, url, content)
+        record('scrape_article', seconds)
+
+    result = {metric: min(values) for metric, values in timings.items()}
+    result['articles_per_second'] = 1 / result['scrape_article'] if result['scrape_article'] else 0
+    result.update(_measure_memory(lambda: extract_article_data(url, make_soup(content, 'article'))))
+    result['digest'] = _result_digest(article_data)
+    return result
+
+
+def benchmark_category(name, content, repeat):
+    timings = {'parse': [], 'listing_urls': []}
+    for _ in range(repeat):
+        seconds, soup = _timed(make_soup, content, 'listing')
+        timings['parse'].append(seconds)
+        seconds, urls = _timed(extract_listing_urls, soup)
+        timings['listing_urls'].append(seconds)
+
+    result = {metric: min(values) for metric, values in timings.items()}
+    result.update(_measure_memory(lambda: extract_listing_urls(make_soup(content, 'listing'))))
+    result['digest'] = _result_digest({'urls': urls})
+    return result
+
+
+def run_benchmarks(fixtures, repeat=DEFAULT_REPEAT):
+    results = {}
+    for name, kind, content in fixtures:
+        if kind == 'article':
+            results[name] = benchmark_article(name, content, repeat)
+        else:
+            results[name] = benchmark_category(name, content, repeat)
+    return results
+
+
+# --- Rapport et comparaison avec la référence
+
+TIME_METRICS = ['parse'] + [name for name, _ in ARTICLE_EXTRACTORS] + ['single_pass', 'scrape_article', 'listing_urls']
+MEMORY_METRICS = ['peak_kb', 'alloc_kb']
+
+
+def print_report(results):
+    for name, result in results.items():
+        print(f"\n{name}")
+        for metric in TIME_METRICS:
+            if metric in result:
+                print(f"  {metric:<20} {result[metric] * 1000:10.2f} ms")
+        if 'articles_per_second' in result:
+            print(f"  {'articles/seconde':<20} {result['articles_per_second']:10.1f}")
+        print(f"  {'pic mémoire':<20} {result['peak_kb']:10.1f} Ko")
+        print(f"  {'mémoire allouée':<20} {result['alloc_kb']:10.1f} Ko ({result['alloc_blocks']} blocs)")
+
+    article_times = [r['scrape_article'] for r in results.values() if 'scrape_article' in r]
+    if article_times:
+        print(f"\nDébit global: {len(article_times) / sum(article_times):.1f} articles/seconde")
+
+
+def compare_with_baseline(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Liste des régressions (temps, mémoire ou résultat d'extraction modifié) par rapport à la référence."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if reference.get('digest') and reference['digest'] != result['digest']:
+            regressions.append(f"{name}: résultat d'extraction différent de la référence")
+        for metric in TIME_METRICS + MEMORY_METRICS:
+            if metric not in result or metric not in reference or not reference[metric]:
+                continue
+            ratio = result[metric] / reference[metric]
+            if metric in TIME_METRICS and result[metric] - reference[metric] < NOISE_FLOOR:
+                continue
+            if ratio > 1 + threshold:
+                regressions.append(f"{name}: {metric} x{ratio:.2f} ({reference[metric]:.4g} -> {result[metric]:.4g})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai hors ligne des extracteurs")
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help="Répertoire du corpus de pages")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Fichier de référence (JSON)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Nombre de répétitions par page")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Ralentissement toléré avant d'échouer (0.25 = 25 %%)")
+    parser.add_argument('--save-baseline', action='store_true', help="Enregistre les résultats comme référence")
+    parser.add_argument('--generate', action='store_true', help="Régénère le corpus synthétique")
+    parser.add_argument('--record-article', action='append', default=[], metavar='URL',
+                        help="Enregistre une page d'article réelle dans le corpus (option répétable)")
+    parser.add_argument('--record-category', action='append', default=[], metavar='URL',
+                        help="Enregistre une page de catégorie réelle dans le corpus (option répétable)")
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        generate_fixtures(args.fixtures)
+    for url in args.record_article:
+        record_fixture(url, 'article', args.fixtures)
+    for url in args.record_category:
+        record_fixture(url, 'category', args.fixtures)
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        print(f"Aucune page dans {args.fixtures} (utiliser --generate)")
+        return 1
+
+    results = run_benchmarks(fixtures, args.repeat)
+    print_report(results)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nRéférence enregistrée: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("\nAucune référence enregistrée (utiliser --save-baseline)")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare_with_baseline(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} régression(s) au-delà de {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    print(f"\nAucune régression au-delà de {args.threshold:.0%} par rapport à la référence")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,3 +13,123 @@ USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTM
 MONGO_URI = "mongodb://localhost:27017/"
 DB_NAME = "blogdumoderateur"
 COLLECTION_NAME = "articles"
+BODY_COLLECTION_NAME = "article_bodies"  # Contenu, images et sommaire (séparés des métadonnées)
+INGEST_STATE_COLLECTION_NAME = "ingest_state"  # Compteur de génération, incrémenté à chaque écriture d'articles
+
+# Paramètres du mode de récupération asynchrone
+ASYNC_MODE = False           # Active la récupération concurrente des articles
+MAX_CONCURRENCY = 8          # Nombre maximum de requêtes simultanées (toutes origines confondues)
+PER_HOST_CONCURRENCY = 4     # Nombre maximum de requêtes simultanées par hôte
+REQUESTS_PER_SECOND = 0.5    # Débit initial de requêtes envoyées au site (proche des pauses fixes d'origine)
+REQUEST_TIMEOUT = 10         # Délai maximum d'une requête HTTP (secondes)
+
+# Paramètres du limiteur de débit adaptatif
+MIN_REQUESTS_PER_SECOND = 0.2   # Débit plancher en cas d'erreurs répétées
+MAX_REQUESTS_PER_SECOND = 1.0   # Débit plafond lorsque le site répond vite
+RATE_LIMIT_BURST = 1            # Nombre de requêtes pouvant partir d'affilée
+TARGET_LATENCY = 2.0            # Latence (secondes) au-delà de laquelle on ralentit
+MAX_RETRIES = 3                 # Nombre de nouvelles tentatives sur 429/503/erreur réseau
+RETRY_BACKOFF = 2.0             # Attente (secondes) avant la 1re nouvelle tentative après une erreur réseau,
+                                # doublée à chaque tentative
+RETRY_BACKOFF_MAX = 60.0        # Attente maximum entre deux tentatives après une erreur réseau
+
+# Téléchargement des pages en flux
+MAX_PAGE_BYTES = 5 * 1024 * 1024   # Taille maximum d'une page (décompressée) ; au-delà elle est abandonnée
+DOWNLOAD_CHUNK_SIZE = 64 * 1024    # Taille des blocs lus sur la connexion
+EARLY_STOP = False                 # Arrête la lecture une fois les régions utiles reçues (marqueurs du profil ;
+                                   # les pages tronquées ne sont pas mises en cache HTTP)
+
+# Cache HTTP de revalidation (ETag / Last-Modified)
+USE_HTTP_CACHE = True                   # Active les requêtes conditionnelles
+HTTP_CACHE_PATH = "http_cache.sqlite"   # Fichier du cache sur disque
+HTTP_CACHE_MAX_BYTES = 500 * 1024 * 1024  # Taille maximale des corps stockés (compressés)
+
+# Mode incrémental : ne récupère que les articles absents de la base
+INCREMENTAL_MODE = True
+FORCE_REFRESH = False   # Re-télécharge aussi les articles déjà stockés
+
+# Pipeline récupération / analyse / écriture
+PIPELINE_MODE = False          # Utilise le pipeline multi-étapes au lieu de run_scraper
+PIPELINE_FETCH_WORKERS = 4     # Threads de téléchargement
+PIPELINE_PARSE_WORKERS = None  # Processus d'analyse HTML (None = nombre de cœurs)
+PIPELINE_FETCH_QUEUE_SIZE = 32 # Pages brutes en attente d'analyse
+PIPELINE_WRITE_QUEUE_SIZE = 32 # Articles analysés en attente d'écriture
+
+# Moteur d'extraction : 'single_pass' (index construit en un seul parcours)
+# ou 'legacy' (chaque extracteur parcourt le document séparément)
+EXTRACTION_ENGINE = 'single_pass'
+
+# Analyse HTML : 'auto' (lxml si installé, sinon html.parser), 'lxml' ou 'html.parser'
+PARSER_BACKEND = 'auto'
+RESTRICTED_PARSE = True  # Ne construit que les régions utiles de chaque page (SoupStrainer)
+
+# Découverte des articles par les sitemaps XML
+DISCOVERY_MODE = 'listing'                         # 'listing' (pages de catégories) ou 'sitemap'
+SITEMAP_INDEX_URL = f"{BASE_URL}/sitemap_index.xml"
+SITEMAP_FILTER = 'post-sitemap'                    # Ne parcourt que les sitemaps d'articles
+SITEMAP_BATCH_SIZE = 50                            # Nombre d'URLs transmises à la fois au scraper
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024               # Taille maximum d'un sitemap (limite du protocole)
+SITEMAP_SPOOL_BYTES = 1024 * 1024                  # Au-delà, le sitemap téléchargé est mis en tampon sur disque
+
+# Écriture groupée dans MongoDB
+WRITE_BATCH_SIZE = 100      # Nombre d'articles par bulk_write
+WRITE_FLUSH_INTERVAL = 30   # Délai maximum (secondes) avant écriture du tampon
+
+# Reprise d'un crawl interrompu (frontière persistante)
+USE_FRONTIER = True
+FRONTIER_PATH = "crawl_frontier.sqlite"
+FRONTIER_MAX_ATTEMPTS = 3   # Nombre de tentatives avant d'abandonner un article en échec
+
+# Crawl réparti : file de tâches à réservation (bail) consommée par plusieurs workers
+QUEUE_MODE = False                  # Découverte dans la file puis scraping par QUEUE_WORKERS processus
+QUEUE_BACKEND = 'sqlite'            # 'sqlite' (une machine) ou 'mongo' (workers sur plusieurs machines)
+QUEUE_PATH = "crawl_queue.sqlite"
+QUEUE_COLLECTION_NAME = "crawl_jobs"
+QUEUE_WORKERS = 4                   # Processus workers lancés par main.py
+QUEUE_LEASE_SECONDS = 300           # Durée d'une réservation avant remise en file
+QUEUE_MAX_ATTEMPTS = 3              # Réservations avant abandon d'une tâche
+QUEUE_CLAIM_BATCH = 5               # Tâches réservées à la fois par un worker
+QUEUE_POLL_INTERVAL = 5             # Attente (secondes) quand la file est vide mais des tâches sont réservées
+
+# Extraction du contenu des articles : 'linear' (un seul parcours, temps linéaire)
+# ou 'legacy' (extracteur d'origine)
+CONTENT_EXTRACTOR = 'linear'
+CONTENT_MAX_NODES = 100000     # Nombre maximum de balises parcourues dans la zone de contenu
+CONTENT_MAX_CHARS = 1000000    # Taille maximum du contenu extrait (caractères)
+
+# Profil d'extraction (sélecteurs, formats de date...) défini dans profiles.py
+EXTRACTION_PROFILE = 'blogdumoderateur'
+
+# Détection des quasi-doublons (empreintes SimHash du contenu)
+NEAR_DUPLICATE_POLICY = 'link'   # 'link' (champ duplicate_of), 'skip' (article ignoré) ou 'off'
+SIMHASH_MAX_DISTANCE = 3         # Nombre maximum de bits différents entre deux quasi-doublons
+SIMHASH_BANDS = 4                # Tranches de l'index LSH (doit rester > SIMHASH_MAX_DISTANCE)
+
+# Stockage du corps des articles : compression du contenu ('zlib', ou 'zstd' si zstandard est installé)
+BODY_COMPRESSION = 'zlib'
+BODY_COMPRESSION_LEVEL = 6
+
+# Recherche plein texte : index texte MongoDB (analyse en français) sur le titre, le résumé
+# et le début du contenu, recopié dans le champ search_text des métadonnées
+SEARCH_TEXT_MAX_CHARS = 1000   # Début du contenu indexé (le corps complet reste dans article_bodies)
+TEXT_INDEX_WEIGHTS = {'title': 10, 'summary': 4, 'search_text': 1}
+TEXT_INDEX_LANGUAGE = 'french'
+
+# Archive du HTML brut des articles (WARC compressé + index SQLite) pour la ré-extraction hors ligne
+ARCHIVE_ENABLED = False
+ARCHIVE_DIR = "html_archive"
+ARCHIVE_MAX_FILE_BYTES = 1024 * 1024 * 1024   # Taille au-delà de laquelle un nouveau fichier .warc.gz est ouvert
+REEXTRACT_WORKERS = None                      # Processus de ré-extraction (None = nombre de cœurs)
+REEXTRACT_BATCH_SIZE = 200                    # Articles comparés et mis à jour par écriture groupée
+
+# Destination des articles : 'mongo', ou fichiers 'jsonl' (gzip) / 'parquet' (si pyarrow est installé)
+OUTPUT_SINK = 'mongo'
+EXPORT_DIR = "exports"
+EXPORT_MAX_FILE_BYTES = 256 * 1024 * 1024   # Taille au-delà de laquelle un nouveau fichier est ouvert
+EXPORT_ROW_GROUP_SIZE = 1000                # Articles par groupe de lignes Parquet
+LOAD_BATCH_SIZE = 1000                      # Articles par écriture groupée lors de l'import des fichiers
+
+# Instrumentation du crawl (durées par étape, compteurs) et export des métriques
+METRICS_ENABLED = True
+METRICS_EXPORT_PATH = None          # Ex. "metrics.prom" ; None : résumé dans les logs uniquement
+METRICS_EXPORT_FORMAT = 'prometheus'  # 'prometheus' (format texte) ou 'json'
@@ -0,0 +1,219 @@
+import re
+from bs4 import Tag
+from extractors import (
+    extract_title,
+    extract_thumbnail,
+    extract_categories,
+    extract_table_of_contents,
+    extract_summary,
+    extract_date,
+    extract_author,
+    extract_article_content,
+    extract_images,
+    clean_content_element,
+    extract_content_parts,
+    finalize_content,
+    images_from_content_area
+)
+from profiles import get_profile
+from metrics import metrics
+
+# Sélecteurs composés que le parcours sait résoudre (forme de ceux du profil
+# Blog du Modérateur). Un sélecteur du profil n'est servi par l'index que s'il
+# est identique à l'un d'eux ; sinon il est résolu par le profil.
+TITLE_SELECTOR = 'h1.entry-title, h1.post-title, h1, .entry-title, .post-title'
+META_SECTION_SELECTOR = '#section-meta, .meta-container'
+FIRST_PARAGRAPH_SELECTOR = '.entry-content p, .post-content p, article p'
+
+# Classes et balises dont on suit la présence parmi les ancêtres (sélecteurs descendants)
+CONTEXT_CLASSES = {'post-thumbnail', 'entry-image', 'featured-image', 'entry-content', 'post-content'}
+CONTEXT_TAGS = {'article', 'main'}
+
+# Sélecteurs descendants ou composés reconnus par _visit()
+INDEXED_SELECTORS = {
+    TITLE_SELECTOR, META_SECTION_SELECTOR, FIRST_PARAGRAPH_SELECTOR,
+    '.post-thumbnail img', '.entry-image img', '.featured-image img',
+    'time[datetime]', '[rel="author"]', 'article .content', 'main article'
+}
+CLASS_SELECTOR = re.compile(r'\.[\w-]+')
+META_SELECTOR = re.compile(r'meta\[(name|property)="[^"]*"\]')
+CLASS_TOKEN = re.compile(r'\.([\w-]+)')
+
+
+class DocumentIndex:
+    """
+    Index du document construit en un seul parcours de l'arbre.
+
+    Pour chaque sélecteur utilisé par les extracteurs, l'index conserve le
+    premier élément correspondant dans l'ordre du document, ce qui équivaut
+    à soup.select_one(selecteur). Les sélecteurs non indexés sont résolus
+    avec les sélecteurs précompilés du profil d'extraction.
+
+    Les clés de l'index sont celles du profil : un sélecteur composé du
+    profil n'est indexé que si le parcours sait le reconnaître.
+    """
+
+    def __init__(self, soup, profile=None):
+        self.soup = soup
+        self.profile = profile or get_profile()
+        self._indexed_selectors = INDEXED_SELECTORS.intersection(self.profile.selectors)
+        self._first = {}
+        self._classes = set()
+        self._build()
+
+    def _record(self, key, node):
+        if key not in self._first:
+            self._first[key] = node
+
+    def _visit(self, node, context):
+        name = node.name
+        classes = node.get('class') or []
+        record = self._record
+
+        for class_name in classes:
+            self._classes.add(class_name)
+            record('.' + class_name, node)
+
+        if name == 'h1' or 'entry-title' in classes or 'post-title' in classes:
+            record(TITLE_SELECTOR, node)
+        if node.get('id') == 'section-meta' or 'meta-container' in classes:
+            record(META_SECTION_SELECTOR, node)
+
+        if name == 'meta':
+            if node.get('property') is not None:
+                record(f'meta[property="{node["property"]}"]', node)
+            if node.get('name') is not None:
+                record(f'meta[name="{node["name"]}"]', node)
+        elif name == 'img':
+            for class_name in ('post-thumbnail', 'entry-image', 'featured-image'):
+                if context.get(class_name):
+                    record(f'.{class_name} img', node)
+        elif name == 'p':
+            if context.get('entry-content') or context.get('post-content') or context.get('article'):
+                record(FIRST_PARAGRAPH_SELECTOR, node)
+        elif name == 'time':
+            if node.has_attr('datetime'):
+                record('time[datetime]', node)
+        elif name == 'article':
+            if context.get('main'):
+                record('main article', node)
+
+        if 'content' in classes and context.get('article'):
+            record('article .content', node)
+
+        rel = node.get('rel')
+        if rel is not None:
+            if not isinstance(rel, str):
+                rel = ' '.join(rel)
+            if rel == 'author':
+                record('[rel="author"]', node)
+
+    def _build(self):
+        # Parcours en profondeur itératif ; `context` compte les ancêtres ouverts
+        context = {}
+        stack = [iter(self.soup.contents)]
+        opened = [()]
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+                for key in opened.pop():
+                    context[key] -= 1
+                continue
+            if not isinstance(node, Tag):
+                continue
+
+            self._visit(node, context)
+
+            keys = tuple(c for c in (node.get('class') or []) if c in CONTEXT_CLASSES)
+            if node.name in CONTEXT_TAGS:
+                keys += (node.name,)
+            for key in keys:
+                context[key] = context.get(key, 0) + 1
+            stack.append(iter(node.contents))
+            opened.append(keys)
+
+    def _indexed(self, selector):
+        return (
+            selector in self._indexed_selectors
+            or CLASS_SELECTOR.fullmatch(selector) is not None
+            or META_SELECTOR.fullmatch(selector) is not None
+        )
+
+    def first(self, selector):
+        """Équivalent de soup.select_one(selector)."""
+        if self._indexed(selector):
+            return self._first.get(selector)
+        return self.profile.select_one(self.soup, selector)
+
+    def select(self, selector):
+        """
+        Équivalent de soup.select(selector) : la recherche complète n'est lancée
+        que si une des alternatives peut correspondre (toutes ses classes présentes).
+        """
+        for alternative in selector.split(','):
+            if all(c in self._classes for c in CLASS_TOKEN.findall(alternative)):
+                return self.profile.select(self.soup, selector)
+        return []
+
+
+def extract_single_pass(soup, profile=None):
+    """
+    Moteur d'extraction en un seul parcours : l'index du document remplace
+    les recherches successives de chaque extracteur, et la zone de contenu
+    est localisée et nettoyée une seule fois pour le texte et les images.
+    Le résultat est identique à extractors.extract_all.
+    """
+    profile = profile or get_profile()
+    timed = metrics.timed
+    index = timed('extract_seconds', DocumentIndex, soup, profile, extractor='index')
+    find = index.first
+
+    title = timed('extract_seconds', extract_title, soup, find, profile, extractor='title')
+    thumbnail_url = timed('extract_seconds', extract_thumbnail, soup, find, profile, extractor='thumbnail')
+    category, subcategories = timed('extract_seconds', extract_categories, soup, find, profile,
+                                    extractor='categories')
+    table_of_contents = timed('extract_seconds', extract_table_of_contents, soup, find, index.select, profile,
+                              extractor='table_of_contents')
+    summary = timed('extract_seconds', extract_summary, soup, find, profile, extractor='summary')
+    publication_date = timed('extract_seconds', extract_date, soup, find, profile, extractor='date')
+    author = timed('extract_seconds', extract_author, soup, find, profile, extractor='author')
+
+    with metrics.span('extract_seconds', extractor='content'):
+        content_area = None
+        for selector in profile.content_selectors:
+            content_area = find(selector)
+            if content_area:
+                break
+
+        content_parts = []
+        if content_area:
+            clean_content_element(content_area, profile)
+            content_parts = extract_content_parts(content_area)
+
+        if content_parts:
+            content = finalize_content('\n\n'.join(content_parts))
+        else:
+            # Cas rare (zone absente ou vide) : l'index peut être périmé, on revient
+            # aux extracteurs de référence qui parcourent les autres zones candidates
+            content = extract_article_content(soup, profile)
+
+    with metrics.span('extract_seconds', extractor='images'):
+        if content_parts:
+            images = images_from_content_area(content_area, profile)
+        else:
+            images = extract_images(soup, profile)
+
+    return {
+        'title': title,
+        'thumbnail': thumbnail_url,
+        'table_of_contents': table_of_contents,
+        'category': category,
+        'subcategory': ", ".join(subcategories) if subcategories else "",
+        'subcategories': subcategories,
+        'summary': summary,
+        'publication_date': publication_date,
+        'author': author,
+        'content': content,
+        'images': images
+    }
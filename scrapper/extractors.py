@@ -1,146 +1,298 @@
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString, CData
 from datetime import datetime
 import re
-from config import logger, BASE_URL
+from config import logger, CONTENT_EXTRACTOR, CONTENT_MAX_CHARS, CONTENT_MAX_NODES
+from profiles import get_profile
+from metrics import metrics
+
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+# Balises dont le texte est extrait, et balises qui empêchent une div d'être lue directement
+CONTENT_TAGS = frozenset(HEADING_TAGS + ('p', 'ul', 'ol', 'li', 'blockquote', 'div'))
+BLOCK_TAGS = frozenset(HEADING_TAGS + ('p', 'ul', 'ol', 'div'))
+# Types de chaînes pris en compte par get_text() (les commentaires, scripts, etc. sont ignorés)
+TEXT_TYPES = (NavigableString, CData)
+
+WHITESPACE = re.compile(r'\s+')
+EXTRA_NEWLINES = re.compile(r'\n{3,}')
+EXTRA_SPACES = re.compile(r'[ \t]+')
+
+def clean_content_element(content_element, profile=None):
+    profile = profile or get_profile()
+    # Suppression des éléments indésirables (scripts, publicités, partages sociaux, etc.)
+    for unwanted in content_element.find_all(profile.content_cleanup):
+        unwanted.decompose()
+
+    # Suppression des boutons de type "formation" ou liens externes
+    for btn in content_element.find_all('a', class_=profile.content_button_classes):
+        btn.decompose()
+
+def extract_content_parts(content_element):
+    """Blocs de texte de la zone de contenu, avec l'extracteur configuré (CONTENT_EXTRACTOR)."""
+    if CONTENT_EXTRACTOR == 'linear':
+        return extract_content_parts_linear(content_element)
+    return extract_content_parts_legacy(content_element)
+
+def extract_content_parts_legacy(content_element):
+    content_parts = []
+
+    # Extraction des éléments de contenu (titres, paragraphes, listes, etc.)
+    for element in content_element.find_all([
+        'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+        'ul', 'ol', 'li', 'blockquote', 'div'
+    ]):
+        text = ""
+
+        # Gestion des titres (h1 à h6)
+        if element.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
+            text = f"\n## {element.get_text(strip=True)}\n"
+
+        # Gestion des paragraphes
+        elif element.name == 'p':
+            text = element.get_text(strip=True)
+
+        # Gestion des listes (ul, ol)
+        elif element.name in ['ul', 'ol']:
+            list_items = [
+                f"• {li.get_text(strip=True)}"
+                for li in element.find_all('li', recursive=False)
+                if len(li.get_text(strip=True)) > 5
+            ]
+            text = '\n'.join(list_items) if list_items else ""
+
+        # Gestion des éléments de liste orphelins
+        elif element.name == 'li' and element.parent.name not in ['ul', 'ol']:
+            text = f"• {element.get_text(strip=True)}" if element.get_text(strip=True) else ""
+
+        # Gestion des citations (blockquote)
+        elif element.name == 'blockquote':
+            text = f'"{element.get_text(strip=True)}"' if element.get_text(strip=True) else ""
+
+        # Gestion des divs contenant du texte direct
+        elif element.name == 'div':
+            if not element.find(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'div']):
+                div_text = element.get_text(strip=True)
+                text = div_text if div_text and len(div_text) > 10 else ""
+
+        # Ajout du texte extrait s'il est significatif
+        if text and len(text.strip()) > 3:
+            text = WHITESPACE.sub(' ', text.strip())
+            text = text.replace('&nbsp;', ' ').replace('&amp;', '&')
+            if text not in content_parts:
+                content_parts.append(text)
+
+    return content_parts
+
+class _ContentNode:
+    """Balise de contenu relevée lors du parcours : intervalle de texte couvert et blocs contenus."""
+    __slots__ = ('tag', 'name', 'start', 'end', 'has_block', 'items')
+
+    def __init__(self, tag, start):
+        self.tag = tag
+        self.name = tag.name
+        self.start = start
+        self.end = start
+        self.has_block = False
+        self.items = []  # Éléments <li> directs (listes uniquement)
+
+def _index_content_element(content_element, max_nodes):
+    """
+    Parcours unique de la zone de contenu : chaque nœud texte n'est visité
+    qu'une fois. Renvoie le texte concaténé (équivalent de get_text(strip=True)),
+    les balises de contenu dans l'ordre du document avec l'intervalle de texte
+    qu'elles couvrent, et un indicateur de troncature.
+    """
+    pieces = []
+    length = 0
+    nodes = []
+    enclosing = []  # Balises de contenu ouvertes
+    stack = [(iter(content_element.contents), None)]
+    tag_count = 0
+    truncated = False
+
+    def close(node):
+        node.end = length
+        enclosing.pop()
+        if enclosing:
+            parent = enclosing[-1]
+            if node.has_block or node.name in BLOCK_TAGS:
+                parent.has_block = True
+            if node.name == 'li' and node.tag.parent is parent.tag and parent.name in ('ul', 'ol'):
+                parent.items.append(node)
+
+    while stack:
+        child = next(stack[-1][0], None)
+        if child is None:
+            _, node = stack.pop()
+            if node is not None:
+                close(node)
+            continue
+
+        if isinstance(child, NavigableString):
+            if type(child) in TEXT_TYPES:
+                text = child.strip()
+                if text:
+                    pieces.append(text)
+                    length += len(text)
+            continue
 
-def extract_article_content(soup):
+        tag_count += 1
+        if tag_count > max_nodes:
+            truncated = True
+            break
+
+        node = None
+        if child.name in CONTENT_TAGS:
+            node = _ContentNode(child, length)
+            nodes.append(node)
+            enclosing.append(node)
+        stack.append((iter(child.contents), node))
+
+    # Parcours interrompu : fermeture des balises encore ouvertes
+    while stack:
+        _, node = stack.pop()
+        if node is not None:
+            close(node)
+
+    return ''.join(pieces), nodes, truncated
+
+def extract_content_parts_linear(content_element, max_nodes=CONTENT_MAX_NODES, max_chars=CONTENT_MAX_CHARS):
+    """
+    Même résultat que extract_content_parts_legacy, en temps linéaire : le
+    texte de la zone est sérialisé une seule fois (chaque balise n'en lit
+    qu'une tranche) et le dédoublonnage utilise un ensemble.
+    Le coût est borné par `max_nodes` balises parcourues et `max_chars`
+    caractères de contenu ; au-delà, le contenu est tronqué.
+    """
+    text_content, nodes, truncated = _index_content_element(content_element, max_nodes)
+    content_parts = []
+    seen = set()
+    total_chars = 0
+
+    for node in nodes:
+        name = node.name
+        node_text = text_content[node.start:node.end]
+        text = ""
+
+        if name in HEADING_TAGS:
+            text = f"\n## {node_text}\n"
+
+        elif name == 'p':
+            text = node_text
+
+        elif name in ('ul', 'ol'):
+            list_items = [
+                f"• {text_content[li.start:li.end]}"
+                for li in node.items
+                if li.end - li.start > 5
+            ]
+            text = '\n'.join(list_items) if list_items else ""
+
+        elif name == 'li':
+            if node.tag.parent.name not in ('ul', 'ol'):
+                text = f"• {node_text}" if node_text else ""
+
+        elif name == 'blockquote':
+            text = f'"{node_text}"' if node_text else ""
+
+        elif name == 'div':
+            if not node.has_block:
+                text = node_text if node_text and len(node_text) > 10 else ""
+
+        if text and len(text.strip()) > 3:
+            text = WHITESPACE.sub(' ', text.strip())
+            text = text.replace('&nbsp;', ' ').replace('&amp;', '&')
+            if text not in seen:
+                total_chars += len(text)
+                if total_chars > max_chars:
+                    truncated = True
+                    break
+                seen.add(text)
+                content_parts.append(text)
+
+    if truncated:
+        logger.warning(
+            f"Contenu tronqué (plus de {max_nodes} balises ou {max_chars} caractères): "
+            f"{len(content_parts)} blocs conservés"
+        )
+    return content_parts
 
-    content_selectors = [
-        '.entry-content',
-        '.post-content',
-        'article .content',
-        'main article',
-        '.article-content'
-    ]
+def finalize_content(content):
+    # Nettoyage final du contenu
+    content = EXTRA_NEWLINES.sub('\n\n', content)  # Limite à 2 sauts de ligne consécutifs
+    content = EXTRA_SPACES.sub(' ', content)      # Supprime les espaces multiples
+    return content.strip()
+
+def extract_article_content(soup, profile=None):
+    profile = profile or get_profile()
     content = ""
 
     # Parcourt les sélecteurs possibles pour trouver la zone de contenu
-    for selector in content_selectors:
-        content_element = soup.select_one(selector)
+    for selector in profile.content_selectors:
+        content_element = profile.select_one(soup, selector)
         if content_element:
-            # Suppression des éléments indésirables (scripts, publicités, partages sociaux, etc.)
-            for unwanted in content_element.find_all([
-                'script', 'style', 'aside', '.related-posts', '.social-share',
-                '.social-catchphrase', 'noscript', '.sharing-button', '.comments-section', '#section-meta'
-            ]):
-                unwanted.decompose()
-
-            # Suppression des boutons de type "formation" ou liens externes
-            for btn in content_element.find_all('a', class_=['btn', 'featured-link', 'external']):
-                btn.decompose()
-
-            content_parts = []
-
-            # Extraction des éléments de contenu (titres, paragraphes, listes, etc.)
-            for element in content_element.find_all([
-                'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
-                'ul', 'ol', 'li', 'blockquote', 'div'
-            ]):
-                text = ""
-
-                # Gestion des titres (h1 à h6)
-                if element.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-                    text = f"\n## {element.get_text(strip=True)}\n"
-
-                # Gestion des paragraphes
-                elif element.name == 'p':
-                    text = element.get_text(strip=True)
-
-                # Gestion des listes (ul, ol)
-                elif element.name in ['ul', 'ol']:
-                    list_items = [
-                        f"• {li.get_text(strip=True)}"
-                        for li in element.find_all('li', recursive=False)
-                        if len(li.get_text(strip=True)) > 5
-                    ]
-                    text = '\n'.join(list_items) if list_items else ""
-
-                # Gestion des éléments de liste orphelins
-                elif element.name == 'li' and element.parent.name not in ['ul', 'ol']:
-                    text = f"• {element.get_text(strip=True)}" if element.get_text(strip=True) else ""
-
-                # Gestion des citations (blockquote)
-                elif element.name == 'blockquote':
-                    text = f'"{element.get_text(strip=True)}"' if element.get_text(strip=True) else ""
-
-                # Gestion des divs contenant du texte direct
-                elif element.name == 'div':
-                    if not element.find(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'div']):
-                        div_text = element.get_text(strip=True)
-                        text = div_text if div_text and len(div_text) > 10 else ""
-
-                # Ajout du texte extrait s'il est significatif
-                if text and len(text.strip()) > 3:
-                    text = re.sub(r'\s+', ' ', text.strip())
-                    text = text.replace('&nbsp;', ' ').replace('&amp;', '&')
-                    if text not in content_parts:
-                        content_parts.append(text)
+            clean_content_element(content_element, profile)
+            content_parts = extract_content_parts(content_element)
 
             # Assemblage du contenu final
             if content_parts:
                 content = '\n\n'.join(content_parts)
                 break
 
-    # Nettoyage final du contenu
-    content = re.sub(r'\n{3,}', '\n\n', content)  # Limite à 2 sauts de ligne consécutifs
-    content = re.sub(r'[ \t]+', ' ', content)      # Supprime les espaces multiples
-    return content.strip()
-
-def extract_summary(soup):
+    return finalize_content(content)
 
-    summary_selectors = [
-        '.entry-excerpt',
-        '.post-excerpt',
-        '.article-excerpt',
-        '.summary',
-        'meta[name="description"]',
-        'meta[property="og:description"]'
-    ]
+def extract_summary(soup, find=None, profile=None):
+    profile = profile or get_profile()
+    find = find or profile.finder(soup)
 
     # Recherche du résumé dans les sélecteurs définis
-    for selector in summary_selectors:
+    for selector in profile.summary_selectors:
         if selector.startswith('meta'):
-            element = soup.select_one(selector)
+            element = find(selector)
             if element:
                 return element.get('content', '').strip()
         else:
-            element = soup.select_one(selector)
+            element = find(selector)
             if element:
                 return element.get_text(strip=True)
 
     # Fallback : utilise le premier paragraphe si aucun résumé n'est trouvé
-    first_para = soup.select_one('.entry-content p, .post-content p, article p')
+    first_para = find(profile.first_paragraph_selector)
     if first_para:
         text = first_para.get_text(strip=True)
         return text[:300] + "..." if len(text) > 300 else text
 
     return ""
 
-def extract_table_of_contents(soup):
+def toc_from_summary_section(summary_section, profile=None):
+    """Sommaire du Blog du Modérateur (None si la section ne contient pas de liste)."""
+    profile = profile or get_profile()
+    summary_list = profile.select_one(summary_section, profile.summary_list_selector)
+    if not summary_list:
+        return None
+    toc_items = []
+    for li in summary_list.find_all('li'):
+        link = li.find('a')
+        if link:
+            title = link.get_text(strip=True).replace('&nbsp;', ' ').replace('&amp;', '&')
+            if title:
+                toc_items.append(title)
+    return toc_items
+
+def extract_table_of_contents(soup, find=None, select=None, profile=None):
+    profile = profile or get_profile()
+    find = find or profile.finder(soup)
+    select = select or profile.selector(soup)
 
     # Recherche du sommaire spécifique au Blog du Modérateur
-    summary_section = soup.select_one('.summary-section')
+    summary_section = find(profile.summary_section_selector)
     if summary_section:
-        summary_list = summary_section.select_one('.summary-inner')
-        if summary_list:
-            toc_items = []
-            for li in summary_list.find_all('li'):
-                link = li.find('a')
-                if link:
-                    title = link.get_text(strip=True).replace('&nbsp;', ' ').replace('&amp;', '&')
-                    if title:
-                        toc_items.append(title)
+        toc_items = toc_from_summary_section(summary_section, profile)
+        if toc_items is not None:
             return toc_items
 
     # Fallback : recherche dans d'autres sélecteurs possibles
-    fallback_selectors = [
-        '.table-of-contents ol li a, .table-of-contents ul li a',
-        '.toc ol li a, .toc ul li a',
-        '.wp-block-table-of-contents ol li a, .wp-block-table-of-contents ul li a'
-    ]
-
-    for selector in fallback_selectors:
-        links = soup.select(selector)
+    for selector in profile.toc_selectors:
+        links = select(selector)
         if links:
             toc_items = []
             for link in links:
@@ -151,32 +303,11 @@ def extract_table_of_contents(soup):
 
     return []
 
-def extract_images(soup):
+def images_from_content_area(content_area, profile=None):
+    profile = profile or get_profile()
     images = {}
-    content_selectors = [
-        '.entry-content',
-        '.post-content',
-        'article .content',
-        'main article',
-        '.article-content'
-    ]
-
-    # Recherche de la zone de contenu principale
-    content_area = None
-    for selector in content_selectors:
-        content_area = soup.select_one(selector)
-        if content_area:
-            break
-
-    if not content_area:
-        logger.warning("Aucune zone de contenu trouvée pour l'extraction des images")
-        return images
-
     # Suppression des éléments indésirables avant extraction des images
-    for unwanted in content_area.find_all([
-        'aside', '.related-posts', '.social-share',
-        '.social-catchphrase', '.expert', '.guest-data'
-    ]):
+    for unwanted in content_area.find_all(profile.image_cleanup):
         unwanted.decompose()
 
     # Extraction des images dans la zone de contenu
@@ -206,10 +337,7 @@ def extract_images(soup):
             continue
 
         # Construction de l'URL absolue
-        if img_url.startswith("//"):
-            img_url = "https:" + img_url
-        elif img_url.startswith("/"):
-            img_url = BASE_URL + img_url
+        img_url = profile.absolute_url(img_url)
 
         # Description / légende
         description = (
@@ -240,77 +368,177 @@ def extract_images(soup):
 
     return images
 
+def extract_images(soup, profile=None):
+    profile = profile or get_profile()
+
+    # Recherche de la zone de contenu principale
+    content_area = None
+    for selector in profile.content_selectors:
+        content_area = profile.select_one(soup, selector)
+        if content_area:
+            break
+
+    if not content_area:
+        logger.warning("Aucune zone de contenu trouvée pour l'extraction des images")
+        return {}
+
+    return images_from_content_area(content_area, profile)
+
+def normalize_date_string(date_str, profile):
+    # Partie date d'un horodatage ISO, caractères parasites supprimés
+    if 'T' in date_str:
+        date_str = date_str.split('T')[0]
+    date_str = profile.date_cleanup.sub('', date_str).strip()
+
+    # Conversion des mois en français vers des numéros
+    for fr_month, num_month in profile.months.items():
+        if fr_month in date_str.lower():
+            date_str = date_str.lower().replace(fr_month, num_month)
+    return date_str
+
+def parse_date_string(date_str, profile=None):
+    """Convertit une date brute (ISO, JJ/MM/AAAA ou « 3 mars 2024 ») au format AAAA-MM-JJ."""
+    profile = profile or get_profile()
+    try:
+        # La normalisation ne dépend pas du format : elle est faite une seule fois
+        date_str = normalize_date_string(date_str, profile)
+        # Tentative de parsing avec différents formats de date
+        for fmt in profile.date_formats:
+            try:
+                parsed_date = datetime.strptime(date_str, fmt)
+                return parsed_date.strftime('%Y-%m-%d')
+            except ValueError:
+                continue
+    except Exception:
+        pass
 
-def extract_date(soup):
+    return ""
 
-    date_selectors = [
-        'time[datetime]',
-        '.entry-date',
-        '.post-date',
-        '.published',
-        'meta[property="article:published_time"]'
-    ]
+def extract_date(soup, find=None, profile=None):
+    profile = profile or get_profile()
+    find = find or profile.finder(soup)
 
-    for selector in date_selectors:
-        date_element = soup.select_one(selector)
+    for selector in profile.date_selectors:
+        date_element = find(selector)
         if date_element:
             date_str = date_element.get('datetime') or date_element.get('content')
             if not date_str and hasattr(date_element, 'get_text'):
                 date_str = date_element.get_text(strip=True)
 
-            if date_str:
-                try:
-                    # Tentative de parsing avec différents formats de date
-                    for fmt in ['%Y-%m-%dT%H:%M:%S%z', '%Y-%m-%d', '%d/%m/%Y', '%d %B %Y']:
-                        try:
-                            if 'T' in date_str:
-                                date_str = date_str.split('T')[0]
-
-                            # Nettoyage de la chaîne de date
-                            date_str = re.sub(r'[^\d\-/\s\w]', '', date_str).strip()
-
-                            # Conversion des mois en français vers des numéros
-                            month_mapping = {
-                                'janvier': '01', 'février': '02', 'mars': '03',
-                                'avril': '04', 'mai': '05', 'juin': '06',
-                                'juillet': '07', 'août': '08', 'septembre': '09',
-                                'octobre': '10', 'novembre': '11', 'décembre': '12'
-                            }
-
-                            for fr_month, num_month in month_mapping.items():
-                                if fr_month in date_str.lower():
-                                    date_str = date_str.lower().replace(fr_month, num_month)
-
-                            parsed_date = datetime.strptime(date_str, fmt)
-                            return parsed_date.strftime('%Y-%m-%d')
-                        except ValueError:
-                            continue
-                except Exception:
-                    pass
+            parsed_date = parse_date_string(date_str, profile) if date_str else ""
+            if parsed_date:
+                return parsed_date
 
     return ""
 
-def extract_author(soup):
-    author_selectors = [
-        '.entry-author',
-        '.post-author',
-        '.author',
-        'meta[name="author"]',
-        '.byline',
-        '[rel="author"]'
-    ]
-
-    for selector in author_selectors:
+def clean_author_text(author_text, profile=None):
+    profile = profile or get_profile()
+    # Nettoyage du texte (suppression de "par", "by", etc.)
+    return profile.author_prefix.sub('', author_text)
+
+def extract_author(soup, find=None, profile=None):
+    profile = profile or get_profile()
+    find = find or profile.finder(soup)
+
+    for selector in profile.author_selectors:
         if selector.startswith('meta'):
-            element = soup.select_one(selector)
+            element = find(selector)
             if element:
                 return element.get('content', '').strip()
         else:
-            element = soup.select_one(selector)
+            element = find(selector)
             if element:
-                author_text = element.get_text(strip=True)
-                # Nettoyage du texte (suppression de "par", "by", etc.)
-                author_text = re.sub(r'^(par|by|author:)\s*', '', author_text, flags=re.I)
-                return author_text
+                return clean_author_text(element.get_text(strip=True), profile)
 
     return ""
+
+def thumbnail_from_element(selector, element):
+    if selector.startswith('meta'):
+        return element.get('content', '')
+    return element.get('src') or element.get('data-src') or element.get('data-lazy-src')
+
+def absolute_thumbnail_url(thumbnail_url, profile=None):
+    # Construction de l'URL absolue pour le thumbnail
+    if thumbnail_url:
+        thumbnail_url = (profile or get_profile()).absolute_url(thumbnail_url)
+    return thumbnail_url
+
+def categories_from_meta_section(meta_section, profile=None):
+    profile = profile or get_profile()
+    category = ""
+    subcategories = []
+    tags_list = profile.select(meta_section, profile.meta_tags_selector)
+    if tags_list:
+        category = tags_list[0].get_text(strip=True)
+        for tag_link in tags_list[1:]:
+            subcategory = tag_link.get_text(strip=True)
+            if subcategory and subcategory not in subcategories:
+                subcategories.append(subcategory)
+    return category, subcategories
+
+def extract_title(soup, find=None, profile=None):
+    profile = profile or get_profile()
+    find = find or profile.finder(soup)
+    title_element = find(profile.title_selector)
+    return title_element.get_text(strip=True) if title_element else ""
+
+def extract_thumbnail(soup, find=None, profile=None):
+    profile = profile or get_profile()
+    find = find or profile.finder(soup)
+    thumbnail_url = ""
+    for selector in profile.thumbnail_selectors:
+        element = find(selector)
+        if element:
+            thumbnail_url = thumbnail_from_element(selector, element)
+            if thumbnail_url or selector.startswith('meta'):
+                break
+
+    return absolute_thumbnail_url(thumbnail_url, profile)
+
+def extract_categories(soup, find=None, profile=None):
+    profile = profile or get_profile()
+    find = find or profile.finder(soup)
+    # Extraction de la catégorie et des sous-catégories
+    category = ""
+    subcategories = []
+    meta_section = find(profile.meta_section_selector)
+    if meta_section:
+        category, subcategories = categories_from_meta_section(meta_section, profile)
+
+    # Fallback pour la catégorie si non trouvée dans la meta-section
+    if not category:
+        for selector in profile.category_selectors:
+            cat_element = find(selector)
+            if cat_element:
+                category = cat_element.get_text(strip=True)
+                break
+
+    return category, subcategories
+
+def extract_all(soup, profile=None):
+    """
+    Extraction de référence : chaque extracteur parcourt le document séparément.
+    L'ordre des appels compte (extract_article_content nettoie la zone de contenu
+    avant extract_images).
+    """
+    profile = profile or get_profile()
+    timed = metrics.timed
+    title = timed('extract_seconds', extract_title, soup, None, profile, extractor='title')
+    thumbnail_url = timed('extract_seconds', extract_thumbnail, soup, None, profile, extractor='thumbnail')
+    category, subcategories = timed('extract_seconds', extract_categories, soup, None, profile,
+                                    extractor='categories')
+
+    return {
+        'title': title,
+        'thumbnail': thumbnail_url,
+        'table_of_contents': timed('extract_seconds', extract_table_of_contents, soup, None, None, profile,
+                                   extractor='table_of_contents'),
+        'category': category,
+        'subcategory': ", ".join(subcategories) if subcategories else "",
+        'subcategories': subcategories,
+        'summary': timed('extract_seconds', extract_summary, soup, None, profile, extractor='summary'),
+        'publication_date': timed('extract_seconds', extract_date, soup, None, profile, extractor='date'),
+        'author': timed('extract_seconds', extract_author, soup, None, profile, extractor='author'),
+        'content': timed('extract_seconds', extract_article_content, soup, profile, extractor='content'),
+        'images': timed('extract_seconds', extract_images, soup, profile, extractor='images')
+    }
@@ -0,0 +1,31 @@
+import unicodedata
+
+# Clés normalisées des filtres (auteur, catégorie, sous-catégories).
+# Module sans dépendance hors bibliothèque standard : il est aussi importé
+# par le front (front_flask/models.py) et par get_articles.py, afin que les
+# clés recherchées soient exactement celles enregistrées par le scraper.
+
+
+def normalize_key(value):
+    """Clé de filtre : valeur en minuscules, espaces normalisés (comparaison exacte et indexée)."""
+    return " ".join(unicodedata.normalize('NFC', value or "").split()).lower()
+
+
+def filter_keys(article_data):
+    """
+    Clés normalisées des filtres (auteur, catégorie, sous-catégories) d'un
+    article, couvertes par les index composés de index_manager.
+    """
+    subcategories = article_data.get('subcategories')
+    if subcategories is None:
+        subcategories = (article_data.get('subcategory') or "").split(',')
+    keys = []
+    for subcategory in subcategories:
+        key = normalize_key(subcategory)
+        if key and key not in keys:
+            keys.append(key)
+    return {
+        'author_key': normalize_key(article_data.get('author')),
+        'category_key': normalize_key(article_data.get('category')),
+        'subcategory_keys': keys,
+    }
@@ -0,0 +1,144 @@
+import hashlib
+import re
+from config import logger, SIMHASH_MAX_DISTANCE, SIMHASH_BANDS, NEAR_DUPLICATE_POLICY
+from metrics import metrics
+
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 3  # Nombre de mots par fragment (shingle)
+WORD = re.compile(r'\w+')
+
+
+def _shingle_hash(shingle):
+    # Hachage stable d'un processus à l'autre (contrairement à hash())
+    return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(text):
+    """
+    Empreinte SimHash 64 bits d'un texte, calculée sur l'ensemble de ses
+    fragments de SHINGLE_SIZE mots. Deux textes proches ont des empreintes
+    séparées par peu de bits. Renvoie None si le texte est trop court.
+    """
+    words = WORD.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return None
+    shingles = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+    # Comptage des bits à 1 par position : les empreintes des fragments sont
+    # concaténées en binaire puis chaque colonne est lue par tranche
+    bits = ''.join(format(_shingle_hash(shingle), '064b') for shingle in shingles)
+    half = len(shingles) / 2
+    fingerprint = 0
+    for position in range(SIMHASH_BITS):
+        fingerprint <<= 1
+        if bits[position::SIMHASH_BITS].count('1') > half:
+            fingerprint |= 1
+    return fingerprint
+
+
+def simhash_bands(fingerprint, bands=SIMHASH_BANDS):
+    """
+    Découpe l'empreinte en `bands` tranches (clés de l'index LSH). Deux
+    empreintes distantes d'au plus bands - 1 bits ont au moins une tranche
+    identique.
+    """
+    width = SIMHASH_BITS // bands
+    mask = (1 << width) - 1
+    return [f"{band}:{(fingerprint >> (band * width)) & mask:x}" for band in range(bands)]
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+def fingerprint_fields(content):
+    """Champs d'empreinte enregistrés avec l'article (vides si le contenu est trop court)."""
+    fingerprint = simhash(content) if content else None
+    if fingerprint is None:
+        return {'simhash': None, 'simhash_bands': []}
+    return {'simhash': f"{fingerprint:016x}", 'simhash_bands': simhash_bands(fingerprint)}
+
+
+class NearDuplicateDetector:
+    """
+    Détection des quasi-doublons à l'ingestion, par index LSH sur les
+    tranches des empreintes SimHash.
+
+    - preload=True : les empreintes déjà stockées sont chargées une fois en
+      mémoire, chaque recherche se limite à quelques accès à un dictionnaire ;
+    - preload=False : chaque recherche est une requête $in sur l'index
+      multiclé `simhash_bands` de la collection.
+    Les articles de l'exécution en cours sont toujours indexés en mémoire
+    (ils peuvent ne pas encore être écrits en base).
+
+    Politique (NEAR_DUPLICATE_POLICY) : 'link' enregistre l'article avec un
+    champ `duplicate_of` (URL de l'article d'origine), 'skip' l'ignore.
+    """
+
+    def __init__(self, collection=None, policy=NEAR_DUPLICATE_POLICY, max_distance=SIMHASH_MAX_DISTANCE,
+                 preload=True):
+        self.collection = collection
+        self.policy = policy
+        self.max_distance = max_distance
+        self.preload = preload
+        self._bands = {}  # Tranche -> [(url, empreinte, URL d'origine)]
+        self.duplicates = 0
+
+        if collection is not None and preload:
+            cursor = collection.find(
+                {'simhash': {'$type': 'string'}}, {'url': 1, 'simhash': 1, 'duplicate_of': 1, '_id': 0}
+            )
+            count = 0
+            for doc in cursor:
+                self._index(doc['url'], int(doc['simhash'], 16), doc.get('duplicate_of') or doc['url'])
+                count += 1
+            logger.info(f"{count} empreintes d'articles chargées pour la détection des doublons")
+
+    def _index(self, url, fingerprint, original_url):
+        entry = (url, fingerprint, original_url)
+        for band in simhash_bands(fingerprint):
+            self._bands.setdefault(band, []).append(entry)
+
+    def _candidates(self, bands):
+        for band in bands:
+            yield from self._bands.get(band, ())
+        if self.collection is not None and not self.preload:
+            cursor = self.collection.find(
+                {'simhash_bands': {'$in': bands}}, {'url': 1, 'simhash': 1, 'duplicate_of': 1, '_id': 0}
+            )
+            for doc in cursor:
+                yield doc['url'], int(doc['simhash'], 16), doc.get('duplicate_of') or doc['url']
+
+    def find_duplicate(self, url, simhash_hex, bands):
+        """URL de l'article d'origine dont l'empreinte est proche, ou None."""
+        fingerprint = int(simhash_hex, 16)
+        for candidate_url, candidate, original_url in self._candidates(bands):
+            if candidate_url != url and hamming_distance(fingerprint, candidate) <= self.max_distance:
+                return original_url
+        return None
+
+    def check(self, article_data):
+        """
+        Applique la politique de dédoublonnage à un article. Renvoie False si
+        l'article doit être ignoré, True sinon (éventuellement annoté).
+        """
+        simhash_hex = article_data.get('simhash')
+        if not simhash_hex or self.policy == 'off':
+            return True
+
+        url = article_data['url']
+        original_url = self.find_duplicate(url, simhash_hex, article_data['simhash_bands'])
+        if original_url:
+            self.duplicates += 1
+            if self.policy == 'skip':
+                metrics.increment('articles_skipped_total', reason='near_duplicate')
+                logger.info(f"Quasi-doublon ignoré: {url} (origine: {original_url})")
+                return False
+            logger.info(f"Quasi-doublon lié: {url} -> {original_url}")
+            article_data['duplicate_of'] = original_url
+        else:
+            original_url = url
+            article_data['duplicate_of'] = None
+
+        self._index(url, int(simhash_hex, 16), original_url)
+        return True
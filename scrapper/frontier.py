@@ -0,0 +1,185 @@
+import json
+import sqlite3
+import threading
+import time
+
+from config import logger, FRONTIER_PATH, FRONTIER_MAX_ATTEMPTS
+
+# États d'une catégorie : en attente, pages de liste parcourues, entièrement traitée
+CATEGORY_PENDING = 'pending'
+CATEGORY_LISTED = 'listed'
+CATEGORY_DONE = 'done'
+
+
+class CrawlFrontier:
+    """
+    Frontière de crawl persistante (SQLite) permettant de reprendre un
+    scraping interrompu : catégories découvertes, pages de liste déjà
+    parcourues et état de chaque article (pending / done / failed) avec
+    son nombre de tentatives.
+
+    Les découvertes, les échecs et les articles terminés sans écriture
+    (ignorés, inchangés) sont enregistrés immédiatement ; un article écrit
+    n'est marqué terminé que par checkpoint(), avec les URLs dont la
+    destination a confirmé l'écriture.
+    """
+
+    def __init__(self, path=FRONTIER_PATH, max_attempts=FRONTIER_MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS categories (
+                url TEXT PRIMARY KEY,
+                name TEXT,
+                position INTEGER,
+                status TEXT NOT NULL DEFAULT 'pending'
+            );
+            CREATE TABLE IF NOT EXISTS listing_pages (
+                url TEXT PRIMARY KEY,
+                category_url TEXT,
+                article_urls TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS articles (
+                url TEXT PRIMARY KEY,
+                category_url TEXT,
+                position INTEGER,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                updated_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_articles_category ON articles(category_url, status);
+        """)
+        self._conn.commit()
+
+    def _execute(self, query, params=(), commit=True):
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+            rows = cursor.fetchall()
+            if commit:
+                self._conn.commit()
+            return rows
+
+    # --- Catégories
+
+    def get_categories(self):
+        rows = self._execute("SELECT name, url FROM categories ORDER BY position", commit=False)
+        return [{'name': name, 'url': url} for name, url in rows]
+
+    def save_categories(self, categories):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO categories (url, name, position) VALUES (?, ?, ?)",
+                [(c['url'], c['name'], i) for i, c in enumerate(categories)]
+            )
+            self._conn.commit()
+
+    def category_status(self, category_url):
+        rows = self._execute("SELECT status FROM categories WHERE url = ?", (category_url,), commit=False)
+        return rows[0][0] if rows else CATEGORY_PENDING
+
+    def mark_category(self, category_url, status):
+        self._execute(
+            "INSERT INTO categories (url, status) VALUES (?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET status = excluded.status",
+            (category_url, status)
+        )
+
+    def complete_category_if_done(self, category_url):
+        """Passe la catégorie à 'done' s'il ne reste aucun article à (re)tenter."""
+        if not self.pending_articles(category_url):
+            self.mark_category(category_url, CATEGORY_DONE)
+
+    # --- Pages de liste
+
+    def get_page_articles(self, page_url):
+        """URLs relevées sur une page de liste déjà parcourue (None si la page reste à faire)."""
+        rows = self._execute("SELECT article_urls FROM listing_pages WHERE url = ?", (page_url,), commit=False)
+        return json.loads(rows[0][0]) if rows else None
+
+    def mark_page_done(self, page_url, category_url, article_urls):
+        self._execute(
+            "INSERT OR REPLACE INTO listing_pages (url, category_url, article_urls) VALUES (?, ?, ?)",
+            (page_url, category_url, json.dumps(article_urls))
+        )
+
+    # --- Articles
+
+    def add_articles(self, article_urls, category_url):
+        """Enregistre les articles retenus pour une catégorie (les articles déjà connus sont conservés)."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO articles (url, category_url, position, updated_at) VALUES (?, ?, ?, ?)",
+                [(url, category_url, i, now) for i, url in enumerate(article_urls)]
+            )
+            self._conn.commit()
+
+    def pending_articles(self, category_url):
+        """
+        Articles restant à traiter pour une catégorie : en attente, ou en échec
+        avec moins de `max_attempts` tentatives.
+        """
+        rows = self._execute(
+            "SELECT url FROM articles WHERE category_url = ? "
+            "AND (status = 'pending' OR (status = 'failed' AND attempts < ?)) "
+            "ORDER BY position",
+            (category_url, self.max_attempts), commit=False
+        )
+        return [url for url, in rows]
+
+    def mark_done(self, article_url):
+        """Article terminé sans écriture (ignoré ou inchangé)."""
+        self.checkpoint([article_url])
+
+    def mark_failed(self, article_url, error=""):
+        self._execute(
+            "UPDATE articles SET status = 'failed', attempts = attempts + 1, last_error = ?, updated_at = ? "
+            "WHERE url = ?",
+            (str(error)[:500], time.time(), article_url)
+        )
+
+    def checkpoint(self, urls):
+        """
+        Marque terminés les articles dont l'écriture a été confirmée (appelé
+        après chaque écriture groupée, avec les URLs effectivement écrites).
+        """
+        if not urls:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE articles SET status = 'done', updated_at = ? WHERE url = ?",
+                [(now, url) for url in urls]
+            )
+            self._conn.commit()
+        logger.debug(f"Point de reprise: {len(urls)} articles confirmés")
+
+    def complete(self):
+        """
+        Crawl terminé : la frontière est vidée pour que le prochain passage
+        reparte de zéro, sauf les articles en échec sous le plafond de
+        tentatives, conservés avec leur compteur pour être retentés au
+        prochain passage.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM categories")
+            self._conn.execute("DELETE FROM listing_pages")
+            self._conn.execute(
+                "DELETE FROM articles WHERE NOT (status = 'failed' AND attempts < ?)",
+                (self.max_attempts,)
+            )
+            self._conn.commit()
+
+    def stats(self):
+        rows = self._execute(
+            "SELECT status, COUNT(*) FROM articles GROUP BY status", commit=False
+        )
+        return dict(rows)
+
+    def close(self):
+        # Pas de confirmation ici : les articles non écrits restent à traiter à la reprise
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,146 @@
+import sqlite3
+import threading
+import time
+import zlib
+
+from config import logger, HTTP_CACHE_PATH, HTTP_CACHE_MAX_BYTES
+
+
+class HttpCache:
+    """
+    Cache HTTP persistant (SQLite) pour la revalidation conditionnelle.
+
+    Les corps de réponse sont stockés compressés, indexés par URL, avec leurs
+    validateurs (ETag / Last-Modified). La taille totale est bornée : les
+    entrées les moins récemment utilisées sont évincées en premier.
+
+    Une entrée n'est revalidée (requête conditionnelle) qu'une fois confirmée
+    par confirm(), après l'écriture de l'article : une page dont l'écriture a
+    échoué est de nouveau téléchargée en entier au lieu d'être ignorée (304).
+    """
+
+    def __init__(self, path=HTTP_CACHE_PATH, max_bytes=HTTP_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL,
+                confirmed INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(entries)")]
+        if 'confirmed' not in columns:
+            # Cache créé avant la confirmation : ses entrées sont revalidées après un téléchargement complet
+            self._conn.execute("ALTER TABLE entries ADD COLUMN confirmed INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_access ON entries(last_access)")
+        self._conn.commit()
+        self._total_size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+        # Compteurs : requêtes avec entrée en cache, sans entrée, et réponses 304
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def conditional_headers(self, url):
+        """Renvoie les en-têtes If-None-Match / If-Modified-Since pour une URL en cache (entrée confirmée)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified FROM entries WHERE url = ? AND confirmed = 1", (url,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return {}
+            self.hits += 1
+
+        headers = {}
+        etag, last_modified = row
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def get_body(self, url):
+        """Renvoie le corps en cache (après une réponse 304) et met à jour sa date d'accès."""
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM entries WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            self.not_modified += 1
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        return zlib.decompress(row[0])
+
+    def store(self, url, response, body):
+        """
+        Enregistre le corps complet d'une réponse 200 si elle porte au moins
+        un validateur (un corps tronqué ne doit pas être associé à l'ETag de
+        la page entière : voir discard()). L'entrée n'est pas confirmée.
+        """
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+
+        body = zlib.compress(body)
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM entries WHERE url = ?", (url,)).fetchone()
+            if previous:
+                self._total_size -= previous[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (url, etag, last_modified, body, size, last_access, confirmed) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0)",
+                (url, etag, last_modified, body, len(body), time.time())
+            )
+            self._total_size += len(body)
+            self._evict()
+            self._conn.commit()
+
+    def confirm(self, urls):
+        """Confirme les entrées de pages traitées (article écrit ou écarté) : elles seront revalidées."""
+        with self._lock:
+            self._conn.executemany("UPDATE entries SET confirmed = 1 WHERE url = ?", [(url,) for url in urls])
+            self._conn.commit()
+
+    def discard(self, url):
+        """Retire l'entrée d'une URL (corps en cache périmé et non remplaçable)."""
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM entries WHERE url = ?", (url,)).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+                self._total_size -= row[0]
+                self._conn.commit()
+
+    def _evict(self):
+        # Éviction LRU jusqu'à repasser sous 90 % de la taille maximale
+        if self._total_size <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute("SELECT url, size FROM entries ORDER BY last_access").fetchall()
+        evicted = 0
+        for url, size in rows:
+            if self._total_size <= target:
+                break
+            self._conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self._total_size -= size
+            evicted += 1
+        logger.debug(f"Cache HTTP: {evicted} entrées évincées")
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'not_modified': self.not_modified,
+            'size_bytes': self._total_size
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
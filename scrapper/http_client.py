@@ -0,0 +1,158 @@
+import random
+import time
+
+import requests
+from config import (
+    logger, REQUEST_TIMEOUT, MAX_RETRIES, MAX_PAGE_BYTES, DOWNLOAD_CHUNK_SIZE, RETRY_BACKOFF, RETRY_BACKOFF_MAX
+)
+from rate_limiter import THROTTLE_STATUS_CODES, parse_retry_after
+from metrics import metrics, SIZE_BUCKETS
+
+
+class PageTooLarge(Exception):
+    pass
+
+
+# Renvoyé à la place du corps pour une page inchangée (304) ignorée (skip_unchanged)
+NOT_MODIFIED = object()
+
+
+def backoff_delay(attempt, base=RETRY_BACKOFF, maximum=RETRY_BACKOFF_MAX):
+    """Attente exponentielle avant la tentative suivante (0 = première), avec gigue de ±50 %."""
+    return min(maximum, base * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+def read_body(response, max_bytes=MAX_PAGE_BYTES, stop_marker=None, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """
+    Lit par blocs le corps d'une réponse ouverte en flux (stream=True). La
+    décompression (gzip, deflate, et brotli si le module est installé) se
+    fait au fil de la lecture, la limite porte donc sur la taille réelle.
+
+    Lève PageTooLarge si le corps dépasse `max_bytes`. Si `stop_marker` est
+    fourni, la lecture s'arrête dès sa réception : le corps renvoyé se
+    termine par le marqueur et le reste de la page n'est pas téléchargé.
+    La réponse est toujours fermée. Renvoie (corps, tronqué).
+    """
+    try:
+        declared = response.headers.get('Content-Length', '')
+        if declared.isdigit() and int(declared) > max_bytes:
+            raise PageTooLarge(f"taille annoncée {declared} octets > {max_bytes}")
+
+        body = bytearray()
+        for chunk in response.iter_content(chunk_size):
+            # Le marqueur peut être à cheval sur deux blocs
+            search_from = max(0, len(body) - len(stop_marker) + 1) if stop_marker else 0
+            body += chunk
+            if stop_marker:
+                position = body.find(stop_marker, search_from)
+                if position != -1:
+                    del body[position + len(stop_marker):]
+                    return bytes(body), True
+            if len(body) > max_bytes:
+                raise PageTooLarge(f"plus de {max_bytes} octets reçus")
+        return bytes(body), False
+    finally:
+        response.close()
+
+
+def fetch_url(session, url, limiter=None, timeout=REQUEST_TIMEOUT, max_retries=MAX_RETRIES,
+              cache=None, skip_unchanged=False, max_bytes=MAX_PAGE_BYTES, stop_marker=None):
+    """
+    Récupère le contenu brut d'une URL en passant par le limiteur de débit.
+
+    Les réponses 429/503 et les erreurs réseau sont retentées (au plus
+    `max_retries` fois), en respectant l'en-tête Retry-After, ou après une
+    attente exponentielle (backoff_delay) pour une erreur réseau ; chaque
+    résultat est transmis au limiteur pour qu'il ajuste son débit.
+    Avec un cache HTTP, la requête est conditionnelle : sur une réponse 304,
+    le corps en cache est renvoyé, ou NOT_MODIFIED si skip_unchanged est
+    activé (la page n'a alors pas besoin d'être ré-analysée).
+    Le corps est lu en flux par read_body() : une page de plus de `max_bytes`
+    est abandonnée, et la lecture s'arrête après `stop_marker` s'il est fourni
+    (le corps tronqué n'est alors pas mis en cache).
+    Renvoie None si la page n'a pas pu être récupérée.
+    """
+    headers = cache.conditional_headers(url) if cache else {}
+    attempt = 0
+    while attempt <= max_retries:
+        if limiter:
+            limiter.acquire()
+
+        start = time.monotonic()
+        try:
+            with metrics.span('fetch_seconds'):
+                response = session.get(url, timeout=timeout, headers=headers, stream=True)
+                if 200 <= response.status_code < 300:
+                    content, truncated = read_body(response, max_bytes, stop_marker)
+                else:
+                    response.close()  # Corps inutile : libère la connexion
+        except PageTooLarge as e:
+            if limiter:
+                limiter.record(latency=time.monotonic() - start, status_code=response.status_code)
+            metrics.increment('http_requests_total', status=response.status_code)
+            metrics.increment('http_errors_total', kind='too_large')
+            logger.error(f"Page trop volumineuse, ignorée: {url} ({e})")
+            return None
+        except requests.exceptions.RequestException as e:
+            if limiter:
+                limiter.record(latency=time.monotonic() - start, error=True)
+            metrics.increment('http_errors_total', kind='network')
+            logger.error(f"Erreur lors de la récupération de {url}: {e}")
+            if attempt < max_retries:
+                # Site injoignable ou lent : attente croissante avant de réessayer
+                metrics.increment('http_retries_total')
+                time.sleep(backoff_delay(attempt))
+            attempt += 1
+            continue
+        latency = time.monotonic() - start
+        metrics.increment('http_requests_total', status=response.status_code)
+
+        if response.status_code in THROTTLE_STATUS_CODES:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if limiter:
+                limiter.record(latency=latency, status_code=response.status_code, retry_after=retry_after)
+            elif retry_after:
+                time.sleep(retry_after)
+            logger.warning(f"Réponse {response.status_code} pour {url} (tentative {attempt + 1}/{max_retries + 1})")
+            if attempt < max_retries:
+                metrics.increment('http_retries_total')
+            attempt += 1
+            continue
+
+        if limiter:
+            limiter.record(latency=latency, status_code=response.status_code,
+                           error=response.status_code >= 500)
+
+        if response.status_code == 304 and cache and headers:
+            body = cache.get_body(url)
+            if body is not None:
+                metrics.increment('pages_not_modified_total')
+                logger.debug(f"Page inchangée (304): {url}")
+                return NOT_MODIFIED if skip_unchanged else body
+            # Entrée évincée entre-temps : nouvelle requête sans condition,
+            # qui ne compte pas comme une tentative
+            headers = {}
+            continue
+
+        if not 200 <= response.status_code < 300:
+            # Erreur (4xx/5xx) ou réponse sans corps exploitable (1xx, 3xx non suivie)
+            metrics.increment('http_errors_total', kind='http')
+            logger.error(f"Erreur lors de la récupération de {url}: "
+                         f"réponse {response.status_code} {response.reason}")
+            return None
+        if cache:
+            # Un corps tronqué n'est pas la page désignée par l'ETag : il n'est
+            # pas mis en cache, et l'ancienne version (périmée) est retirée
+            if truncated:
+                cache.discard(url)
+            else:
+                cache.store(url, response, content)
+        if truncated:
+            metrics.increment('pages_truncated_total')
+        metrics.increment('bytes_downloaded_total', len(content))
+        metrics.observe('response_bytes', len(content), buckets=SIZE_BUCKETS)
+        return content
+
+    metrics.increment('http_errors_total', kind='abandoned')
+    logger.error(f"Abandon de {url} après {max_retries + 1} tentatives")
+    return None
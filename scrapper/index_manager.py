@@ -0,0 +1,152 @@
+import argparse
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+from config import logger, TEXT_INDEX_WEIGHTS, TEXT_INDEX_LANGUAGE
+
+# Codes d'erreur d'un index existant incompatible avec l'index déclaré :
+# IndexOptionsConflict (mêmes clés, autres options) et IndexKeySpecsConflict
+# (même nom, autres clés)
+INDEX_CONFLICT_CODES = (85, 86)
+
+# Index de la collection des articles : nom -> (clés, options).
+# Les filtres exacts (clés normalisées) sont suivis de l'ordre d'affichage
+# des résultats (date puis _id) : filtre et tri sont servis par le même index.
+ARTICLE_INDEXES = {
+    # Non unique : deux articles distincts peuvent porter le même titre
+    'title_1': ([('title', ASCENDING)], {}),
+    # Clé des upserts et des recherches d'articles connus
+    'url_1': ([('url', ASCENDING)], {'unique': True}),
+    # Tranches SimHash : recherche des quasi-doublons (index LSH)
+    'simhash_bands_1': ([('simhash_bands', ASCENDING)], {}),
+    # Seuil <lastmod> des sitemaps (dernier article récupéré)
+    'scraped_at_-1': ([('scraped_at', DESCENDING)], {}),
+    # Résultats du front sans filtre, du plus récent au plus ancien
+    'publication_date_-1__id_-1': ([('publication_date', DESCENDING), ('_id', DESCENDING)], {}),
+    'category_key_1_publication_date_-1__id_-1': (
+        [('category_key', ASCENDING), ('publication_date', DESCENDING), ('_id', DESCENDING)], {}
+    ),
+    'subcategory_keys_1_publication_date_-1__id_-1': (
+        [('subcategory_keys', ASCENDING), ('publication_date', DESCENDING), ('_id', DESCENDING)], {}
+    ),
+    'author_key_1_publication_date_-1__id_-1': (
+        [('author_key', ASCENDING), ('publication_date', DESCENDING), ('_id', DESCENDING)], {}
+    ),
+    # Recherche plein texte pondérée (un seul index texte par collection)
+    'article_text': ([(field, 'text') for field in TEXT_INDEX_WEIGHTS], {
+        'weights': TEXT_INDEX_WEIGHTS,
+        'default_language': TEXT_INDEX_LANGUAGE,
+        'language_override': 'text_language',
+    }),
+}
+
+# Requêtes des chemins d'accès (front, get_articles.py, scraper) et index attendu
+QUERY_PATHS = [
+    ({'url': 'https://example.com'}, None, 'url_1'),
+    ({}, [('publication_date', DESCENDING), ('_id', DESCENDING)], 'publication_date_-1__id_-1'),
+    ({'category_key': 'example'}, [('publication_date', DESCENDING), ('_id', DESCENDING)],
+     'category_key_1_publication_date_-1__id_-1'),
+    ({'subcategory_keys': 'example'}, [('publication_date', DESCENDING), ('_id', DESCENDING)],
+     'subcategory_keys_1_publication_date_-1__id_-1'),
+    ({'author_key': 'example'}, [('publication_date', DESCENDING), ('_id', DESCENDING)],
+     'author_key_1_publication_date_-1__id_-1'),
+    ({'category_key': 'example', 'subcategory_keys': 'example'}, None, None),
+    ({'scraped_at': {'$exists': True}}, [('scraped_at', DESCENDING)], 'scraped_at_-1'),
+]
+
+
+def _conflicting_indexes(collection, name, keys):
+    # Index existant de même nom ou de mêmes clés (options différentes), ou autre index texte
+    wanted = list(keys)
+    text = any(kind == 'text' for _, kind in keys)
+    for index in collection.list_indexes():
+        if index['name'] == '_id_':
+            continue
+        if (index['name'] == name or list(index['key'].items()) == wanted
+                or (text and 'textIndexVersion' in index)):
+            yield index['name']
+
+
+def ensure_indexes(collection, indexes=ARTICLE_INDEXES):
+    """
+    Crée les index déclarés. Un index existant de même nom ou de mêmes clés
+    mais avec d'autres options (unique, poids...) est remplacé ; toute autre
+    erreur (droits, doublons empêchant un index unique...) est relancée.
+    """
+    for name, (keys, options) in indexes.items():
+        try:
+            collection.create_index(keys, name=name, **options)
+        except OperationFailure as e:
+            if e.code not in INDEX_CONFLICT_CODES:
+                raise
+            for existing in list(_conflicting_indexes(collection, name, keys)):
+                collection.drop_index(existing)
+            collection.create_index(keys, name=name, **options)
+            logger.info(f"Index {name} recréé")
+
+
+def winning_plan(collection, query, sort=None):
+    """Plan d'exécution retenu par MongoDB pour une requête (explain)."""
+    cursor = collection.find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    plan = cursor.explain()['queryPlanner']['winningPlan']
+    # Moteur d'exécution récent (slot-based) : le plan est sous queryPlan
+    return plan.get('queryPlan', plan)
+
+
+def plan_stages(plan):
+    """Étapes d'un plan, de la racine aux feuilles, avec le nom de l'index des IXSCAN."""
+    stages = []
+    while plan:
+        stages.append((plan['stage'], plan.get('indexName')))
+        children = plan.get('inputStages') or ([plan['inputStage']] if 'inputStage' in plan else [])
+        plan = children[0] if children else None
+    return stages
+
+
+def check_query_paths(collection, query_paths=QUERY_PATHS):
+    """
+    Vérifie par explain que chaque requête des chemins d'accès est servie
+    par un index (et par l'index attendu s'il est précisé), sans parcours
+    complet de la collection ni tri en mémoire. Renvoie la liste des écarts.
+    """
+    problems = []
+    for query, sort, expected in query_paths:
+        stages = plan_stages(winning_plan(collection, query, sort))
+        names = [stage for stage, _ in stages]
+        indexes = [index for _, index in stages if index]
+        if 'COLLSCAN' in names:
+            problems.append(f"{query}: parcours complet de la collection")
+        elif sort and 'SORT' in names:
+            problems.append(f"{query}: tri en mémoire")
+        elif expected and expected not in indexes:
+            problems.append(f"{query}: index {indexes} au lieu de {expected}")
+        else:
+            logger.info(f"{query}: {' <- '.join(f'{s}({i})' if i else s for s, i in stages)}")
+    return problems
+
+
+def main(argv=None):
+    from mongo_utils import get_mongo_connection
+
+    parser = argparse.ArgumentParser(description="Index de la collection des articles")
+    parser.add_argument('--check', action='store_true',
+                        help="Vérifie par explain les plans des requêtes (code de sortie 1 en cas d'écart)")
+    args = parser.parse_args(argv)
+
+    # get_mongo_connection crée les index déclarés
+    client, collection = get_mongo_connection()
+    try:
+        if args.check:
+            problems = check_query_paths(collection)
+            for problem in problems:
+                logger.error(problem)
+            return 1 if problems else 0
+    finally:
+        client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
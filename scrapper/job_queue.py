@@ -0,0 +1,289 @@
+import sqlite3
+import threading
+import time
+
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from config import logger, QUEUE_PATH, QUEUE_COLLECTION_NAME, QUEUE_LEASE_SECONDS, QUEUE_MAX_ATTEMPTS
+
+# États d'une tâche : en attente, réservée par un worker, terminée, abandonnée
+JOB_PENDING = 'pending'
+JOB_LEASED = 'leased'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+
+class SqliteJobQueue:
+    """
+    File de tâches de crawl (URLs d'articles) stockée dans SQLite, partagée
+    par les processus d'une même machine.
+
+    Un worker réserve des tâches avec claim() pour `lease_seconds` secondes,
+    puis les confirme (ack) ou les signale en échec (fail). Une réservation
+    expirée (worker arrêté ou bloqué) remet la tâche en attente ; au-delà de
+    `max_attempts` réservations, la tâche est abandonnée.
+
+    La file sert aussi de stockage au SharedRateLimiter (reserve_slot, delay).
+    """
+
+    def __init__(self, path=QUEUE_PATH, lease_seconds=QUEUE_LEASE_SECONDS, max_attempts=QUEUE_MAX_ATTEMPTS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # Transactions explicites (BEGIN IMMEDIATE) : une seule réservation à la fois entre processus
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                url TEXT PRIMARY KEY,
+                source TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_until REAL,
+                worker TEXT,
+                last_error TEXT,
+                enqueued_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, lease_until);
+            CREATE TABLE IF NOT EXISTS rate_limits (
+                name TEXT PRIMARY KEY,
+                next_slot REAL NOT NULL
+            );
+        """)
+
+    def _transaction(self, operation):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = operation(self._conn)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def enqueue(self, urls, source=None):
+        """
+        Met des URLs en file. Une tâche déjà terminée ou abandonnée est remise
+        en attente (article à rafraîchir) ; une tâche en attente ou réservée
+        est laissée telle quelle. Renvoie le nombre de tâches mises en attente.
+        """
+        now = time.time()
+
+        def insert(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT INTO jobs (url, source, enqueued_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET status = 'pending', attempts = 0, last_error = NULL, "
+                "source = excluded.source, enqueued_at = excluded.enqueued_at "
+                "WHERE status IN ('done', 'failed')",
+                [(url, source, now) for url in urls]
+            )
+            return conn.total_changes - before
+
+        return self._transaction(insert)
+
+    def _requeue_expired(self, conn, now):
+        conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "last_error = 'réservation expirée' WHERE status = 'leased' AND lease_until < ?",
+            (self.max_attempts, now)
+        )
+
+    def claim(self, worker_id, limit=1):
+        """Réserve jusqu'à `limit` tâches pour le worker. Renvoie une liste de couples (url, source)."""
+        now = time.time()
+
+        def lease(conn):
+            self._requeue_expired(conn, now)
+            jobs = conn.execute(
+                "SELECT url, source FROM jobs WHERE status = 'pending' ORDER BY enqueued_at LIMIT ?", (limit,)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE jobs SET status = 'leased', lease_until = ?, worker = ?, attempts = attempts + 1 "
+                "WHERE url = ?",
+                [(now + self.lease_seconds, worker_id, url) for url, _ in jobs]
+            )
+            return jobs
+
+        return self._transaction(lease)
+
+    def ack(self, urls):
+        """Confirme des tâches terminées (articles sauvegardés ou volontairement ignorés)."""
+        self._transaction(lambda conn: conn.executemany(
+            "UPDATE jobs SET status = 'done', lease_until = NULL WHERE url = ?", [(url,) for url in urls]
+        ))
+
+    def fail(self, url, error):
+        """Remet une tâche en attente, ou l'abandonne si ses tentatives sont épuisées."""
+        self._transaction(lambda conn: conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "lease_until = NULL, last_error = ? WHERE url = ?",
+            (self.max_attempts, str(error)[:500], url)
+        ))
+
+    def active_count(self):
+        """Nombre de tâches en attente ou réservées (la file n'est vide que si ce nombre est nul)."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('pending', 'leased')"
+            ).fetchone()[0]
+
+    def reserve_slot(self, name, interval, burst=1):
+        """
+        Réserve le prochain créneau d'envoi du limiteur `name` (créneaux espacés
+        de `interval` secondes, `burst` envois possibles d'affilée) et renvoie
+        le délai à attendre avant ce créneau.
+        """
+        now = time.time()
+
+        def reserve(conn):
+            row = conn.execute("SELECT next_slot FROM rate_limits WHERE name = ?", (name,)).fetchone()
+            slot = max(row[0] if row else now, now - (burst - 1) * interval)
+            conn.execute("INSERT OR REPLACE INTO rate_limits (name, next_slot) VALUES (?, ?)",
+                         (name, slot + interval))
+            return slot - now
+
+        return max(0.0, self._transaction(reserve))
+
+    def delay(self, name, seconds):
+        """Recule le calendrier du limiteur `name` : aucun envoi avant `seconds` secondes."""
+        self._transaction(lambda conn: conn.execute(
+            "INSERT INTO rate_limits (name, next_slot) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET next_slot = MAX(next_slot, excluded.next_slot)",
+            (name, time.time() + seconds)
+        ))
+
+    def stats(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class MongoJobQueue:
+    """
+    File de tâches de crawl stockée dans MongoDB, partagée par des workers
+    répartis sur plusieurs machines. Même fonctionnement que SqliteJobQueue :
+    chaque réservation est un find_one_and_update atomique.
+
+    Les échéances sont des horodatages absolus : les horloges des machines
+    doivent être synchronisées (NTP).
+    """
+
+    def __init__(self, collection, rate_collection, lease_seconds=QUEUE_LEASE_SECONDS,
+                 max_attempts=QUEUE_MAX_ATTEMPTS):
+        self.collection = collection
+        self.rate_collection = rate_collection
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # L'URL est la clé (_id) : une URL n'est mise en file qu'une fois
+        collection.create_index([('status', ASCENDING), ('lease_until', ASCENDING)])
+        collection.create_index([('status', ASCENDING), ('enqueued_at', ASCENDING)])
+
+    def enqueue(self, urls, source=None):
+        now = time.time()
+        urls = list(urls)
+        reopened = self.collection.update_many(
+            {'_id': {'$in': urls}, 'status': {'$in': [JOB_DONE, JOB_FAILED]}},
+            {'$set': {'source': source, 'status': JOB_PENDING, 'attempts': 0, 'last_error': None,
+                      'enqueued_at': now}}
+        ).modified_count
+        operations = [
+            UpdateOne({'_id': url}, {'$setOnInsert': {
+                'source': source, 'status': JOB_PENDING, 'attempts': 0, 'enqueued_at': now
+            }}, upsert=True)
+            for url in urls
+        ]
+        if not operations:
+            return reopened
+        return reopened + self.collection.bulk_write(operations, ordered=False).upserted_count
+
+    def _requeue_expired(self, now):
+        expired = {'status': JOB_LEASED, 'lease_until': {'$lt': now}}
+        self.collection.update_many(
+            {**expired, 'attempts': {'$gte': self.max_attempts}},
+            {'$set': {'status': JOB_FAILED, 'last_error': 'réservation expirée'}}
+        )
+        self.collection.update_many(expired, {'$set': {'status': JOB_PENDING, 'last_error': 'réservation expirée'}})
+
+    def claim(self, worker_id, limit=1):
+        now = time.time()
+        self._requeue_expired(now)
+        jobs = []
+        for _ in range(limit):
+            job = self.collection.find_one_and_update(
+                {'status': JOB_PENDING},
+                {'$set': {'status': JOB_LEASED, 'lease_until': now + self.lease_seconds, 'worker': worker_id},
+                 '$inc': {'attempts': 1}},
+                sort=[('enqueued_at', ASCENDING)],
+                return_document=ReturnDocument.AFTER
+            )
+            if job is None:
+                break
+            jobs.append((job['_id'], job.get('source')))
+        return jobs
+
+    def ack(self, urls):
+        if urls:
+            self.collection.update_many(
+                {'_id': {'$in': list(urls)}}, {'$set': {'status': JOB_DONE, 'lease_until': None}}
+            )
+
+    def fail(self, url, error):
+        job = self.collection.find_one({'_id': url}, {'attempts': 1})
+        status = JOB_FAILED if job and job.get('attempts', 0) >= self.max_attempts else JOB_PENDING
+        self.collection.update_one(
+            {'_id': url}, {'$set': {'status': status, 'lease_until': None, 'last_error': str(error)[:500]}}
+        )
+
+    def active_count(self):
+        return self.collection.count_documents({'status': {'$in': [JOB_PENDING, JOB_LEASED]}})
+
+    def _update_slot(self, name, compute):
+        # Mise à jour optimiste (compare-and-set) du prochain créneau du limiteur
+        while True:
+            state = self.rate_collection.find_one({'_id': name})
+            now = time.time()
+            if state is None:
+                next_slot, result = compute(now, now)
+                try:
+                    self.rate_collection.insert_one({'_id': name, 'next_slot': next_slot})
+                    return result
+                except DuplicateKeyError:
+                    continue
+            next_slot, result = compute(state['next_slot'], now)
+            updated = self.rate_collection.update_one(
+                {'_id': name, 'next_slot': state['next_slot']}, {'$set': {'next_slot': next_slot}}
+            )
+            if updated.matched_count:
+                return result
+
+    def reserve_slot(self, name, interval, burst=1):
+        def reserve(next_slot, now):
+            slot = max(next_slot, now - (burst - 1) * interval)
+            return slot + interval, max(0.0, slot - now)
+        return self._update_slot(name, reserve)
+
+    def delay(self, name, seconds):
+        self._update_slot(name, lambda next_slot, now: (max(next_slot, now + seconds), None))
+
+    def stats(self):
+        cursor = self.collection.aggregate([{'$group': {'_id': '$status', 'count': {'$sum': 1}}}])
+        return {doc['_id']: doc['count'] for doc in cursor}
+
+    def close(self):
+        pass
+
+
+def open_job_queue(backend, db=None):
+    """File de tâches configurée : 'sqlite' (une machine) ou 'mongo' (plusieurs machines, base `db`)."""
+    if backend == 'mongo':
+        logger.info(f"File de tâches MongoDB: {QUEUE_COLLECTION_NAME}")
+        return MongoJobQueue(db[QUEUE_COLLECTION_NAME], db[f"{QUEUE_COLLECTION_NAME}_rate_limits"])
+    logger.info(f"File de tâches SQLite: {QUEUE_PATH}")
+    return SqliteJobQueue()
@@ -0,0 +1,171 @@
+import multiprocessing
+import os
+import socket
+import time
+
+from scraper import BlogDuModerateurScraper
+from mongo_utils import get_mongo_connection
+from http_cache import HttpCache
+from writer import BulkArticleWriter
+from fingerprint import NearDuplicateDetector
+from rate_limiter import SharedRateLimiter
+from job_queue import open_job_queue
+from archive import HtmlArchive
+from http_client import NOT_MODIFIED
+from metrics import metrics
+from config import (
+    logger, USE_HTTP_CACHE, ARCHIVE_ENABLED, NEAR_DUPLICATE_POLICY, QUEUE_BACKEND, QUEUE_WORKERS,
+    QUEUE_CLAIM_BATCH, QUEUE_POLL_INTERVAL
+)
+
+
+def enqueue_discovered(scraper, job_queue, **limits):
+    """Met en file les articles découverts (pages de catégories ou sitemaps). Renvoie le nombre ajouté."""
+    total = 0
+    for source, article_urls in scraper.iter_article_batches(**limits):
+        added = job_queue.enqueue(article_urls, source['name'])
+        logger.info(f"{added} articles mis en file ({source['name']})")
+        total += added
+    return total
+
+
+class JobWorker:
+    """
+    Worker d'un crawl réparti : réserve des lots de tâches dans la file,
+    récupère et analyse les articles (scrape_article) puis les écrit.
+
+    Une tâche n'est confirmée (ack) qu'une fois son article écrit (URLs
+    confirmées par l'écriture groupée) : si l'écriture échoue ou si le
+    worker s'arrête avant, la réservation expire et la tâche est reprise
+    par un autre worker.
+    """
+
+    def __init__(self, scraper, job_queue, writer, detector=None, worker_id=None,
+                 claim_batch=QUEUE_CLAIM_BATCH, poll_interval=QUEUE_POLL_INTERVAL):
+        self.scraper = scraper
+        self.job_queue = job_queue
+        self.writer = writer
+        self.detector = detector
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.claim_batch = claim_batch
+        self.poll_interval = poll_interval
+        self._to_ack = set()
+        self.processed = 0
+
+    def checkpoint(self, urls):
+        """Confirme les tâches dont les articles viennent d'être écrits (appelé après chaque écriture groupée)."""
+        if self.scraper.cache:
+            self.scraper.cache.confirm(urls)
+        written = self._to_ack.intersection(urls)
+        if written:
+            self.job_queue.ack(list(written))
+            self._to_ack -= written
+
+    def _fail_unwritten(self):
+        # Tampon d'écriture vide : les tâches non confirmées sont celles dont l'écriture a échoué
+        for article_url in self._to_ack:
+            self.job_queue.fail(article_url, "écriture non confirmée")
+        self._to_ack = set()
+
+    def _process(self, article_url, source):
+        try:
+            article_data = self.scraper.scrape_article(article_url)
+        except Exception as e:
+            logger.error(f"Erreur scraping article {article_url}: {e}")
+            metrics.increment('articles_failed_total')
+            self.job_queue.fail(article_url, e)
+            return
+        if article_data is None:
+            metrics.increment('articles_failed_total')
+            self.job_queue.fail(article_url, "page indisponible")
+            return
+
+        if article_data is NOT_MODIFIED:
+            metrics.increment('articles_skipped_total', reason='unchanged')
+        elif not article_data['title']:
+            metrics.increment('articles_skipped_total', reason='no_title')
+        elif self.detector is None or self.detector.check(article_data):
+            article_data['source_category'] = source
+            metrics.increment('articles_scraped_total')
+            self._to_ack.add(article_url)
+            self.writer.add(article_data)
+            return
+        # Article ignoré (inchangé, sans titre, quasi-doublon) : rien à écrire, la tâche est terminée
+        if self.scraper.cache:
+            self.scraper.cache.confirm([article_url])
+        self.job_queue.ack([article_url])
+
+    def run(self):
+        """Traite les tâches jusqu'à ce que la file ne contienne plus rien d'actif."""
+        logger.info(f"Worker {self.worker_id} démarré")
+        while True:
+            jobs = self.job_queue.claim(self.worker_id, self.claim_batch)
+            if not jobs:
+                # Les tâches en attente d'écriture sont celles de ce worker : elles sont
+                # écrites et confirmées avant d'attendre (sinon leur bail expirerait)
+                self.writer.flush()
+                self._fail_unwritten()
+                if not self.job_queue.active_count():
+                    break
+                # Tâches réservées par d'autres workers : elles peuvent revenir en file à expiration
+                time.sleep(self.poll_interval)
+                continue
+            for article_url, source in jobs:
+                self._process(article_url, source)
+                self.processed += 1
+        logger.info(f"Worker {self.worker_id} terminé: {self.processed} tâches traitées")
+
+
+def run_worker(backend=QUEUE_BACKEND):
+    """
+    Point d'entrée d'un processus worker : ouvre ses propres connexions
+    (MongoDB, file de tâches, session HTTP) et partage le débit global via
+    le SharedRateLimiter.
+    """
+    client, collection = get_mongo_connection()
+    job_queue = open_job_queue(backend, collection.database)
+    scraper = None
+    try:
+        # Les articles en file doivent être analysés même inchangés (304) : skip_unchanged désactivé
+        scraper = BlogDuModerateurScraper(
+            rate_limiter=SharedRateLimiter(job_queue),
+            cache=HttpCache() if USE_HTTP_CACHE else None,
+            skip_unchanged=False,
+            archive=HtmlArchive() if ARCHIVE_ENABLED else None
+        )
+        detector = NearDuplicateDetector(collection) if NEAR_DUPLICATE_POLICY != 'off' else None
+        writer = BulkArticleWriter(collection)
+        worker = JobWorker(scraper, job_queue, writer, detector)
+        writer.on_flush = worker.checkpoint
+        try:
+            worker.run()
+        finally:
+            writer.close()
+        metrics.log_summary()
+    finally:
+        if scraper:
+            scraper.close()
+        job_queue.close()
+        client.close()
+
+
+def run_workers(count=QUEUE_WORKERS, backend=QUEUE_BACKEND):
+    """Lance `count` processus workers et attend leur fin."""
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(backend,), name=f"worker-{i}")
+        for i in range(count)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        raise
+
+
+if __name__ == "__main__":
+    # Worker supplémentaire (autre machine, QUEUE_BACKEND = 'mongo') : ne fait que consommer la file
+    run_worker()
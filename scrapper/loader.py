@@ -0,0 +1,90 @@
+import argparse
+import glob
+import gzip
+import json
+import os
+import zlib
+
+from config import logger, EXPORT_DIR, LOAD_BATCH_SIZE
+from sinks import PYARROW_AVAILABLE, row_to_article
+from writer import BulkArticleWriter
+from mongo_utils import get_mongo_connection
+
+if PYARROW_AVAILABLE:
+    import pyarrow.parquet as pq
+
+
+def iter_export_file(path, batch_size=LOAD_BATCH_SIZE):
+    """Articles d'un fichier exporté (.jsonl.gz ou .parquet), lus au fil de l'eau."""
+    if path.endswith('.parquet'):
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError(f"pyarrow n'est pas installé : impossible de lire {path}")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            for row in batch.to_pylist():
+                yield row_to_article(row)
+        return
+
+    line_number = 0
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    # Dernière ligne d'un fichier interrompu en cours d'écriture
+                    logger.warning(f"Ligne {line_number} illisible dans {path}: {e}")
+    except (EOFError, zlib.error, gzip.BadGzipFile) as e:
+        # Fichier tronqué (export interrompu) : les lignes déjà lues sont conservées
+        logger.warning(f"Fichier {path} tronqué après la ligne {line_number}: {e}")
+
+
+def load_files(paths, collection, batch_size=LOAD_BATCH_SIZE):
+    """
+    Importe des fichiers exportés dans la collection des articles, par
+    écritures groupées (upserts par URL : un fichier peut être rechargé
+    sans créer de doublons). Renvoie le bilan des écritures.
+    """
+    writer = BulkArticleWriter(collection, batch_size=batch_size, flush_interval=float('inf'))
+    try:
+        for path in paths:
+            logger.info(f"Import de {path}")
+            count = 0
+            for article_data in iter_export_file(path, batch_size):
+                writer.add(article_data)
+                count += 1
+            logger.info(f"{count} articles lus dans {path}")
+    finally:
+        writer.close()
+    return writer.stats()
+
+
+def expand_paths(paths):
+    """Fichiers à importer : chemins explicites, ou tous les fichiers exportés d'un répertoire."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, 'articles-*.jsonl.gz'))))
+            files.extend(sorted(glob.glob(os.path.join(path, 'articles-*.parquet'))))
+        else:
+            files.append(path)
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import dans MongoDB des articles exportés en fichiers")
+    parser.add_argument('paths', nargs='*', default=[EXPORT_DIR],
+                        help="Fichiers .jsonl.gz / .parquet ou répertoires d'export")
+    parser.add_argument('--batch-size', type=int, default=LOAD_BATCH_SIZE, help="Articles par écriture groupée")
+    args = parser.parse_args(argv)
+
+    client, collection = get_mongo_connection()
+    try:
+        load_files(expand_paths(args.paths), collection, args.batch_size)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
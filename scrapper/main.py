@@ -1,38 +1,138 @@
+import argparse
+
 from scraper import BlogDuModerateurScraper
-from mongo_utils import get_mongo_connection
-from config import logger
+from mongo_utils import get_mongo_connection, make_known_url_filter, get_last_scrape_date
+from http_cache import HttpCache
+from pipeline import ArticlePipeline
+from sinks import open_sink
+from archive import HtmlArchive
+from frontier import CrawlFrontier
+from fingerprint import NearDuplicateDetector
+from metrics import metrics
+from rate_limiter import SharedRateLimiter
+from job_queue import open_job_queue
+from job_worker import enqueue_discovered, run_workers
+from config import (
+    logger, ASYNC_MODE, USE_HTTP_CACHE, INCREMENTAL_MODE, FORCE_REFRESH, PIPELINE_MODE, DISCOVERY_MODE,
+    USE_FRONTIER, NEAR_DUPLICATE_POLICY, METRICS_EXPORT_PATH, METRICS_EXPORT_FORMAT, QUEUE_MODE, QUEUE_BACKEND,
+    OUTPUT_SINK, EXPORT_DIR, ARCHIVE_ENABLED
+)
+
+# Paramètres du scraping :
+# - max_categories : Nombre maximum de catégories à traiter
+# - max_pages_per_category : Nombre maximum de pages par catégorie
+# - max_articles_per_category : Nombre maximum d'articles par catégorie
+SCRAPING_LIMITS = {
+    'max_categories': 5,
+    'max_pages_per_category': 3,
+    'max_articles_per_category': 15
+}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scraper du Blog du Modérateur")
+    parser.add_argument('--max-categories', type=int, default=SCRAPING_LIMITS['max_categories'],
+                        help="Nombre maximum de catégories à traiter")
+    parser.add_argument('--max-pages', type=int, default=SCRAPING_LIMITS['max_pages_per_category'],
+                        help="Nombre maximum de pages par catégorie")
+    parser.add_argument('--max-articles', type=int, default=SCRAPING_LIMITS['max_articles_per_category'],
+                        help="Nombre maximum d'articles par catégorie")
+    parser.add_argument('--discovery', choices=['listing', 'sitemap'], default=DISCOVERY_MODE,
+                        help="Découverte par les pages de catégories ou par les sitemaps")
+    parser.add_argument('--max-total', type=int,
+                        help="Nombre maximum d'articles découverts par les sitemaps "
+                             "(par défaut : max-categories x max-articles)")
+    parser.add_argument('--sink', choices=['mongo', 'jsonl', 'parquet'], default=OUTPUT_SINK,
+                        help="Destination des articles (les fichiers s'importent ensuite avec loader.py)")
+    parser.add_argument('--output-dir', default=EXPORT_DIR, help="Répertoire des fichiers exportés")
+    return parser.parse_args(argv)
 
-def main():
+def main(argv=None):
+    args = parse_args(argv)
+    limits = {
+        'max_categories': args.max_categories,
+        'max_pages_per_category': args.max_pages,
+        'max_articles_per_category': args.max_articles
+    }
+    completed = False
     try:
-        # Initialisation de la connexion MongoDB
-        client, collection = get_mongo_connection()
-
-        # Initialisation du scraper
-        scraper = BlogDuModerateurScraper()
-
-        # Lancement du scraping avec les paramètres suivants :
-        # - max_categories : Nombre maximum de catégories à traiter
-        # - max_pages_per_category : Nombre maximum de pages par catégorie
-        # - max_articles_per_category : Nombre maximum d'articles par catégorie
-        for article_data in scraper.run_scraper(
-            max_categories=5,
-            max_pages_per_category=3,
-            max_articles_per_category=15
-        ):
-            try:
-                # Vérification si l'article existe déjà en base (par titre)
-                existing = collection.find_one({'title': article_data['title']})
-
-                if not existing:
-                    # Insertion du nouvel article en base
-                    collection.insert_one(article_data)
-                    logger.info(f"Nouvel article sauvegardé: {article_data['title']}")
-                else:
-                    logger.info(f"Article déjà existant: {article_data['title']}")
-
-            except Exception as e:
-                # En cas d'erreur lors de la sauvegarde, logge le message
-                logger.error(f"Erreur sauvegarde: {e}")
+        # Connexion MongoDB, sauf export en fichiers (le mode incrémental et la détection
+        # des quasi-doublons se limitent alors à l'exécution en cours)
+        collection = None
+        if args.sink == 'mongo' or QUEUE_MODE:
+            client, collection = get_mongo_connection()
+        known_url_filter = make_known_url_filter(collection) if INCREMENTAL_MODE and collection is not None else None
+
+        # Découverte des articles : pages de catégories ou sitemaps XML (articles connus repris selon <lastmod>)
+        discovery = {'discovery': args.discovery}
+        if args.discovery == 'sitemap':
+            # Même volume par défaut que la découverte par catégories
+            discovery['max_articles'] = args.max_total or args.max_categories * args.max_articles
+            if known_url_filter and not FORCE_REFRESH:
+                discovery['since'] = get_last_scrape_date(collection)
+
+        if QUEUE_MODE:
+            # Crawl réparti : les articles découverts sont mis en file puis traités par des
+            # processus workers (d'autres machines peuvent lancer job_worker.py avec le backend
+            # 'mongo'). Le débit est partagé par tous via le stockage de la file.
+            job_queue = open_job_queue(QUEUE_BACKEND, collection.database)
+            scraper = BlogDuModerateurScraper(
+                rate_limiter=SharedRateLimiter(job_queue),
+                known_url_filter=known_url_filter,
+                force_refresh=FORCE_REFRESH
+            )
+            if args.sink != 'mongo':
+                logger.warning("Mode file de tâches : les workers écrivent dans MongoDB")
+            added = enqueue_discovered(scraper, job_queue, **limits, **discovery)
+            logger.info(f"{added} articles mis en file, file de tâches: {job_queue.stats()}")
+            run_workers(backend=QUEUE_BACKEND)
+            logger.info(f"Bilan de la file de tâches: {job_queue.stats()}")
+            completed = True
+            return
+
+        # Frontière persistante : un crawl interrompu reprend là où il s'était arrêté.
+        frontier = CrawlFrontier() if USE_FRONTIER else None
+        # Cache HTTP : une page n'est revalidée (304) qu'une fois son article écrit
+        cache = HttpCache() if USE_HTTP_CACHE else None
+
+        def confirm(urls):
+            # Articles écrits (ou écartés) : terminés dans la frontière, entrées du cache confirmées
+            if frontier:
+                frontier.checkpoint(urls)
+            if cache:
+                cache.confirm(urls)
+
+        # Les articles sont confirmés avec les URLs de chaque écriture acquittée
+        writer = open_sink(args.sink, collection, args.output_dir, on_flush=confirm)
+
+        # Quasi-doublons (articles repris ou renommés) : liés à l'original ou ignorés avant écriture
+        detector = NearDuplicateDetector(collection) if NEAR_DUPLICATE_POLICY != 'off' else None
+
+        def store(article_data):
+            if detector is None or detector.check(article_data):
+                writer.add(article_data)
+            else:
+                # Quasi-doublon ignoré : rien à écrire, l'article est terminé
+                confirm([article_data['url']])
+
+        # Initialisation du scraper (mode asynchrone et cache HTTP selon la configuration)
+        scraper = BlogDuModerateurScraper(
+            async_mode=ASYNC_MODE,
+            cache=cache,
+            known_url_filter=known_url_filter,
+            force_refresh=FORCE_REFRESH,
+            frontier=frontier,
+            archive=HtmlArchive() if ARCHIVE_ENABLED else None
+        )
+
+        if PIPELINE_MODE:
+            # Pipeline récupération (threads) / analyse (processus) / écriture
+            pipeline = ArticlePipeline(scraper)
+            pipeline.run(scraper.iter_article_jobs(**limits, **discovery), store)
+        else:
+            # Les articles sont mis en tampon et écrits par lots (upsert par URL)
+            for article_data in scraper.run_scraper(**limits, **discovery):
+                store(article_data)
+        completed = True
 
     except KeyboardInterrupt:
         # Gestion de l'interruption par l'utilisateur (Ctrl+C)
@@ -43,9 +143,26 @@ def main():
         logger.error(f"Erreur fatale: {e}")
 
     finally:
-        # Fermeture des connexions (MongoDB et session HTTP)
+        # Écriture des articles restants puis fermeture des connexions (MongoDB et session HTTP)
+        if 'writer' in locals():
+            writer.close()
+        if locals().get('detector'):
+            logger.info(f"Quasi-doublons détectés: {detector.duplicates}")
+        if 'frontier' in locals() and frontier:
+            # Crawl terminé : la prochaine exécution repart de zéro
+            if completed:
+                frontier.complete()
+            frontier.close()
+        if 'job_queue' in locals():
+            job_queue.close()
         if 'client' in locals():
             client.close()
+        if 'scraper' in locals():
+            scraper.close()
+        elif locals().get('cache'):
+            cache.close()
+        if METRICS_EXPORT_PATH:
+            metrics.dump(METRICS_EXPORT_PATH, METRICS_EXPORT_FORMAT)
         logger.info("Fermeture du scraper")
 
 if __name__ == "__main__":
@@ -0,0 +1,258 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from config import logger, METRICS_ENABLED
+
+# Bornes supérieures des histogrammes (secondes pour les durées, octets pour les tailles)
+TIME_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (1024, 10240, 51200, 102400, 262144, 524288, 1048576, 5242880)
+
+# Descriptions des métriques exportées (format Prometheus)
+DESCRIPTIONS = {
+    'fetch_seconds': "Durée des requêtes HTTP",
+    'response_bytes': "Taille des pages téléchargées",
+    'parse_seconds': "Durée de construction de l'arbre HTML",
+    'extract_seconds': "Durée des extracteurs",
+    'db_write_seconds': "Durée des écritures groupées MongoDB",
+    'bytes_downloaded_total': "Octets téléchargés",
+    'http_requests_total': "Requêtes HTTP par statut",
+    'http_errors_total': "Erreurs réseau ou HTTP (ou page trop volumineuse)",
+    'http_retries_total': "Nouvelles tentatives (429/503/erreur réseau)",
+    'pages_not_modified_total': "Réponses 304 servies par le cache",
+    'pages_truncated_total': "Téléchargements arrêtés après le marqueur de fin de lecture",
+    'articles_scraped_total': "Articles extraits",
+    'articles_failed_total': "Articles en échec",
+    'articles_skipped_total': "Articles ignorés",
+    'articles_written_total': "Articles écrits en base",
+}
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items()))) if labels else (name, ())
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Dernière case : au-delà de la plus grande borne
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.count += other.count
+        self.sum += other.sum
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        """Estimation d'un quantile : borne supérieure de la case qui le contient."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+
+class MetricsRegistry:
+    """
+    Compteurs et histogrammes du crawl, partagés par tous les threads.
+
+    Les durées passent par span(), qui appelle aussi les fonctions de trace
+    enregistrées avec add_trace_hook(hook) : hook('start', nom, labels) puis
+    hook('end', nom, labels, durée). Elles permettent de brancher un profileur
+    sans modifier le code instrumenté ; sans fonction de trace et avec
+    METRICS_ENABLED à False, l'instrumentation se réduit à un test.
+    """
+
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._hooks = []
+
+    def add_trace_hook(self, hook):
+        self._hooks.append(hook)
+
+    def remove_trace_hook(self, hook):
+        self._hooks.remove(hook)
+
+    def increment(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=TIME_BUCKETS, **labels):
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def span(self, name, **labels):
+        """Mesure la durée du bloc dans l'histogramme `name`."""
+        if not self.enabled and not self._hooks:
+            yield
+            return
+        for hook in self._hooks:
+            hook('start', name, labels)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.observe(name, duration, **labels)
+            for hook in self._hooks:
+                hook('end', name, labels, duration)
+
+    def timed(self, name, function, *args, **labels):
+        """Appelle function(*args) en mesurant sa durée."""
+        with self.span(name, **labels):
+            return function(*args)
+
+    # --- Échange entre processus (pipeline : analyse dans un ProcessPoolExecutor)
+
+    def reset(self):
+        """
+        Remet le registre à zéro dans un processus du pool (initializer) : avec
+        la méthode de démarrage fork, il hérite des mesures (et du verrou) du
+        processus principal, qui seraient sinon renvoyées et comptées deux fois.
+        """
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def drain(self):
+        """Renvoie les mesures accumulées puis les remet à zéro."""
+        with self._lock:
+            snapshot = (self._counters, self._histograms)
+            self._counters, self._histograms = {}, {}
+        return snapshot
+
+    def merge(self, snapshot):
+        counters, histograms = snapshot
+        with self._lock:
+            for key, value in counters.items():
+                self._counters[key] = self._counters.get(key, 0) + value
+            for key, histogram in histograms.items():
+                if key in self._histograms:
+                    self._histograms[key].merge(histogram)
+                else:
+                    self._histograms[key] = histogram
+
+    # --- Restitution
+
+    def summary(self):
+        """Résumé lisible : compteurs puis histogrammes (nombre, moyenne, p50, p95, max)."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+        lines = ["Métriques du crawl:"]
+        for (name, labels), value in counters:
+            lines.append(f"  {name}{_format_labels(labels)}: {value}")
+        for (name, labels), histogram in histograms:
+            if not histogram.count:
+                continue
+            mean = histogram.sum / histogram.count
+            lines.append(
+                f"  {name}{_format_labels(labels)}: n={histogram.count} total={histogram.sum:.3f} "
+                f"moyenne={mean:.4f} p50<={histogram.quantile(0.5):.4g} "
+                f"p95<={histogram.quantile(0.95):.4g} max={histogram.max:.4g}"
+            )
+        return '\n'.join(lines)
+
+    def log_summary(self):
+        if self.enabled:
+            logger.info(self.summary())
+
+    def to_prometheus(self):
+        """Export au format texte de Prometheus."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+        lines = []
+        described = set()
+
+        def header(name, kind):
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP scraper_{name} {DESCRIPTIONS.get(name, name)}")
+                lines.append(f"# TYPE scraper_{name} {kind}")
+
+        for (name, labels), value in counters:
+            header(name, 'counter')
+            lines.append(f"scraper_{name}{_format_labels(labels)} {value}")
+        for (name, labels), histogram in histograms:
+            header(name, 'histogram')
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                cumulative += count
+                bucket_labels = labels + (('le', str(bound)),)
+                lines.append(f"scraper_{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+            lines.append(f"scraper_{name}_sum{_format_labels(labels)} {histogram.sum}")
+            lines.append(f"scraper_{name}_count{_format_labels(labels)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def to_dict(self):
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+        return {
+            'counters': [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in counters
+            ],
+            'histograms': [
+                {
+                    'name': name, 'labels': dict(labels), 'count': h.count, 'sum': h.sum,
+                    'min': h.min, 'max': h.max, 'buckets': list(h.buckets), 'bucket_counts': h.counts
+                }
+                for (name, labels), h in histograms
+            ],
+        }
+
+    def dump(self, path, export_format='prometheus'):
+        """Écrit les métriques dans un fichier ('prometheus' ou 'json')."""
+        with open(path, 'w', encoding='utf-8') as f:
+            if export_format == 'json':
+                json.dump(self.to_dict(), f, indent=2)
+            else:
+                f.write(self.to_prometheus())
+        logger.info(f"Métriques exportées dans {path}")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}'
+
+
+# Registre du processus, utilisé par tous les modules instrumentés
+metrics = MetricsRegistry()
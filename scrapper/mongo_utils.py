@@ -1,5 +1,10 @@
+from datetime import datetime, timezone
 from pymongo import MongoClient
-from config import logger, MONGO_URI, DB_NAME, COLLECTION_NAME
+from config import (
+    logger, MONGO_URI, DB_NAME, COLLECTION_NAME, INGEST_STATE_COLLECTION_NAME, SEARCH_TEXT_MAX_CHARS
+)
+from index_manager import ensure_indexes
+from article_store import ArticleStore
 
 def get_mongo_connection():
     try:
@@ -10,8 +15,12 @@ def get_mongo_connection():
         db = client[DB_NAME]
         collection = db[COLLECTION_NAME]
 
-        # Création d'un index unique sur le champ 'title' pour éviter les doublons
-        collection.create_index([("title", 1)], unique=True)
+        # Index déclarés dans index_manager (filtres, tri des résultats, quasi-doublons, texte)
+        ensure_indexes(collection)
+        # Clés normalisées des filtres pour les articles enregistrés avant leur ajout
+        ensure_filter_keys(collection)
+        # Texte de recherche des articles enregistrés avec une limite plus grande
+        ensure_search_text_size(collection)
 
         logger.info(f"Connexion MongoDB établie - Base: {DB_NAME}")
         return client, collection
@@ -20,3 +29,70 @@ def get_mongo_connection():
         # En cas d'erreur, logge le message et relance l'exception
         logger.error(f"Erreur connexion MongoDB: {e}")
         raise
+
+def ensure_filter_keys(collection):
+    """
+    Renseigne une fois pour toutes les clés normalisées des filtres des
+    articles existants (les filtres du front ne portent que sur ces clés).
+    La migration est notée dans le document d'état de la collection :
+    les connexions suivantes ne la refont pas.
+    """
+    state = collection.database[INGEST_STATE_COLLECTION_NAME]
+    if state.find_one({'_id': collection.name, 'filter_keys_ready': True}, {'_id': 1}):
+        return
+    if ArticleStore(collection).backfill_filter_keys():
+        bump_ingest_generation(collection)
+    state.update_one({'_id': collection.name}, {'$set': {'filter_keys_ready': True}}, upsert=True)
+
+def ensure_search_text_size(collection, max_chars=SEARCH_TEXT_MAX_CHARS):
+    """
+    Ramène une fois les `search_text` existants à `max_chars` caractères :
+    la limite appliquée est notée dans le document d'état de la collection.
+    """
+    state = collection.database[INGEST_STATE_COLLECTION_NAME]
+    if state.find_one({'_id': collection.name, 'search_text_max_chars': {'$lte': max_chars}}, {'_id': 1}):
+        return
+    if ArticleStore(collection).shrink_search_text(max_chars):
+        bump_ingest_generation(collection)
+    state.update_one({'_id': collection.name}, {'$set': {'search_text_max_chars': max_chars}}, upsert=True)
+
+def bump_ingest_generation(collection):
+    """
+    Incrémente le compteur de génération des articles : le front (cache des
+    filtres et statistiques) sait ainsi que la collection a changé.
+    """
+    collection.database[INGEST_STATE_COLLECTION_NAME].update_one(
+        {'_id': collection.name},
+        {'$inc': {'generation': 1}, '$set': {'updated_at': datetime.now(timezone.utc)}},
+        upsert=True
+    )
+
+def load_known_urls(collection):
+    """Charge en une seule requête l'ensemble des URLs d'articles déjà stockés."""
+    cursor = collection.find({'url': {'$exists': True}}, {'url': 1, '_id': 0})
+    return {doc['url'] for doc in cursor}
+
+def find_known_urls(collection, urls):
+    """Renvoie, parmi les URLs candidates, celles déjà stockées (une requête $in groupée)."""
+    cursor = collection.find({'url': {'$in': list(urls)}}, {'url': 1, '_id': 0})
+    return {doc['url'] for doc in cursor}
+
+def make_known_url_filter(collection, preload=True):
+    """
+    Construit le filtre d'URLs connues utilisé par le mode incrémental du scraper :
+    - preload=True : toutes les URLs sont chargées une fois en mémoire ;
+    - preload=False : chaque page de catégorie déclenche une requête $in groupée.
+    """
+    if preload:
+        known_urls = load_known_urls(collection)
+        logger.info(f"{len(known_urls)} articles déjà connus en base")
+        return lambda urls: known_urls.intersection(urls)
+    return lambda urls: find_known_urls(collection, urls)
+
+def get_last_scrape_date(collection):
+    """Date (UTC) du dernier article récupéré, utilisée comme seuil <lastmod> des sitemaps."""
+    last = collection.find_one({'scraped_at': {'$exists': True}}, {'scraped_at': 1}, sort=[('scraped_at', -1)])
+    if not last:
+        return None
+    # scraped_at est enregistré en heure locale sans fuseau
+    return datetime.fromisoformat(last['scraped_at']).astimezone(timezone.utc)
@@ -0,0 +1,108 @@
+from bs4 import BeautifulSoup, SoupStrainer
+from config import logger, PARSER_BACKEND, RESTRICTED_PARSE
+from metrics import metrics
+
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+
+def get_parser_name(backend=PARSER_BACKEND):
+    """
+    Choisit le parseur utilisé par BeautifulSoup :
+    - 'auto' : lxml (accéléré en C) s'il est installé, sinon html.parser ;
+    - 'lxml' : lxml, avec repli sur html.parser s'il est absent ;
+    - tout autre nom est transmis tel quel à BeautifulSoup.
+    """
+    if backend in ('auto', 'lxml'):
+        if LXML_AVAILABLE:
+            return 'lxml'
+        if backend == 'lxml':
+            logger.warning("lxml n'est pas installé, utilisation de html.parser")
+        return 'html.parser'
+    return backend
+
+
+class RegionStrainer(SoupStrainer):
+    """
+    Filtre de construction de l'arbre : seules les balises d'intérêt (et tout
+    leur sous-arbre) sont conservées, le reste de la page (en-tête, pied de
+    page, barres latérales, scripts) n'est jamais instancié.
+
+    Une balise est retenue si son nom, une de ses classes, son id ou son
+    attribut rel figure dans les ensembles fournis.
+    """
+
+    def __init__(self, tag_names=(), classes=(), ids=(), rels=()):
+        super().__init__()
+        self.tag_names = set(tag_names)
+        self.classes = set(classes)
+        self.ids = set(ids)
+        self.rels = set(rels)
+
+    @staticmethod
+    def _tokens(value):
+        if not value:
+            return []
+        return value.split() if isinstance(value, str) else list(value)
+
+    def wants(self, name, attrs):
+        if name in self.tag_names:
+            return True
+        attrs = attrs or {}
+        if attrs.get('id') in self.ids:
+            return True
+        if self.classes.intersection(self._tokens(attrs.get('class'))):
+            return True
+        return ' '.join(self._tokens(attrs.get('rel'))) in self.rels
+
+    # BeautifulSoup >= 4.13
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return self.wants(name, attrs)
+
+    def allow_string_creation(self, string):
+        return False
+
+    # BeautifulSoup < 4.13
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        return self.wants(markup_name, dict(markup_attrs) if markup_attrs else {})
+
+
+# Régions conservées en mode d'analyse restreinte
+STRAINERS = {
+    # Page d'article : balises <meta>, <main>, <article>, titre, dates et toutes
+    # les zones ciblées par les sélecteurs des extracteurs (<main> est conservé
+    # pour le sélecteur de repli 'main article' du contenu)
+    'article': RegionStrainer(
+        tag_names={'meta', 'main', 'article', 'h1', 'time'},
+        classes={
+            'entry-content', 'post-content', 'article-content',
+            'entry-title', 'post-title',
+            'post-thumbnail', 'entry-image', 'featured-image',
+            'summary-section', 'table-of-contents', 'toc', 'wp-block-table-of-contents',
+            'entry-excerpt', 'post-excerpt', 'article-excerpt', 'summary',
+            'entry-date', 'post-date', 'published',
+            'entry-author', 'post-author', 'author', 'byline',
+            'meta-container', 'favtag', 'post-category', 'entry-category', 'category'
+        },
+        ids={'section-meta'},
+        rels={'author'}
+    ),
+    # Page de liste d'une catégorie : uniquement les <article>
+    'listing': SoupStrainer('article'),
+    # Liste des dossiers : uniquement la liste des catégories
+    'categories': SoupStrainer('ul', class_='tags-list'),
+}
+
+
+def make_soup(content, region=None, restricted=RESTRICTED_PARSE):
+    """
+    Construit l'arbre BeautifulSoup d'une page avec le parseur configuré.
+    Si `restricted` est activé et qu'une région connue est indiquée
+    ('article', 'listing', 'categories'), seule cette région est construite.
+    """
+    parse_only = STRAINERS.get(region) if restricted else None
+    with metrics.span('parse_seconds', region=region or 'page'):
+        return BeautifulSoup(content, get_parser_name(), parse_only=parse_only)
@@ -0,0 +1,192 @@
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import requests
+from config import (
+    logger, USER_AGENT, PIPELINE_FETCH_WORKERS, PIPELINE_PARSE_WORKERS,
+    PIPELINE_FETCH_QUEUE_SIZE, PIPELINE_WRITE_QUEUE_SIZE
+)
+from http_client import fetch_url, NOT_MODIFIED
+from scraper import parse_article_html
+from metrics import metrics
+
+# Marqueur de fin de flux transmis entre les étapes
+_END = object()
+
+
+def parse_article_in_worker(article_url, content):
+    """
+    Analyse exécutée dans un processus du pool : les mesures du processus
+    sont renvoyées avec l'article pour être fusionnées dans le registre principal.
+    """
+    try:
+        return parse_article_html(article_url, content), metrics.drain()
+    except Exception:
+        metrics.drain()
+        raise
+
+
+class ArticlePipeline:
+    """
+    Pipeline en trois étapes pour le scraping des articles :
+
+    1. récupération : des threads téléchargent les pages et déposent le HTML
+       brut dans une file bornée ;
+    2. analyse : un ProcessPoolExecutor construit l'arbre BeautifulSoup et
+       exécute tous les extracteurs (parse_article_html) ;
+    3. écriture : les articles analysés sont transmis, dans le thread appelant,
+       à la fonction d'écriture.
+
+    Chaque file est bornée : une étape lente bloque les étapes en amont
+    (contre-pression) au lieu d'accumuler les pages en mémoire.
+    """
+
+    def __init__(self, scraper, fetch_workers=PIPELINE_FETCH_WORKERS, parse_workers=PIPELINE_PARSE_WORKERS,
+                 fetch_queue_size=PIPELINE_FETCH_QUEUE_SIZE, write_queue_size=PIPELINE_WRITE_QUEUE_SIZE):
+        self.scraper = scraper
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers
+        self.fetch_queue_size = fetch_queue_size
+        self.write_queue_size = write_queue_size
+
+    def _put(self, target_queue, item, stop):
+        # put bloquant mais interruptible si le consommateur s'arrête
+        while not stop.is_set():
+            try:
+                target_queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source_queue, stop):
+        # get bloquant mais interruptible ; renvoie _END si le pipeline est arrêté
+        while not stop.is_set():
+            try:
+                return source_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _feed(self, jobs, job_queue, stop):
+        try:
+            for job in jobs:
+                if not self._put(job_queue, job, stop):
+                    return
+        except Exception as e:
+            logger.error(f"Erreur lors de la découverte des articles: {e}")
+        finally:
+            for _ in range(self.fetch_workers):
+                self._put(job_queue, _END, stop)
+
+    def _fetch(self, job_queue, raw_queue, stop):
+        session = requests.Session()
+        session.headers.update({'User-Agent': USER_AGENT})
+        stop_marker = self.scraper.stop_marker('article')
+        try:
+            while True:
+                job = self._get(job_queue, stop)
+                if job is _END:
+                    break
+                article_url, source_category = job
+                logger.info(f"Scraping article: {article_url}")
+                content = fetch_url(session, article_url, limiter=self.scraper.rate_limiter,
+                                    cache=self.scraper.cache, skip_unchanged=self.scraper.skip_unchanged,
+                                    stop_marker=stop_marker)
+                if content is NOT_MODIFIED:
+                    self.scraper._mark_unchanged(article_url)
+                    continue
+                if content is None:
+                    self.scraper._mark_failed(article_url, "page indisponible")
+                    continue
+                self.scraper.archive_page(article_url, content)
+                if not self._put(raw_queue, (article_url, source_category, content), stop):
+                    break
+        finally:
+            session.close()
+            self._put(raw_queue, _END, stop)
+
+    def _dispatch(self, executor, raw_queue, write_queue, stop):
+        finished_fetchers = 0
+        try:
+            while finished_fetchers < self.fetch_workers and not stop.is_set():
+                item = self._get(raw_queue, stop)
+                if item is _END:
+                    finished_fetchers += 1
+                    continue
+                article_url, source_category, content = item
+                future = executor.submit(parse_article_in_worker, article_url, content)
+                # La file d'écriture contient les futures : sa taille borne les analyses en cours
+                if not self._put(write_queue, (article_url, source_category, future), stop):
+                    break
+        except Exception as e:
+            # Pool de processus inutilisable (BrokenProcessPool...) : fin du pipeline
+            logger.error(f"Erreur lors de l'envoi des articles à l'analyse: {e}")
+        finally:
+            # Toujours signalé, sinon l'étape d'écriture attendrait indéfiniment
+            self._put(write_queue, _END, stop)
+
+    def process(self, jobs):
+        """
+        Générateur : traite les tâches (URL, catégorie source) et renvoie les
+        articles analysés, au fur et à mesure, au thread appelant (étape d'écriture).
+        """
+        stop = threading.Event()
+        job_queue = queue.Queue(maxsize=self.fetch_queue_size)
+        raw_queue = queue.Queue(maxsize=self.fetch_queue_size)
+        write_queue = queue.Queue(maxsize=self.write_queue_size)
+
+        with ProcessPoolExecutor(max_workers=self.parse_workers, initializer=metrics.reset) as executor:
+            threads = [threading.Thread(target=self._feed, args=(jobs, job_queue, stop), daemon=True)]
+            threads += [
+                threading.Thread(target=self._fetch, args=(job_queue, raw_queue, stop), daemon=True)
+                for _ in range(self.fetch_workers)
+            ]
+            threads.append(
+                threading.Thread(target=self._dispatch, args=(executor, raw_queue, write_queue, stop), daemon=True)
+            )
+            for thread in threads:
+                thread.start()
+
+            try:
+                while True:
+                    item = write_queue.get()
+                    if item is _END:
+                        break
+                    article_url, source_category, future = item
+                    try:
+                        article_data, worker_metrics = future.result()
+                        metrics.merge(worker_metrics)
+                    except Exception as e:
+                        logger.error(f"Erreur scraping article {article_url}: {e}")
+                        self.scraper._mark_failed(article_url, e)
+                        continue
+                    if article_data and article_data['title']:
+                        # Marqué terminé par la frontière une fois son écriture confirmée
+                        article_data['source_category'] = source_category
+                        metrics.increment('articles_scraped_total')
+                        yield article_data
+                    else:
+                        self.scraper._mark_skipped(article_url, 'no_title')
+            finally:
+                stop.set()
+                # Vide les files pour débloquer les threads encore en attente
+                for pending_queue in (job_queue, raw_queue, write_queue):
+                    while True:
+                        try:
+                            pending_queue.get_nowait()
+                        except queue.Empty:
+                            break
+                for thread in threads:
+                    thread.join(timeout=1)
+
+    def run(self, jobs, write):
+        """Exécute le pipeline complet en passant chaque article à la fonction d'écriture `write`."""
+        written = 0
+        for article_data in self.process(jobs):
+            write(article_data)
+            written += 1
+        logger.info(f"Pipeline terminé: {written} articles traités")
+        self.scraper.log_run_stats()
+        return written
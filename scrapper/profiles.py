@@ -0,0 +1,174 @@
+import re
+import soupsieve
+from config import BASE_URL, EXTRACTION_PROFILE
+
+# Profil d'extraction du Blog du Modérateur. Les listes de sélecteurs sont
+# essayées dans l'ordre ; pour ajouter un site, il suffit de déclarer un
+# nouveau profil et de l'enregistrer dans PROFILES.
+BLOG_DU_MODERATEUR = {
+    'base_url': BASE_URL,
+    'title': 'h1.entry-title, h1.post-title, h1, .entry-title, .post-title',
+    'thumbnail': ['.post-thumbnail img', '.entry-image img', '.featured-image img', 'meta[property="og:image"]'],
+    # Catégorie : étiquettes de la section méta, sinon premier sélecteur de repli trouvé
+    'meta_section': '#section-meta, .meta-container',
+    'meta_tags': '.tags-list a.post-tags',
+    'category': ['.favtag', '.post-category', '.entry-category', '.category'],
+    # Sommaire spécifique au site, puis sommaires génériques
+    'summary_section': '.summary-section',
+    'summary_list': '.summary-inner',
+    'table_of_contents': [
+        '.table-of-contents ol li a, .table-of-contents ul li a',
+        '.toc ol li a, .toc ul li a',
+        '.wp-block-table-of-contents ol li a, .wp-block-table-of-contents ul li a'
+    ],
+    'summary': [
+        '.entry-excerpt',
+        '.post-excerpt',
+        '.article-excerpt',
+        '.summary',
+        'meta[name="description"]',
+        'meta[property="og:description"]'
+    ],
+    'first_paragraph': '.entry-content p, .post-content p, article p',
+    'date': [
+        'time[datetime]',
+        '.entry-date',
+        '.post-date',
+        '.published',
+        'meta[property="article:published_time"]'
+    ],
+    'date_formats': ['%Y-%m-%dT%H:%M:%S%z', '%Y-%m-%d', '%d/%m/%Y', '%d %B %Y'],
+    'months': {
+        'janvier': '01', 'février': '02', 'mars': '03',
+        'avril': '04', 'mai': '05', 'juin': '06',
+        'juillet': '07', 'août': '08', 'septembre': '09',
+        'octobre': '10', 'novembre': '11', 'décembre': '12'
+    },
+    'author': [
+        '.entry-author',
+        '.post-author',
+        '.author',
+        'meta[name="author"]',
+        '.byline',
+        '[rel="author"]'
+    ],
+    'author_prefix': r'^(par|by|author:)\s*',
+    'content': [
+        '.entry-content',
+        '.post-content',
+        'article .content',
+        'main article',
+        '.article-content'
+    ],
+    # Noms passés à find_all() pour le nettoyage de la zone de contenu
+    # (les entrées en '.xxx' sont conservées telles quelles pour un résultat inchangé)
+    'content_cleanup': [
+        'script', 'style', 'aside', '.related-posts', '.social-share',
+        '.social-catchphrase', 'noscript', '.sharing-button', '.comments-section', '#section-meta'
+    ],
+    'content_button_classes': ['btn', 'featured-link', 'external'],
+    'image_cleanup': [
+        'aside', '.related-posts', '.social-share',
+        '.social-catchphrase', '.expert', '.guest-data'
+    ],
+    # Marqueur après lequel la suite de la page (barre latérale, pied de page,
+    # scripts) n'est plus utile : le téléchargement s'arrête dès sa réception
+    'stop_markers': {
+        'article': '</main>',
+        'listing': '</main>',
+    },
+}
+
+PROFILES = {
+    'blogdumoderateur': BLOG_DU_MODERATEUR,
+}
+
+
+class ExtractionProfile:
+    """
+    Profil d'extraction compilé : les sélecteurs CSS sont précompilés avec
+    soupsieve et les expressions régulières une seule fois, à la création
+    du profil, au lieu d'être reconstruits pour chaque article.
+    """
+
+    def __init__(self, name, definition):
+        self.name = name
+        self.base_url = definition['base_url']
+        self.title_selector = definition['title']
+        self.thumbnail_selectors = definition['thumbnail']
+        self.meta_section_selector = definition['meta_section']
+        self.meta_tags_selector = definition['meta_tags']
+        self.category_selectors = definition['category']
+        self.summary_section_selector = definition['summary_section']
+        self.summary_list_selector = definition['summary_list']
+        self.toc_selectors = definition['table_of_contents']
+        self.summary_selectors = definition['summary']
+        self.first_paragraph_selector = definition['first_paragraph']
+        self.date_selectors = definition['date']
+        self.date_formats = definition['date_formats']
+        self.months = definition['months']
+        self.author_selectors = definition['author']
+        self.content_selectors = definition['content']
+        self.content_cleanup = definition['content_cleanup']
+        self.content_button_classes = definition['content_button_classes']
+        self.image_cleanup = definition['image_cleanup']
+        self.stop_markers = {
+            region: marker.encode('utf-8') for region, marker in definition.get('stop_markers', {}).items()
+        }
+
+        self.author_prefix = re.compile(definition['author_prefix'], re.I)
+        self.date_cleanup = re.compile(r'[^\d\-/\s\w]')
+
+        selectors = [
+            self.title_selector, self.meta_section_selector, self.meta_tags_selector,
+            self.summary_section_selector, self.summary_list_selector, self.first_paragraph_selector
+        ]
+        for selector_list in (self.thumbnail_selectors, self.category_selectors, self.toc_selectors,
+                              self.summary_selectors, self.date_selectors, self.author_selectors,
+                              self.content_selectors):
+            selectors.extend(selector_list)
+        self.selectors = tuple(selectors)
+        self._patterns = {selector: soupsieve.compile(selector) for selector in selectors}
+
+    def _pattern(self, selector):
+        pattern = self._patterns.get(selector)
+        if pattern is None:
+            pattern = self._patterns[selector] = soupsieve.compile(selector)
+        return pattern
+
+    def select_one(self, tag, selector):
+        """Équivalent de tag.select_one(selector) avec le sélecteur précompilé."""
+        return self._pattern(selector).select_one(tag)
+
+    def select(self, tag, selector):
+        """Équivalent de tag.select(selector) avec le sélecteur précompilé."""
+        return self._pattern(selector).select(tag)
+
+    def finder(self, soup):
+        return lambda selector: self.select_one(soup, selector)
+
+    def selector(self, soup):
+        return lambda selector: self.select(soup, selector)
+
+    def stop_marker(self, region):
+        """Marqueur de fin de lecture d'une région ('article', 'listing'...), ou None."""
+        return self.stop_markers.get(region)
+
+    def absolute_url(self, url):
+        # Construction de l'URL absolue d'une image
+        if url.startswith('//'):
+            return 'https:' + url
+        if url.startswith('/'):
+            return self.base_url + url
+        return url
+
+
+_compiled_profiles = {}
+
+
+def get_profile(name=EXTRACTION_PROFILE):
+    """Profil compilé `name`, construit une seule fois par processus."""
+    profile = _compiled_profiles.get(name)
+    if profile is None:
+        profile = _compiled_profiles[name] = ExtractionProfile(name, PROFILES[name])
+    return profile
@@ -0,0 +1,152 @@
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from config import (
+    logger, REQUESTS_PER_SECOND, MIN_REQUESTS_PER_SECOND, MAX_REQUESTS_PER_SECOND,
+    RATE_LIMIT_BURST, TARGET_LATENCY
+)
+
+# Codes HTTP indiquant que le serveur demande de ralentir
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+def parse_retry_after(value):
+    """Convertit un en-tête Retry-After (secondes ou date HTTP) en nombre de secondes."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_date.tzinfo is None:
+        retry_date = retry_date.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_date - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """
+    Limiteur de débit à seau de jetons, partagé entre threads.
+
+    Chaque requête consomme un jeton ; les jetons se régénèrent au rythme
+    `rate` (requêtes/seconde) jusqu'à `burst`. Une pause globale peut être
+    imposée (par exemple suite à un en-tête Retry-After).
+    """
+
+    def __init__(self, rate=REQUESTS_PER_SECOND, burst=RATE_LIMIT_BURST):
+        self._rate = float(rate)
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def current_rate(self):
+        """Débit actuellement autorisé (requêtes/seconde)."""
+        return self._rate
+
+    def _refill(self, now):
+        elapsed = now - self._updated_at
+        self._tokens = min(self.burst, self._tokens + elapsed * self._rate)
+        self._updated_at = now
+
+    def _set_rate(self, rate):
+        # Les jetons accumulés avec l'ancien débit sont comptabilisés avant le changement
+        self._refill(time.monotonic())
+        self._rate = rate
+
+    def reserve(self):
+        """Réserve un jeton et renvoie le délai à attendre avant d'envoyer la requête."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def acquire(self):
+        """Bloque jusqu'à ce qu'une requête puisse être envoyée."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Suspend toutes les requêtes pendant `seconds` secondes."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def record(self, latency=None, status_code=None, error=False, retry_after=None):
+        """Enregistre le résultat d'une requête (le seau fixe ne tient compte que de Retry-After)."""
+        if retry_after:
+            self.pause(retry_after)
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """
+    Seau de jetons dont le débit s'adapte au comportement du serveur (AIMD) :
+    augmentation additive tant que les réponses sont rapides et correctes,
+    diminution multiplicative en cas d'erreur, de 429/503 ou de latence
+    supérieure à la cible.
+    """
+
+    def __init__(self, rate=REQUESTS_PER_SECOND, burst=RATE_LIMIT_BURST,
+                 min_rate=MIN_REQUESTS_PER_SECOND, max_rate=MAX_REQUESTS_PER_SECOND,
+                 target_latency=TARGET_LATENCY, increase_step=0.1, decrease_factor=0.5):
+        super().__init__(rate=rate, burst=burst)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.target_latency = target_latency
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+
+    def record(self, latency=None, status_code=None, error=False, retry_after=None):
+        super().record(latency, status_code, error, retry_after)
+        with self._lock:
+            slow = latency is not None and latency > self.target_latency
+            if error or status_code in THROTTLE_STATUS_CODES or slow:
+                new_rate = max(self.min_rate, self._rate * self.decrease_factor)
+            else:
+                new_rate = min(self.max_rate, self._rate + self.increase_step)
+            if new_rate != self._rate:
+                if new_rate < self._rate:
+                    logger.debug(f"Ralentissement du débit: {self._rate:.2f} -> {new_rate:.2f} req/s")
+                self._set_rate(new_rate)
+
+
+class SharedRateLimiter:
+    """
+    Limiteur de débit global partagé par tous les workers d'un crawl réparti.
+
+    Le calendrier des envois est conservé dans le stockage de la file de
+    tâches (SQLite ou MongoDB) : chaque requête y réserve le prochain
+    créneau libre, les créneaux étant espacés de 1/rate secondes. Ajouter
+    des workers ne dépasse donc jamais le débit configuré. Un Retry-After
+    ou une réponse 429/503 recule le calendrier pour tous les workers.
+    """
+
+    def __init__(self, store, rate=REQUESTS_PER_SECOND, burst=RATE_LIMIT_BURST, name='default'):
+        self.store = store
+        self._rate = float(rate)
+        self.burst = burst
+        self.name = name
+
+    @property
+    def current_rate(self):
+        return self._rate
+
+    def acquire(self):
+        wait = self.store.reserve_slot(self.name, 1 / self._rate, self.burst)
+        if wait > 0:
+            time.sleep(wait)
+
+    def record(self, latency=None, status_code=None, error=False, retry_after=None):
+        if retry_after:
+            self.store.delay(self.name, retry_after)
+        elif status_code in THROTTLE_STATUS_CODES:
+            # Sans indication du serveur : pause équivalente à quelques créneaux
+            self.store.delay(self.name, self.burst / self._rate)
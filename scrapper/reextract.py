@@ -0,0 +1,172 @@
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from pymongo import UpdateOne
+from config import logger, ARCHIVE_DIR, REEXTRACT_WORKERS, REEXTRACT_BATCH_SIZE
+from archive import HtmlArchive, read_record
+from article_store import ArticleStore, BODY_FIELDS, make_search_text, filter_keys
+from fingerprint import fingerprint_fields
+from mongo_utils import get_mongo_connection, bump_ingest_generation
+from scraper import parse_article_html
+
+# Champs propres à une récupération, jamais remplacés par la ré-extraction
+PRESERVED_FIELDS = ('_id', 'url', 'scraped_at', 'source_category', 'duplicate_of')
+
+# Champs dont dépendent les clés normalisées des filtres
+FILTER_FIELDS = ('author', 'category', 'subcategory', 'subcategories')
+
+
+def reextract_entry(directory, entry):
+    """
+    Ré-extrait un article archivé avec les extracteurs actuels. Exécuté dans
+    un processus du pool : seule la position dans l'archive est transmise.
+    """
+    url, file_name, offset, length = entry
+    try:
+        article_data = parse_article_html(url, read_record(directory, file_name, offset, length))
+    except Exception as e:
+        return url, None, str(e)
+    for field in PRESERVED_FIELDS:
+        article_data.pop(field, None)
+    return url, article_data, None
+
+
+def changed_fields(stored, extracted, fields=None):
+    """Champs extraits dont la valeur diffère de la version stockée."""
+    names = fields or extracted.keys()
+    return {name: extracted[name] for name in names if name in extracted and stored.get(name) != extracted[name]}
+
+
+class Reextractor:
+    """
+    Rejoue l'archive HTML à travers les extracteurs actuels (en parallèle)
+    et ne met à jour, par écritures groupées, que les champs modifiés :
+    métadonnées dans la collection des articles, corps via l'ArticleStore.
+    Aucune requête n'est envoyée au site.
+    """
+
+    def __init__(self, collection, archive, fields=None, dry_run=False,
+                 workers=REEXTRACT_WORKERS, batch_size=REEXTRACT_BATCH_SIZE):
+        self.collection = collection
+        self.store = ArticleStore(collection)
+        self.archive = archive
+        self.fields = fields
+        self.dry_run = dry_run
+        self.workers = workers
+        self.batch_size = batch_size
+        self.counts = Counter()
+        self.field_changes = Counter()
+
+    def _stored_articles(self, urls):
+        articles = {doc['url']: doc for doc in self.collection.find({'url': {'$in': urls}})}
+        for document in self.store.bodies.find({'url': {'$in': urls}}, {'_id': 0}):
+            if document['url'] in articles:
+                articles[document['url']].update(self.store.decode_body(document))
+        return articles
+
+    def _apply(self, results):
+        stored = self._stored_articles([url for url, _ in results])
+        operations = []
+        body_operations = []
+        for url, extracted in results:
+            article = stored.get(url)
+            if article is None:
+                self.counts['missing'] += 1
+                continue
+            changes = changed_fields(article, extracted, self.fields)
+            if not changes:
+                self.counts['unchanged'] += 1
+                continue
+            self.counts['updated'] += 1
+            self.field_changes.update(changes.keys())
+
+            update = {}
+            metadata = {k: v for k, v in changes.items() if k not in BODY_FIELDS}
+            if any(field in changes for field in FILTER_FIELDS):
+                metadata.update(filter_keys(dict(article, **changes)))
+            if metadata:
+                update['$set'] = metadata
+            if any(field in changes for field in BODY_FIELDS):
+                # Le corps est réécrit en entier (contenu compressé) et retiré du
+                # document de métadonnées s'il y était encore intégré
+                body = {field: changes.get(field, article.get(field)) for field in BODY_FIELDS}
+                body_operations.append(self.store.body_operation(url, body))
+                update['$unset'] = {field: "" for field in BODY_FIELDS}
+                if 'content' in changes:
+                    # Texte de recherche et empreinte SimHash suivent le contenu,
+                    # même si la ré-extraction est limitée à certains champs
+                    derived = update.setdefault('$set', {})
+                    derived['search_text'] = make_search_text(changes['content'])
+                    derived.update(fingerprint_fields(changes['content']))
+            if update:
+                operations.append(UpdateOne({'url': url}, update))
+
+        if self.dry_run:
+            return
+        if body_operations:
+            self.store.bodies.bulk_write(body_operations, ordered=False)
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+            bump_ingest_generation(self.collection)
+
+    def _apply_results(self, results):
+        batch = []
+        for url, extracted, error in results:
+            if error:
+                self.counts['errors'] += 1
+                logger.error(f"Erreur de ré-extraction {url}: {error}")
+            else:
+                batch.append((url, extracted))
+        if batch:
+            self._apply(batch)
+        logger.info(f"Ré-extraction: {dict(self.counts)}")
+
+    def run(self, since=None):
+        entries = self.archive.entries(since)
+        logger.info(f"Ré-extraction de {len(entries)} articles archivés")
+        directory = self.archive.directory
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            # Soumission par fenêtres de `batch_size` entrées : la fenêtre suivante
+            # est extraite pendant la comparaison et l'écriture de la précédente,
+            # sans mettre toute l'archive en file dans le pool
+            pending = None
+            for start in range(0, len(entries), self.batch_size):
+                window = entries[start:start + self.batch_size]
+                results = executor.map(reextract_entry, [directory] * len(window), window, chunksize=16)
+                if pending is not None:
+                    self._apply_results(pending)
+                pending = results
+            if pending is not None:
+                self._apply_results(pending)
+
+        logger.info(f"Ré-extraction terminée: {dict(self.counts)}")
+        if self.field_changes:
+            logger.info(f"Champs modifiés: {dict(self.field_changes)}")
+        return self.counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ré-extraction hors ligne des articles archivés")
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR, help="Répertoire de l'archive HTML")
+    parser.add_argument('--field', action='append', dest='fields',
+                        help="Ne met à jour que ce champ (option répétable, ex. --field images)")
+    parser.add_argument('--since', type=float, help="Seulement les pages archivées depuis ce timestamp")
+    parser.add_argument('--workers', type=int, default=REEXTRACT_WORKERS, help="Processus d'extraction")
+    parser.add_argument('--batch-size', type=int, default=REEXTRACT_BATCH_SIZE,
+                        help="Articles comparés par écriture groupée")
+    parser.add_argument('--dry-run', action='store_true', help="Compte les modifications sans écrire")
+    args = parser.parse_args(argv)
+
+    client, collection = get_mongo_connection()
+    archive = HtmlArchive(args.archive_dir)
+    try:
+        Reextractor(collection, archive, fields=args.fields, dry_run=args.dry_run,
+                    workers=args.workers, batch_size=args.batch_size).run(args.since)
+    finally:
+        archive.close()
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,141 @@
 import requests
-from bs4 import BeautifulSoup
-import time
-from config import logger, BASE_URL, USER_AGENT
-from extractors import (
-    extract_article_content,
-    extract_summary,
-    extract_table_of_contents,
-    extract_images,
-    extract_date,
-    extract_author
+from itertools import islice
+from config import (
+    logger, BASE_URL, USER_AGENT, EXTRACTION_ENGINE, SITEMAP_INDEX_URL, SITEMAP_BATCH_SIZE, EARLY_STOP
 )
+from async_fetcher import AsyncFetcher
+from http_client import fetch_url, NOT_MODIFIED
+from rate_limiter import AdaptiveRateLimiter
+from parsing import make_soup
+from sitemap import discover_article_urls
+from frontier import CATEGORY_DONE, CATEGORY_LISTED
+from extractors import extract_all
+from extraction_engine import extract_single_pass
+from fingerprint import fingerprint_fields
+from profiles import get_profile
+from metrics import metrics
 from datetime import datetime  # Import nécessaire pour gérer les dates et heures
 
+def extract_article_data(article_url, soup):
+    """Construit le dictionnaire de données d'un article à partir de sa page analysée."""
+    if EXTRACTION_ENGINE == 'single_pass':
+        fields = extract_single_pass(soup)
+    else:
+        fields = extract_all(soup)
+
+    # Construction du dictionnaire de données de l'article
+    article_data = {'url': article_url}
+    article_data.update(fields)
+    # Empreinte SimHash du contenu (détection des quasi-doublons à l'ingestion)
+    article_data.update(fingerprint_fields(fields['content']))
+    article_data['scraped_at'] = datetime.now().isoformat()  # Date et heure du scraping
+    return article_data
+
+
+def stop_marker_for(region, early_stop=EARLY_STOP):
+    """Marqueur après lequel le téléchargement d'une page de la région peut s'arrêter (None : page entière)."""
+    if not early_stop or region is None:
+        return None
+    return get_profile().stop_marker(region)
+
+
+def parse_article_html(article_url, content):
+    """
+    Analyse le HTML brut d'un article et en extrait les données.
+    Fonction de niveau module afin de pouvoir être exécutée dans un ProcessPoolExecutor.
+    """
+    return extract_article_data(article_url, make_soup(content, 'article'))
+
+
+def extract_listing_urls(soup):
+    """URLs des articles d'une page de liste analysée (None si la page ne contient aucun article)."""
+    articles = soup.find_all('article')
+    if not articles:
+        return None
+
+    page_urls = []
+    for article in articles:
+        link_element = article.find('a')
+        if link_element and link_element.get('href'):
+            article_url = link_element['href']
+            if article_url not in page_urls:
+                page_urls.append(article_url)
+    return page_urls
+
+
 class BlogDuModerateurScraper:
 
-    def __init__(self):
+    def __init__(self, async_mode=False, rate_limiter=None, cache=None, skip_unchanged=True,
+                 known_url_filter=None, force_refresh=False, frontier=None, archive=None, **fetcher_options):
         """
         Initialise le scraper avec une session HTTP et un User-Agent personnalisé.
+
+        Toutes les requêtes passent par un limiteur de débit (par défaut un
+        AdaptiveRateLimiter) qui remplace les pauses fixes.
+        Avec un HttpCache, les requêtes sont conditionnelles ; si skip_unchanged
+        est activé, les articles inchangés (304) ne sont ni ré-analysés ni renvoyés.
+        L'entrée en cache d'un article n'est confirmée (revalidable) qu'après
+        son écriture : l'appelant transmet les URLs écrites à cache.confirm().
+        Mode incrémental : known_url_filter reçoit une liste d'URLs et renvoie
+        l'ensemble de celles déjà stockées ; ces articles ne sont pas récupérés
+        (sauf force_refresh) et la pagination d'une catégorie s'arrête dès
+        qu'une page ne contient plus que des articles connus.
+        Avec une CrawlFrontier, l'avancement est persisté et un crawl interrompu
+        reprend là où il s'était arrêté.
+        Avec une HtmlArchive, le HTML de chaque article téléchargé est archivé
+        (ré-extraction hors ligne avec reextract.py).
+        En mode asynchrone (async_mode=True), les articles sont récupérés en
+        parallèle par un AsyncFetcher ; les options supplémentaires
+        (max_concurrency, per_host_concurrency, timeout) lui sont transmises.
         """
         self.session = requests.Session()
         self.session.headers.update({'User-Agent': USER_AGENT})
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.cache = cache
+        self.skip_unchanged = skip_unchanged and not force_refresh
+        self.known_url_filter = None if force_refresh else known_url_filter
+        self.seen_urls = set()  # Articles déjà traités pendant l'exécution en cours
+        self.frontier = frontier
+        self.archive = archive
+        self.fetcher = None
+        if async_mode:
+            self.fetcher = AsyncFetcher(rate_limiter=self.rate_limiter, cache=cache, **fetcher_options)
 
-    def get_page_content(self, url):
-
-        try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()  # Lève une exception si la requête échoue
-            return BeautifulSoup(response.content, 'html.parser')
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Erreur lors de la récupération de {url}: {e}")
+    def stop_marker(self, region):
+        """
+        Marqueur d'arrêt du téléchargement d'une page de la région. Les pages
+        d'articles archivées sont téléchargées en entier : l'archive doit
+        permettre de les ré-extraire avec de futurs extracteurs.
+        """
+        if region == 'article' and self.archive:
             return None
+        return stop_marker_for(region)
+
+    def fetch_page(self, url, skip_unchanged=False, region=None):
+        """Récupère le contenu brut d'une page (None en cas d'erreur, NOT_MODIFIED si inchangée et ignorée)."""
+        stop_marker = self.stop_marker(region)
+        if self.fetcher:
+            return self.fetcher.fetch_one(url, skip_unchanged, stop_marker=stop_marker)
+        return fetch_url(self.session, url, limiter=self.rate_limiter,
+                         cache=self.cache, skip_unchanged=skip_unchanged, stop_marker=stop_marker)
+
+    def get_page_content(self, url, skip_unchanged=False, region=None):
+        content = self.fetch_page(url, skip_unchanged, region)
+        if content is None or content is NOT_MODIFIED:
+            return content
+        if region == 'article':
+            # Entrée du cache HTTP confirmée à l'écriture de l'article
+            self.archive_page(url, content)
+            return make_soup(content, region)
+        soup = make_soup(content, region)
+        if self.cache:
+            self.cache.confirm([url])
+        return soup
 
     def get_categories_list(self):
 
         logger.info("Récupération de la liste des catégories...")
-        soup = self.get_page_content(f"{BASE_URL}/liste-des-dossiers/")
+        soup = self.get_page_content(f"{BASE_URL}/liste-des-dossiers/", region='categories')
         if not soup:
             return []
 
@@ -49,140 +150,265 @@ class BlogDuModerateurScraper:
         logger.info(f"Trouvé {len(categories)} catégories")
         return categories
 
+    def _get_listing_page_urls(self, page, page_url):
+        """URLs des articles d'une page de liste (None si la page est absente ou vide)."""
+        logger.info(f"Scraping page {page}: {page_url}")
+        soup = self.get_page_content(page_url, region='listing')
+        if not soup:
+            return None
+
+        page_urls = extract_listing_urls(soup)
+        if page_urls is None:
+            logger.info(f"Aucun article trouvé sur la page {page}")
+        return page_urls
+
     def get_articles_from_category(self, category_url, max_pages=5):
 
         articles_urls = []
         for page in range(1, max_pages + 1):
             page_url = category_url if page == 1 else f"{category_url}page/{page}/"
-            logger.info(f"Scraping page {page}: {page_url}")
-            soup = self.get_page_content(page_url)
-            if not soup:
-                break
-
-            articles = soup.find_all('article')
-            if not articles:
-                logger.info(f"Aucun article trouvé sur la page {page}")
-                break
+            page_urls = self.frontier.get_page_articles(page_url) if self.frontier else None
+            if page_urls is None:
+                page_urls = self._get_listing_page_urls(page, page_url)
+                if page_urls is None:
+                    break
+                if self.frontier:
+                    self.frontier.mark_page_done(page_url, category_url, page_urls)
+            else:
+                logger.info(f"Page {page} déjà parcourue (reprise): {page_url}")
 
-            for article in articles:
-                link_element = article.find('a')
-                if link_element and link_element.get('href'):
-                    article_url = link_element['href']
+            if self.known_url_filter:
+                # Mode incrémental : on écarte les articles déjà en base ou déjà traités
+                known = self.known_url_filter(page_urls) if page_urls else set()
+                new_urls = [url for url in page_urls if url not in known and url not in self.seen_urls]
+                metrics.increment('articles_skipped_total', len(page_urls) - len(new_urls), reason='known')
+                for article_url in new_urls:
+                    if article_url not in articles_urls:
+                        articles_urls.append(article_url)
+                if page_urls and len(known) == len(page_urls):
+                    logger.info(f"Page {page} entièrement connue, arrêt de la pagination")
+                    break
+            else:
+                for article_url in page_urls:
                     if article_url not in articles_urls:
                         articles_urls.append(article_url)
-
-            time.sleep(1)  # Pause pour éviter de surcharger le serveur
 
         logger.info(f"Trouvé {len(articles_urls)} articles dans la catégorie")
         return articles_urls
 
     def scrape_article(self, article_url):
+        """Données d'un article (None si la page est indisponible, NOT_MODIFIED si inchangée et ignorée)."""
         logger.info(f"Scraping article: {article_url}")
-        soup = self.get_page_content(article_url)
-        if not soup:
-            return None
+        soup = self.get_page_content(article_url, skip_unchanged=self.skip_unchanged, region='article')
+        if soup is None or soup is NOT_MODIFIED:
+            return soup
+        return self.parse_article(article_url, soup)
 
-        # Extraction du titre
-        title_element = soup.select_one('h1.entry-title, h1.post-title, h1, .entry-title, .post-title')
-        title = title_element.get_text(strip=True) if title_element else ""
-
-        # Extraction de l'image principale (thumbnail)
-        thumbnail_url = ""
-        thumbnail_selectors = ['.post-thumbnail img', '.entry-image img', '.featured-image img', 'meta[property="og:image"]']
-        for selector in thumbnail_selectors:
-            if selector.startswith('meta'):
-                element = soup.select_one(selector)
-                if element:
-                    thumbnail_url = element.get('content', '')
-                    break
-            else:
-                element = soup.select_one(selector)
-                if element:
-                    thumbnail_url = element.get('src') or element.get('data-src') or element.get('data-lazy-src')
-                    if thumbnail_url:
-                        break
-
-        # Construction de l'URL absolue pour le thumbnail
-        if thumbnail_url:
-            if thumbnail_url.startswith('//'):
-                thumbnail_url = 'https:' + thumbnail_url
-            elif thumbnail_url.startswith('/'):
-                thumbnail_url = BASE_URL + thumbnail_url
-
-        # Extraction de la catégorie et des sous-catégories
-        category = ""
-        subcategories = []
-        meta_section = soup.select_one('#section-meta, .meta-container')
-        if meta_section:
-            tags_list = meta_section.select('.tags-list a.post-tags')
-            if tags_list:
-                category = tags_list[0].get_text(strip=True)
-                for tag_link in tags_list[1:]:
-                    subcategory = tag_link.get_text(strip=True)
-                    if subcategory and subcategory not in subcategories:
-                        subcategories.append(subcategory)
-
-        # Fallback pour la catégorie si non trouvée dans la meta-section
-        if not category:
-            category_selectors = ['.favtag', '.post-category', '.entry-category', '.category']
-            for selector in category_selectors:
-                cat_element = soup.select_one(selector)
-                if cat_element:
-                    category = cat_element.get_text(strip=True)
-                    break
+    def parse_article(self, article_url, soup):
+        return extract_article_data(article_url, soup)
 
-        subcategory_string = ", ".join(subcategories) if subcategories else ""
-
-        # Construction du dictionnaire de données de l'article
-        article_data = {
-            'url': article_url,
-            'title': title,
-            'thumbnail': thumbnail_url,
-            'table_of_contents': extract_table_of_contents(soup),
-            'category': category,
-            'subcategory': subcategory_string,
-            'subcategories': subcategories,
-            'summary': extract_summary(soup),
-            'publication_date': extract_date(soup),
-            'author': extract_author(soup),
-            'content': extract_article_content(soup),
-            'images': extract_images(soup),
-            'scraped_at': datetime.now().isoformat()  # Date et heure du scraping
-        }
-
-        return article_data
-
-    def run_scraper(self, max_categories=3, max_pages_per_category=2, max_articles_per_category=10):
-        logger.info("Début du scraping du Blog du Modérateur")
-        categories = self.get_categories_list()
+    def iter_category_articles(self, max_categories=3, max_pages_per_category=2, max_articles_per_category=10):
+        """
+        Parcourt les catégories et génère, pour chacune, le couple
+        (catégorie, liste des URLs d'articles à récupérer).
+        """
+        categories = self.frontier.get_categories() if self.frontier else []
+        if categories:
+            logger.info(f"Reprise du crawl: {len(categories)} catégories dans la frontière")
+        else:
+            categories = self.get_categories_list()
+            if self.frontier:
+                self.frontier.save_categories(categories)
         if not categories:
             logger.error("Impossible de récupérer les catégories")
             return
 
-        processed_categories = 0
-        total_articles_scraped = 0
-
         for category in categories[:max_categories]:
+            status = self.frontier.category_status(category['url']) if self.frontier else None
+            if status == CATEGORY_DONE:
+                logger.info(f"Catégorie déjà traitée: {category['name']}")
+                continue
+
             logger.info(f"Traitement catégorie: {category['name']}")
-            article_urls = self.get_articles_from_category(category['url'], max_pages=max_pages_per_category)
-            article_urls = article_urls[:max_articles_per_category]
+            if status == CATEGORY_LISTED:
+                article_urls = []
+            else:
+                article_urls = self.get_articles_from_category(category['url'], max_pages=max_pages_per_category)
+                article_urls = article_urls[:max_articles_per_category]
+                if self.frontier:
+                    self.frontier.add_articles(article_urls, category['url'])
+                    self.frontier.mark_category(category['url'], CATEGORY_LISTED)
+            if self.frontier:
+                # Articles restants : non traités ou en échec avec des tentatives disponibles
+                article_urls = self.frontier.pending_articles(category['url'])
+            if self.known_url_filter:
+                self.seen_urls.update(article_urls)
+            yield category, article_urls
+            if self.frontier:
+                self.frontier.complete_category_if_done(category['url'])
+
+    def iter_sitemap_batches(self, since=None, max_articles=None, batch_size=SITEMAP_BATCH_SIZE):
+        """
+        Découverte par les sitemaps XML : génère des lots (source, liste d'URLs),
+        au plus `max_articles` au total. En mode incrémental, un article absent
+        de la base est toujours retenu ; un article déjà connu n'est repris que
+        si son <lastmod> est postérieur à `since`.
+        """
+        source = {'name': 'sitemap', 'url': SITEMAP_INDEX_URL}
+        discovered = discover_article_urls(self.session, SITEMAP_INDEX_URL, limiter=self.rate_limiter)
+        total = 0
+        while max_articles is None or total < max_articles:
+            batch = list(islice(discovered, batch_size))
+            if not batch:
+                break
+
+            urls = [url for url, _ in batch if url not in self.seen_urls]
+            if self.known_url_filter and urls:
+                known = self.known_url_filter(urls)
+                changed = {url for url, lastmod in batch if since and lastmod and lastmod > since}
+                candidates = len(urls)
+                urls = [url for url in urls if url not in known or url in changed]
+                metrics.increment('articles_skipped_total', candidates - len(urls), reason='known')
+
+            if max_articles is not None:
+                urls = urls[:max_articles - total]
+            if urls:
+                self.seen_urls.update(urls)
+                total += len(urls)
+                yield source, urls
 
+        logger.info(f"Trouvé {total} articles via les sitemaps")
+
+    def iter_article_batches(self, max_categories=3, max_pages_per_category=2, max_articles_per_category=10,
+                             discovery='listing', since=None, max_articles=None):
+        """
+        Source des URLs d'articles :
+        - 'listing' : pages de catégories (liste des dossiers puis pagination) ;
+        - 'sitemap' : sitemaps XML, filtrés par <lastmod> (voir iter_sitemap_batches).
+        """
+        if discovery == 'sitemap':
+            return self.iter_sitemap_batches(since=since, max_articles=max_articles)
+        return self.iter_category_articles(max_categories, max_pages_per_category, max_articles_per_category)
+
+    def iter_article_jobs(self, max_categories=3, max_pages_per_category=2, max_articles_per_category=10,
+                          discovery='listing', since=None, max_articles=None):
+        """Génère les tâches (URL de l'article, catégorie source) consommées par le pipeline."""
+        for category, article_urls in self.iter_article_batches(
+                max_categories, max_pages_per_category, max_articles_per_category,
+                discovery, since, max_articles):
+            for article_url in article_urls:
+                yield article_url, category['name']
+
+    def run_scraper(self, max_categories=3, max_pages_per_category=2, max_articles_per_category=10,
+                    discovery='listing', since=None, max_articles=None):
+        logger.info("Début du scraping du Blog du Modérateur")
+
+        processed_categories = 0
+        total_articles_scraped = 0
+
+        for category, article_urls in self.iter_article_batches(
+                max_categories, max_pages_per_category, max_articles_per_category,
+                discovery, since, max_articles):
             articles_scraped = 0
+            for article_data in self._scrape_articles(article_urls):
+                article_data['source_category'] = category['name']
+                metrics.increment('articles_scraped_total')
+                yield article_data  # Utilisation de yield pour générer les articles un par un
+                articles_scraped += 1
+                total_articles_scraped += 1
+
+            logger.info(f"Catégorie {category['name']} terminée: {articles_scraped} articles")
+            processed_categories += 1
+
+        logger.info(f"Scraping terminé: {total_articles_scraped} articles dans {processed_categories} catégories")
+        self.log_run_stats()
+
+    def log_run_stats(self):
+        logger.info(f"Débit final du limiteur: {self.rate_limiter.current_rate:.2f} requêtes/s")
+        if self.cache:
+            logger.info(f"Cache HTTP: {self.cache.stats()}")
+        if self.frontier:
+            logger.info(f"Frontière de crawl: {self.frontier.stats()}")
+        metrics.log_summary()
+
+    def _scrape_articles(self, article_urls):
+        """
+        Génère les données des articles d'une liste d'URLs.
+        En mode asynchrone, les articles sont produits dans l'ordre de fin de téléchargement.
+        Avec une frontière, un article renvoyé n'est marqué terminé qu'une fois
+        son écriture confirmée (checkpoint de la frontière) ; les articles
+        ignorés ou inchangés sont marqués terminés aussitôt, les autres en échec.
+        """
+        if not self.fetcher:
             for article_url in article_urls:
                 try:
                     article_data = self.scrape_article(article_url)
-                    if article_data and article_data['title']:
-                        article_data['source_category'] = category['name']
-                        yield article_data  # Utilisation de yield pour générer les articles un par un
-                        articles_scraped += 1
-                        total_articles_scraped += 1
-                    time.sleep(2)  # Pause entre chaque article
                 except Exception as e:
                     logger.error(f"Erreur scraping article {article_url}: {e}")
+                    self._mark_failed(article_url, e)
                     continue
+                if article_data is NOT_MODIFIED:
+                    self._mark_unchanged(article_url)
+                elif article_data is None:
+                    self._mark_failed(article_url, "page indisponible")
+                elif article_data['title']:
+                    yield article_data
+                else:
+                    self._mark_skipped(article_url, 'no_title')
+            return
 
-            logger.info(f"Catégorie {category['name']} terminée: {articles_scraped} articles")
-            processed_categories += 1
-            time.sleep(3)  # Pause entre chaque catégorie
+        for article_url, content in self.fetcher.fetch_many(article_urls, skip_unchanged=self.skip_unchanged,
+                                                            stop_marker=self.stop_marker('article')):
+            if content is NOT_MODIFIED:
+                self._mark_unchanged(article_url)
+                continue
+            if content is None:
+                self._mark_failed(article_url, "page indisponible")
+                continue
+            self.archive_page(article_url, content)
+            try:
+                logger.info(f"Scraping article: {article_url}")
+                article_data = parse_article_html(article_url, content)
+            except Exception as e:
+                logger.error(f"Erreur scraping article {article_url}: {e}")
+                self._mark_failed(article_url, e)
+                continue
+            if article_data and article_data['title']:
+                yield article_data
+            else:
+                self._mark_skipped(article_url, 'no_title')
 
-        logger.info(f"Scraping terminé: {total_articles_scraped} articles dans {processed_categories} catégories")
+    def archive_page(self, article_url, content):
+        if self.archive:
+            try:
+                self.archive.store(article_url, content)
+            except Exception as e:
+                # L'archive est facultative : une erreur d'écriture n'interrompt pas le crawl
+                logger.error(f"Erreur d'archivage de {article_url}: {e}")
+
+    def _mark_skipped(self, article_url, reason):
+        """Article terminé sans écriture (sans titre, quasi-doublon...)."""
+        metrics.increment('articles_skipped_total', reason=reason)
+        if self.frontier:
+            self.frontier.mark_done(article_url)
+        if self.cache:
+            self.cache.confirm([article_url])
+
+    def _mark_unchanged(self, article_url):
+        # Page inchangée depuis la dernière récupération (304) : rien à ré-analyser ni à écrire
+        self._mark_skipped(article_url, 'unchanged')
+
+    def _mark_failed(self, article_url, error):
+        metrics.increment('articles_failed_total')
+        if self.frontier:
+            self.frontier.mark_failed(article_url, error)
+
+    def close(self):
+        """Ferme la session HTTP et le moteur asynchrone éventuel."""
+        self.session.close()
+        if self.fetcher:
+            self.fetcher.close()
+        if self.cache:
+            self.cache.close()
+        if self.archive:
+            self.archive.close()
@@ -0,0 +1,208 @@
+import gzip
+import json
+import os
+import time
+
+from config import (
+    logger, EXPORT_DIR, EXPORT_MAX_FILE_BYTES, EXPORT_ROW_GROUP_SIZE, WRITE_BATCH_SIZE, WRITE_FLUSH_INTERVAL
+)
+from writer import BulkArticleWriter
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Colonnes des fichiers Parquet : champs texte, puis champs structurés
+# (listes, images) sérialisés en JSON ; les autres champs vont dans `extra`
+TEXT_COLUMNS = (
+    'url', 'title', 'thumbnail', 'category', 'subcategory', 'summary', 'publication_date', 'author',
+    'content', 'source_category', 'simhash', 'duplicate_of', 'scraped_at'
+)
+JSON_COLUMNS = ('subcategories', 'table_of_contents', 'images', 'simhash_bands', 'extra')
+
+
+def _export_path(directory, extension, sequence):
+    # Nom unique par exécution et par processus : les fichiers ne sont jamais réécrits
+    name = f"articles-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{sequence:04d}.{extension}"
+    return os.path.join(directory, name)
+
+
+class JsonlSink:
+    """
+    Destination fichier : une ligne JSON par article, compressée en gzip.
+    Un nouveau fichier est ouvert dès que le fichier courant dépasse
+    `max_bytes` octets compressés. Même interface que BulkArticleWriter
+    (add, flush, close, stats) : dès que `batch_size` articles sont en
+    attente ou que `flush_interval` secondes se sont écoulées, le membre
+    gzip en cours est terminé et écrit sur disque (le fichier reste lisible
+    jusque-là en cas d'arrêt), puis `on_flush` est appelé avec les URLs
+    des articles écrits.
+    """
+
+    def __init__(self, directory=EXPORT_DIR, max_bytes=EXPORT_MAX_FILE_BYTES, batch_size=WRITE_BATCH_SIZE,
+                 flush_interval=WRITE_FLUSH_INTERVAL, on_flush=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        os.makedirs(directory, exist_ok=True)
+        self._raw = None
+        self._file = None
+        self._sequence = 0
+        self._urls = []  # Articles du membre gzip en cours
+        self._last_flush = time.monotonic()
+        self.files = []
+        self.written = 0
+
+    def _open(self):
+        self._sequence += 1
+        path = _export_path(self.directory, 'jsonl.gz', self._sequence)
+        self._raw = open(path, 'ab')
+        self.files.append(path)
+        logger.info(f"Export JSONL: {path}")
+
+    def add(self, article_data):
+        if self._raw is None:
+            self._open()
+        if self._file is None:
+            # Un membre gzip par lot : gzip.open lit les membres à la suite
+            self._file = gzip.GzipFile(fileobj=self._raw, mode='ab')
+        line = json.dumps(article_data, ensure_ascii=False, default=str)
+        self._file.write(line.encode('utf-8') + b'\n')
+        self._urls.append(article_data.get('url'))
+        self.written += 1
+        # Taille compressée effectivement écrite (au tampon du compresseur près)
+        if self._raw.tell() >= self.max_bytes:
+            self.flush()
+            self._close_file()
+        elif (len(self._urls) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Termine le membre gzip en cours et l'écrit sur disque ; le fichier reste ouvert."""
+        self._last_flush = time.monotonic()
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        urls, self._urls = self._urls, []
+        if self.on_flush:
+            self.on_flush(urls)
+
+    def _close_file(self):
+        # L'article suivant ouvrira un nouveau fichier
+        if self._raw is not None:
+            self._raw.close()
+            self._raw = None
+
+    def stats(self):
+        return {'written': self.written, 'files': len(self.files)}
+
+    def close(self):
+        self.flush()
+        self._close_file()
+        logger.info(f"Bilan de l'export JSONL: {self.stats()}")
+
+
+def article_to_row(article_data):
+    """Ligne Parquet d'un article (champs structurés sérialisés en JSON)."""
+    row = {column: article_data.get(column) for column in TEXT_COLUMNS}
+    extra = {k: v for k, v in article_data.items()
+             if k not in TEXT_COLUMNS and k not in JSON_COLUMNS and k != '_id'}
+    for column in JSON_COLUMNS:
+        value = (extra or None) if column == 'extra' else article_data.get(column)
+        row[column] = json.dumps(value, ensure_ascii=False, default=str) if value is not None else None
+    return row
+
+
+def row_to_article(row):
+    """Inverse d'article_to_row."""
+    article_data = {column: row.get(column) for column in TEXT_COLUMNS if row.get(column) is not None}
+    for column in JSON_COLUMNS:
+        value = json.loads(row[column]) if row.get(column) else None
+        if column == 'extra':
+            article_data.update(value or {})
+        elif value is not None:
+            article_data[column] = value
+    return article_data
+
+
+class ParquetSink:
+    """
+    Destination fichier en colonnes (Parquet, via pyarrow) : les articles
+    sont accumulés puis écrits par groupes de `row_group_size` lignes, et
+    un nouveau fichier est ouvert au-delà de `max_bytes` octets.
+    `on_flush` est appelé après chaque groupe de lignes écrit, avec les
+    URLs des articles du groupe.
+    """
+
+    def __init__(self, directory=EXPORT_DIR, row_group_size=EXPORT_ROW_GROUP_SIZE,
+                 max_bytes=EXPORT_MAX_FILE_BYTES, on_flush=None):
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow n'est pas installé : export Parquet indisponible")
+        self.directory = directory
+        self.row_group_size = row_group_size
+        self.max_bytes = max_bytes
+        self.on_flush = on_flush
+        os.makedirs(directory, exist_ok=True)
+        self.schema = pa.schema([(column, pa.string()) for column in TEXT_COLUMNS + JSON_COLUMNS])
+        self._rows = []
+        self._writer = None
+        self._path = None
+        self._sequence = 0
+        self.files = []
+        self.written = 0
+
+    def add(self, article_data):
+        self._rows.append(article_to_row(article_data))
+        if len(self._rows) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        """Écrit les articles en attente sous la forme d'un groupe de lignes."""
+        if not self._rows:
+            return
+        if self._writer is None:
+            self._sequence += 1
+            self._path = _export_path(self.directory, 'parquet', self._sequence)
+            self._writer = pq.ParquetWriter(self._path, self.schema, compression='zstd')
+            self.files.append(self._path)
+            logger.info(f"Export Parquet: {self._path}")
+
+        self._writer.write_table(pa.Table.from_pylist(self._rows, schema=self.schema))
+        self.written += len(self._rows)
+        urls = [row['url'] for row in self._rows]
+        self._rows = []
+        if os.path.getsize(self._path) >= self.max_bytes:
+            self._close_file()
+        if self.on_flush:
+            self.on_flush(urls)
+
+    def _close_file(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def stats(self):
+        return {'written': self.written, 'files': len(self.files)}
+
+    def close(self):
+        self.flush()
+        self._close_file()
+        logger.info(f"Bilan de l'export Parquet: {self.stats()}")
+
+
+def open_sink(name, collection=None, directory=EXPORT_DIR, on_flush=None):
+    """Destination des articles : 'mongo' (BulkArticleWriter), 'jsonl' ou 'parquet'."""
+    if name == 'jsonl':
+        return JsonlSink(directory, on_flush=on_flush)
+    if name == 'parquet':
+        return ParquetSink(directory, on_flush=on_flush)
+    return BulkArticleWriter(collection, on_flush=on_flush)
@@ -0,0 +1,149 @@
+import gzip
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+
+import requests
+from config import (
+    logger, REQUEST_TIMEOUT, DOWNLOAD_CHUNK_SIZE, SITEMAP_INDEX_URL, SITEMAP_FILTER, SITEMAP_MAX_BYTES,
+    SITEMAP_SPOOL_BYTES
+)
+from http_client import PageTooLarge
+
+
+def _local_name(tag):
+    # Supprime l'espace de noms : '{http://www.sitemaps.org/...}url' -> 'url'
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_lastmod(value):
+    """Convertit une date <lastmod> (W3C datetime) en datetime UTC, None si invalide."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def iter_sitemap_entries(stream):
+    """
+    Lit un sitemap (ou un index de sitemaps) en flux avec iterparse et génère
+    des tuples (type, loc, lastmod) où type vaut 'url' ou 'sitemap'.
+
+    Chaque entrée est libérée dès qu'elle est lue : la mémoire reste constante
+    quelle que soit la taille du fichier.
+    """
+    root = None
+    for event, element in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = element
+            continue
+
+        kind = _local_name(element.tag)
+        if kind in ('url', 'sitemap'):
+            loc = lastmod = None
+            for child in element:
+                name = _local_name(child.tag)
+                if name == 'loc':
+                    loc = (child.text or '').strip()
+                elif name == 'lastmod':
+                    lastmod = parse_lastmod(child.text)
+            if loc:
+                yield kind, loc, lastmod
+            element.clear()
+            root.clear()
+
+
+def download_sitemap(session, url, limiter=None, timeout=REQUEST_TIMEOUT, max_bytes=SITEMAP_MAX_BYTES,
+                     spool_bytes=SITEMAP_SPOOL_BYTES, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """
+    Télécharge un sitemap en entier (au plus `max_bytes` octets, limite
+    vérifiée bloc par bloc) dans un fichier tampon : en mémoire jusqu'à
+    `spool_bytes` octets, sur disque au-delà. Renvoie un flux positionné au
+    début, à fermer par l'appelant ; les fichiers .gz sont décompressés à la
+    lecture. La connexion est libérée avant l'analyse : elle ne reste pas
+    ouverte pendant la récupération des articles. None en cas d'erreur.
+    """
+    if limiter:
+        limiter.acquire()
+    start = time.monotonic()
+    spool = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+    try:
+        response = session.get(url, timeout=timeout, stream=True)
+        try:
+            response.raise_for_status()
+            declared = response.headers.get('Content-Length', '')
+            if declared.isdigit() and int(declared) > max_bytes:
+                raise PageTooLarge(f"taille annoncée {declared} octets > {max_bytes}")
+            size = 0
+            for chunk in response.iter_content(chunk_size):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise PageTooLarge(f"plus de {max_bytes} octets reçus")
+                spool.write(chunk)
+        finally:
+            response.close()
+    except (requests.exceptions.RequestException, PageTooLarge) as e:
+        spool.close()
+        if limiter:
+            limiter.record(latency=time.monotonic() - start, error=True)
+        logger.error(f"Erreur lors de la récupération du sitemap {url}: {e}")
+        return None
+    if limiter:
+        limiter.record(latency=time.monotonic() - start, status_code=response.status_code)
+
+    spool.seek(0)
+    magic = spool.read(2)
+    spool.seek(0)
+    if url.endswith('.gz') and magic == b'\x1f\x8b':
+        # Fichier .gz (le serveur peut aussi l'avoir déjà décompressé via Content-Encoding)
+        return gzip.GzipFile(fileobj=spool, mode='rb')
+    return spool
+
+
+def iter_sitemap(session, url, limiter=None, timeout=REQUEST_TIMEOUT):
+    """Génère les entrées d'un sitemap distant (téléchargé en entier puis lu en flux)."""
+    stream = download_sitemap(session, url, limiter, timeout)
+    if stream is None:
+        return
+    try:
+        yield from iter_sitemap_entries(stream)
+    except (ET.ParseError, OSError, EOFError) as e:
+        logger.error(f"Sitemap invalide {url}: {e}")
+    finally:
+        # GzipFile ne ferme pas le fichier tampon qu'il enveloppe
+        spool = stream.fileobj if isinstance(stream, gzip.GzipFile) else stream
+        stream.close()
+        spool.close()
+
+
+def discover_article_urls(session, index_url=SITEMAP_INDEX_URL, limiter=None,
+                          sitemap_filter=SITEMAP_FILTER, timeout=REQUEST_TIMEOUT):
+    """
+    Découvre les articles à partir de l'index des sitemaps.
+
+    Seuls les sitemaps dont l'URL contient `sitemap_filter` (sitemaps
+    d'articles) sont parcourus. Tous les articles sont renvoyés, quel que
+    soit leur <lastmod> : un article jamais récupéré peut avoir une date
+    ancienne. Le tri entre articles connus, modifiés ou nouveaux est fait
+    par l'appelant. Génère des couples (url, lastmod).
+    """
+    for kind, loc, lastmod in iter_sitemap(session, index_url, limiter, timeout):
+        if kind == 'url':
+            # Le fichier n'est pas un index mais directement un sitemap d'articles
+            yield loc, lastmod
+            continue
+
+        if sitemap_filter and sitemap_filter not in loc:
+            continue
+
+        logger.info(f"Lecture du sitemap: {loc}")
+        for entry_kind, url, url_lastmod in iter_sitemap(session, loc, limiter, timeout):
+            if entry_kind == 'url':
+                yield url, url_lastmod
@@ -0,0 +1,15 @@
+import os
+import sys
+
+# Les modules du scraper s'importent à plat (lancés depuis scrapper/)
+SCRAPPER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRAPPER_DIR not in sys.path:
+    sys.path.insert(0, SCRAPPER_DIR)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers', "mongodb: nécessite un serveur MongoDB (MONGO_TEST_URI, par défaut MONGO_URI de config.py)"
+    )
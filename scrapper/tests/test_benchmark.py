@@ -0,0 +1,36 @@
+import json
+import os
+
+import pytest
+
+from benchmark import BASELINE_PATH, _result_digest, benchmark_article, benchmark_category, load_fixtures, trim_page
+
+FIXTURES = load_fixtures()
+
+
+def test_digest_ignores_fields_added_after_extraction():
+    fields = {'title': 'Titre', 'content': 'Contenu'}
+
+    assert _result_digest(dict(fields, scraped_at='2024-02-01T10:00:00', simhash='00ff',
+                               simhash_bands=['0:00', '1:ff'])) == _result_digest(fields)
+    assert _result_digest(dict(fields, title='Autre titre')) != _result_digest(fields)
+
+
+@pytest.mark.parametrize('name,kind,content', FIXTURES, ids=[name for name, _, _ in FIXTURES])
+def test_extraction_matches_baseline_digest(name, kind, content):
+    if not os.path.exists(BASELINE_PATH):
+        pytest.skip("aucune référence enregistrée (benchmark.py --save-baseline)")
+    with open(BASELINE_PATH, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if name not in baseline:
+        pytest.skip(f"{name} absent de la référence (benchmark.py --save-baseline)")
+    benchmark = benchmark_article if kind == 'article' else benchmark_category
+
+    assert benchmark(name, content, repeat=1)['digest'] == baseline[name]['digest']
+
+
+@pytest.mark.parametrize('name,kind,content', FIXTURES, ids=[name for name, _, _ in FIXTURES])
+def test_trimmed_page_keeps_extraction_result(name, kind, content):
+    benchmark = benchmark_article if kind == 'article' else benchmark_category
+
+    assert benchmark(name, trim_page(content), repeat=1)['digest'] == benchmark(name, content, repeat=1)['digest']
@@ -0,0 +1,88 @@
+import pytest
+
+import scraper as scraper_module
+from benchmark import load_fixtures
+from extraction_engine import INDEXED_SELECTORS, DocumentIndex, extract_single_pass
+import extractors
+from extractors import (
+    clean_content_element, extract_all, extract_content_parts_legacy, extract_content_parts_linear
+)
+from parsing import make_soup
+from profiles import BLOG_DU_MODERATEUR, ExtractionProfile, get_profile
+
+URL = "https://www.blogdumoderateur.com/article-test/"
+
+ARTICLES = [(name, content) for name, kind, content in load_fixtures() if kind == 'article']
+IDS = [name for name, _ in ARTICLES]
+
+
+def _without_scraped_at(article_data):
+    return {k: v for k, v in article_data.items() if k != 'scraped_at'}
+
+
+@pytest.mark.parametrize('name,content', ARTICLES, ids=IDS)
+def test_single_pass_matches_reference_extractors(name, content):
+    # Arbres distincts : l'extraction du contenu nettoie la zone de contenu en place
+    assert extract_single_pass(make_soup(content, 'article')) == extract_all(make_soup(content, 'article'))
+
+
+@pytest.mark.parametrize('name,content', ARTICLES, ids=IDS)
+def test_article_data_does_not_depend_on_engine(name, content, monkeypatch):
+    results = {}
+    for engine in ('single_pass', 'legacy'):
+        monkeypatch.setattr(scraper_module, 'EXTRACTION_ENGINE', engine)
+        results[engine] = _without_scraped_at(scraper_module.parse_article_html(URL, content))
+
+    assert results['single_pass'] == results['legacy']
+    assert results['single_pass']['title'] and results['single_pass']['content']
+
+
+def test_index_keys_come_from_the_profile():
+    # Toutes les formes reconnues par le parcours sont des sélecteurs du profil par défaut
+    assert INDEXED_SELECTORS <= set(get_profile().selectors)
+
+
+@pytest.mark.parametrize('name,content', ARTICLES, ids=IDS)
+def test_single_pass_follows_a_profile_with_other_selectors(name, content):
+    profile = ExtractionProfile('variante', {
+        **BLOG_DU_MODERATEUR,
+        'title': '.entry-title, h1',
+        'first_paragraph': 'article p',
+    })
+    soup = make_soup(content, 'article')
+    index = DocumentIndex(soup, profile)
+
+    assert index.first(profile.title_selector) == soup.select_one(profile.title_selector)
+    assert index.first(profile.first_paragraph_selector) == soup.select_one(profile.first_paragraph_selector)
+    assert extract_single_pass(make_soup(content, 'article'), profile) == extract_all(make_soup(content, 'article'), profile)
+
+
+def _content_element(content):
+    soup = make_soup(content, 'article')
+    element = soup.select_one('.entry-content')
+    clean_content_element(element)
+    return element
+
+
+@pytest.mark.parametrize('name,content', ARTICLES, ids=IDS)
+def test_linear_content_extractor_matches_legacy(name, content):
+    assert (extract_content_parts_linear(_content_element(content))
+            == extract_content_parts_legacy(_content_element(content)))
+
+
+@pytest.mark.parametrize('name,content', ARTICLES, ids=IDS)
+def test_article_data_does_not_depend_on_content_extractor(name, content, monkeypatch):
+    results = {}
+    for extractor in ('linear', 'legacy'):
+        monkeypatch.setattr(extractors, 'CONTENT_EXTRACTOR', extractor)
+        results[extractor] = _without_scraped_at(scraper_module.parse_article_html(URL, content))
+
+    assert results['linear'] == results['legacy']
+
+
+def test_linear_content_extractor_is_bounded():
+    _, content = max(ARTICLES, key=lambda article: len(article[1]))
+    parts = extract_content_parts_legacy(_content_element(content))
+
+    assert extract_content_parts_linear(_content_element(content), max_chars=len(parts[0])) == parts[:1]
+    assert len(extract_content_parts_linear(_content_element(content), max_nodes=10)) < len(parts)
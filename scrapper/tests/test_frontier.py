@@ -0,0 +1,27 @@
+from frontier import CrawlFrontier
+
+CATEGORY = 'https://site/categorie/'
+
+
+def test_complete_keeps_failed_articles_under_the_attempt_cap(tmp_path):
+    path = str(tmp_path / 'frontier.sqlite')
+    frontier = CrawlFrontier(path, max_attempts=2)
+    frontier.add_articles(['https://site/a/', 'https://site/b/', 'https://site/c/'], CATEGORY)
+    frontier.checkpoint(['https://site/a/'])
+    frontier.mark_failed('https://site/b/', 'timeout')
+    frontier.mark_failed('https://site/c/', 'timeout')
+    frontier.mark_failed('https://site/c/', 'timeout')
+
+    frontier.complete()
+    frontier.close()
+
+    # Passage suivant : seul l'article sous le plafond est retenté, avec son compteur
+    frontier = CrawlFrontier(path, max_attempts=2)
+    try:
+        frontier.add_articles(['https://site/a/', 'https://site/b/', 'https://site/c/'], CATEGORY)
+        assert frontier.get_categories() == []
+        assert frontier.pending_articles(CATEGORY) == ['https://site/a/', 'https://site/b/', 'https://site/c/']
+        frontier.mark_failed('https://site/b/', 'timeout')
+        assert 'https://site/b/' not in frontier.pending_articles(CATEGORY)
+    finally:
+        frontier.close()
@@ -0,0 +1,150 @@
+import socket
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from http_cache import HttpCache
+import http_client
+from http_client import NOT_MODIFIED, backoff_delay, fetch_url
+
+ETAG = '"v1"'
+PAGE = b'<html><body><main><h1>Titre</h1></main><footer>' + b'x' * 200_000 + b'</footer></body></html>'
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    """Sert une page unique avec un ETag et répond 304 aux requêtes conditionnelles."""
+
+    def do_GET(self):
+        self.server.requests.append(self.headers.get('If-None-Match'))
+        if self.path == '/deplace/':
+            # Redirection sans Location : non suivie par requests
+            self.send_response(302)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.send_header('ETag', ETAG)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def session():
+    with requests.Session() as s:
+        yield s
+
+
+@pytest.fixture
+def cache(tmp_path):
+    http_cache = HttpCache(str(tmp_path / 'cache.sqlite'))
+    yield http_cache
+    http_cache.close()
+
+
+def page_url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/article/"
+
+
+def test_full_page_is_cached_and_revalidated(server, session, cache):
+    url = page_url(server)
+
+    assert fetch_url(session, url, cache=cache) == PAGE
+    cache.confirm([url])
+    assert fetch_url(session, url, cache=cache) == PAGE
+    assert fetch_url(session, url, cache=cache, skip_unchanged=True) is NOT_MODIFIED
+    assert server.requests == [None, ETAG, ETAG]
+
+
+def test_truncated_page_is_not_cached(server, session, cache):
+    url = page_url(server)
+
+    content = fetch_url(session, url, cache=cache, stop_marker=b'</main>')
+
+    assert content.endswith(b'</main>') and len(content) < len(PAGE)
+    assert cache.conditional_headers(url) == {}
+    # Sans entrée en cache, la requête suivante n'est pas conditionnelle : page entière
+    assert fetch_url(session, url, cache=cache) == PAGE
+    assert server.requests == [None, None]
+
+
+def test_evicted_entry_is_fetched_again_without_using_a_retry(server, session, cache, monkeypatch):
+    url = page_url(server)
+    fetch_url(session, url, cache=cache)
+    cache.confirm([url])
+    # Entrée évincée entre la requête conditionnelle et la réponse 304
+    monkeypatch.setattr(cache, 'get_body', lambda url: None)
+
+    assert fetch_url(session, url, cache=cache, max_retries=0) == PAGE
+    assert server.requests == [None, ETAG, None]
+
+
+def test_unexpected_status_is_an_error(server, session, cache):
+    url = f"http://127.0.0.1:{server.server_address[1]}/deplace/"
+
+    assert fetch_url(session, url, cache=cache) is None
+    assert server.requests == [None]
+
+
+def test_unconfirmed_page_is_downloaded_again(server, session, cache):
+    url = page_url(server)
+    fetch_url(session, url, cache=cache)
+
+    # Écriture de l'article non confirmée : pas de requête conditionnelle
+    assert fetch_url(session, url, cache=cache, skip_unchanged=True) == PAGE
+    cache.confirm([url])
+    assert fetch_url(session, url, cache=cache, skip_unchanged=True) is NOT_MODIFIED
+    assert server.requests == [None, None, ETAG]
+
+
+def test_cache_without_confirmation_column_is_migrated(tmp_path):
+    path = str(tmp_path / 'ancien.sqlite')
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE entries (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+                 "body BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)")
+    conn.execute("INSERT INTO entries VALUES ('https://a/', '\"v1\"', NULL, x'00', 1, 0)")
+    conn.commit()
+    conn.close()
+
+    http_cache = HttpCache(path)
+    try:
+        assert http_cache.conditional_headers('https://a/') == {}
+        http_cache.confirm(['https://a/'])
+        assert http_cache.conditional_headers('https://a/') == {'If-None-Match': '"v1"'}
+    finally:
+        http_cache.close()
+
+
+def test_network_errors_are_retried_with_exponential_backoff(session, monkeypatch):
+    delays = []
+    monkeypatch.setattr(http_client.time, 'sleep', delays.append)
+    monkeypatch.setattr(http_client.random, 'uniform', lambda low, high: 1.0)
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]  # Port fermé : connexion refusée
+
+    assert fetch_url(session, f"http://127.0.0.1:{port}/", max_retries=3, timeout=1) is None
+    assert delays == [backoff_delay(0), backoff_delay(1), backoff_delay(2)]
+    assert delays[1] == 2 * delays[0] and delays[2] == 2 * delays[1]
@@ -0,0 +1,120 @@
+import os
+
+import mongomock
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import OperationFailure, PyMongoError
+
+from config import MONGO_URI
+from index_manager import ARTICLE_INDEXES, check_query_paths, ensure_indexes
+from mongo_utils import ensure_filter_keys, ensure_search_text_size
+
+INDEXES = {'url_1': ([('url', 1)], {'unique': True})}
+
+
+class FailingCollection:
+    """Collection dont la première création d'index échoue avec le code donné."""
+
+    def __init__(self, code, existing=()):
+        self.code = code
+        self.existing = list(existing)
+        self.created = []
+        self.dropped = []
+
+    def create_index(self, keys, name, **options):
+        if not self.created and self.code:
+            self.created.append(None)
+            raise OperationFailure("échec", code=self.code)
+        self.created.append(name)
+
+    def list_indexes(self):
+        return self.existing
+
+    def drop_index(self, name):
+        self.dropped.append(name)
+
+
+@pytest.mark.parametrize('code', [85, 86])
+def test_conflicting_index_is_replaced(code):
+    collection = FailingCollection(code, existing=[
+        {'name': '_id_', 'key': {'_id': 1}},
+        {'name': 'url_1', 'key': {'url': 1}},
+    ])
+
+    ensure_indexes(collection, INDEXES)
+
+    assert collection.dropped == ['url_1']
+    assert collection.created[-1] == 'url_1'
+
+
+def test_other_index_errors_are_raised():
+    # Ex. DuplicateKey (11000) : l'index unique ne peut pas être créé, rien n'est supprimé
+    collection = FailingCollection(11000, existing=[{'name': 'url_1', 'key': {'url': 1}}])
+
+    with pytest.raises(OperationFailure):
+        ensure_indexes(collection, INDEXES)
+    assert collection.dropped == []
+
+
+def test_filter_keys_are_backfilled_once():
+    collection = mongomock.MongoClient().db.articles
+    collection.insert_one({'url': 'https://a/', 'category': 'Réseaux  Sociaux', 'subcategory': 'Facebook, Meta'})
+
+    ensure_filter_keys(collection)
+
+    article = collection.find_one({'url': 'https://a/'})
+    assert article['category_key'] == 'réseaux sociaux'
+    assert article['subcategory_keys'] == ['facebook', 'meta']
+
+    # Migration notée : pas de nouveau parcours de la collection
+    collection.insert_one({'url': 'https://b/', 'category': 'Web'})
+    ensure_filter_keys(collection)
+    assert 'category_key' not in collection.find_one({'url': 'https://b/'})
+
+
+def test_search_text_is_shrunk_once():
+    collection = mongomock.MongoClient().db.articles
+    collection.insert_many([
+        {'url': 'https://a/', 'search_text': 'a' * 50},
+        {'url': 'https://b/', 'search_text': 'b' * 5},
+        {'url': 'https://c/'},
+    ])
+
+    ensure_search_text_size(collection, max_chars=10)
+
+    assert collection.find_one({'url': 'https://a/'})['search_text'] == 'a' * 10
+    assert collection.find_one({'url': 'https://b/'})['search_text'] == 'b' * 5
+    collection.insert_one({'url': 'https://d/', 'search_text': 'd' * 50})
+    ensure_search_text_size(collection, max_chars=10)
+    assert len(collection.find_one({'url': 'https://d/'})['search_text']) == 50
+
+
+@pytest.fixture
+def live_collection():
+    client = MongoClient(os.environ.get('MONGO_TEST_URI', MONGO_URI), serverSelectionTimeoutMS=500)
+    try:
+        client.admin.command('ping')
+    except PyMongoError:
+        client.close()
+        pytest.skip("serveur MongoDB indisponible")
+    db = client[f"scrapper_test_{os.getpid()}"]
+    yield db.articles
+    client.drop_database(db.name)
+    client.close()
+
+
+@pytest.mark.mongodb
+def test_query_paths_are_served_by_indexes(live_collection):
+    live_collection.insert_many([
+        {
+            'url': f"https://www.blogdumoderateur.com/article-{i}/", 'title': f"Article {i}",
+            'publication_date': f"2024-01-{i % 28 + 1:02d}", 'scraped_at': f"2024-02-01T00:00:{i % 60:02d}",
+            'category_key': f"categorie {i % 5}", 'subcategory_keys': [f"sous-categorie {i % 7}"],
+            'author_key': f"auteur {i % 3}", 'search_text': "texte",
+        }
+        for i in range(200)
+    ])
+    ensure_indexes(live_collection)
+
+    assert {index['name'] for index in live_collection.list_indexes()} >= set(ARTICLE_INDEXES)
+    assert check_query_paths(live_collection) == []
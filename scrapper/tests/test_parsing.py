@@ -0,0 +1,57 @@
+import pytest
+
+import parsing
+from benchmark import FIXTURES_DIR as BENCHMARK_FIXTURES_DIR, load_fixtures
+from parsing import make_soup
+from scraper import extract_article_data, extract_listing_urls
+
+URL = "https://www.blogdumoderateur.com/article-test/"
+
+# Contenu accessible uniquement par le sélecteur de repli 'main article'
+MAIN_ARTICLE_PAGE = """<html><head><title>t</title></head><body>
+<header><nav><a href="/">Accueil</a></nav></header>
+<main><article><h1>Titre de repli</h1>
+<p>Premier paragraphe du contenu de repli.</p><p>Second paragraphe.</p>
+</article></main>
+<aside class="sidebar"><p>Barre latérale</p></aside>
+<footer><p>Pied de page</p></footer>
+</body></html>""".encode('utf-8')
+
+FIXTURES = load_fixtures(BENCHMARK_FIXTURES_DIR) + [('article_main_fallback', 'article', MAIN_ARTICLE_PAGE)]
+
+
+def _without_scraped_at(article_data):
+    return {k: v for k, v in article_data.items() if k != 'scraped_at'}
+
+
+def _extract(kind, content, restricted):
+    if kind == 'article':
+        return _without_scraped_at(extract_article_data(URL, make_soup(content, 'article', restricted)))
+    return extract_listing_urls(make_soup(content, 'listing', restricted))
+
+
+@pytest.fixture(params=['html.parser', 'lxml'])
+def parser_name(request, monkeypatch):
+    if request.param == 'lxml':
+        pytest.importorskip('lxml')
+    monkeypatch.setattr(parsing, 'get_parser_name', lambda backend=None: request.param)
+    return request.param
+
+
+@pytest.mark.parametrize('name,kind,content', FIXTURES, ids=[name for name, _, _ in FIXTURES])
+def test_restricted_parse_matches_full_parse(parser_name, name, kind, content):
+    assert _extract(kind, content, restricted=True) == _extract(kind, content, restricted=False)
+
+
+def test_main_article_fallback_with_restricted_parse(parser_name):
+    article_data = _extract('article', MAIN_ARTICLE_PAGE, restricted=True)
+
+    assert article_data['title'] == 'Titre de repli'
+    assert 'Premier paragraphe du contenu de repli.' in article_data['content']
+    assert 'Barre latérale' not in article_data['content']
+
+
+@pytest.mark.skipif(parsing.LXML_AVAILABLE, reason="lxml installé")
+def test_parser_falls_back_without_lxml():
+    assert parsing.get_parser_name('lxml') == 'html.parser'
+    assert parsing.get_parser_name('auto') == 'html.parser'
@@ -0,0 +1,22 @@
+import mongomock
+
+from fingerprint import fingerprint_fields
+from reextract import Reextractor
+
+URL = "https://www.blogdumoderateur.com/article-test/"
+OLD_CONTENT = "Ancien contenu de l'article, avant la correction des extracteurs."
+NEW_CONTENT = "Nouveau contenu de l'article, extrait par la version actuelle des extracteurs."
+
+
+def test_content_change_updates_fingerprint_when_fields_are_restricted():
+    collection = mongomock.MongoClient().db.articles
+    collection.insert_one({'url': URL, 'title': 'Titre', 'content': OLD_CONTENT, **fingerprint_fields(OLD_CONTENT)})
+    reextractor = Reextractor(collection, archive=None, fields=['content'])
+
+    reextractor._apply([(URL, {'title': 'Titre', 'content': NEW_CONTENT})])
+
+    article = collection.find_one({'url': URL})
+    expected = fingerprint_fields(NEW_CONTENT)
+    assert article['simhash'] == expected['simhash']
+    assert article['simhash_bands'] == expected['simhash_bands']
+    assert reextractor.counts['updated'] == 1
@@ -0,0 +1,69 @@
+import glob
+import os
+
+import mongomock
+
+from loader import iter_export_file, load_files
+from sinks import JsonlSink
+
+
+def _article(i):
+    return {'url': f"https://www.blogdumoderateur.com/article-{i}/", 'title': f"Article {i}"}
+
+
+def test_jsonl_sink_confirms_articles_by_batch(tmp_path):
+    flushed = []
+    sink = JsonlSink(str(tmp_path), batch_size=2, flush_interval=float('inf'), on_flush=flushed.append)
+    for i in range(5):
+        sink.add(_article(i))
+
+    # Lots confirmés lisibles avant la fermeture du fichier
+    assert flushed == [[_article(0)['url'], _article(1)['url']], [_article(2)['url'], _article(3)['url']]]
+    assert [a['url'] for a in iter_export_file(sink.files[0])] == [_article(i)['url'] for i in range(4)]
+
+    sink.close()
+    assert flushed[-1] == [_article(4)['url']]
+    assert len(sink.files) == 1
+    assert len(list(iter_export_file(sink.files[0]))) == 5
+
+
+def test_jsonl_sink_confirms_articles_after_interval(tmp_path):
+    flushed = []
+    sink = JsonlSink(str(tmp_path), batch_size=1000, flush_interval=0, on_flush=flushed.append)
+    sink.add(_article(0))
+
+    assert flushed == [[_article(0)['url']]]
+    sink.close()
+
+
+def test_jsonl_sink_rotates_files(tmp_path):
+    flushed = []
+    sink = JsonlSink(str(tmp_path), max_bytes=1, flush_interval=float('inf'), on_flush=flushed.append)
+    for i in range(3):
+        sink.add(_article(i))
+    sink.close()
+
+    assert len(sink.files) == 3
+    assert sum(flushed, []) == [_article(i)['url'] for i in range(3)]
+
+
+def test_truncated_export_keeps_read_lines_and_next_files(tmp_path):
+    sink = JsonlSink(str(tmp_path), batch_size=2, flush_interval=float('inf'))
+    for i in range(4):
+        sink.add(_article(i))
+    sink.close()
+    path = sink.files[0]
+    with open(path, 'rb') as f:
+        data = f.read()
+    # Export interrompu au milieu du second membre gzip
+    truncated = os.path.join(str(tmp_path), 'articles-truncated.jsonl.gz')
+    with open(truncated, 'wb') as f:
+        f.write(data[:-10])
+
+    urls = [a['url'] for a in iter_export_file(truncated)]
+    assert urls[:2] == [_article(0)['url'], _article(1)['url']]
+
+    collection = mongomock.MongoClient().db.articles
+    stats = load_files(sorted(glob.glob(os.path.join(str(tmp_path), '*.jsonl.gz'))), collection)
+    assert stats['inserted'] == 4
+    assert collection.count_documents({}) == 4
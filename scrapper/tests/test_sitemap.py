@@ -0,0 +1,157 @@
+import gzip
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from conftest import FIXTURES_DIR
+from sitemap import discover_article_urls, download_sitemap, iter_sitemap
+import scraper as scraper_module
+from rate_limiter import AdaptiveRateLimiter
+from scraper import BlogDuModerateurScraper
+
+SITEMAPS_DIR = os.path.join(FIXTURES_DIR, 'sitemaps')
+ARTICLE = "https://www.blogdumoderateur.com/{}/"
+
+
+def fast_limiter():
+    # Serveur local : pas besoin du débit poli par défaut
+    return AdaptiveRateLimiter(rate=100, max_rate=100)
+
+
+class SitemapHandler(BaseHTTPRequestHandler):
+    """Sert les sitemaps de test ; {base} est remplacé par l'adresse du serveur."""
+
+    def do_GET(self):
+        path = self.path.lstrip('/')
+        if path == 'index-slow.xml':
+            body = (
+                '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                f'<sitemap><loc>{self.server.base}/post-slow-sitemap.xml</loc></sitemap>'
+                f'<sitemap><loc>{self.server.base}/post-sitemap.xml</loc></sitemap>'
+                '</sitemapindex>'
+            ).encode('utf-8')
+        elif path == 'post-slow-sitemap.xml':
+            time.sleep(1)
+            body = b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"></urlset>'
+        elif path == 'broken-sitemap.xml':
+            body = b'<urlset><url><loc>https://www.blogdumoderateur.com/coupe/'
+        else:
+            gzipped = path.endswith('.gz')
+            file_path = os.path.join(SITEMAPS_DIR, path[:-3] if gzipped else path)
+            if not os.path.isfile(file_path):
+                self.send_error(404)
+                return
+            with open(file_path, encoding='utf-8') as f:
+                body = f.read().replace('{base}', self.server.base).encode('utf-8')
+            if gzipped:
+                body = gzip.compress(body)
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), SitemapHandler)
+    httpd.base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.base
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def session():
+    with requests.Session() as s:
+        yield s
+
+
+def test_discovers_articles_of_post_sitemaps_only(server, session):
+    urls = dict(discover_article_urls(session, f"{server}/sitemap_index.xml"))
+
+    assert set(urls) == {
+        ARTICLE.format('article-recent'), ARTICLE.format('article-modifie'),
+        ARTICLE.format('article-sans-date'), ARTICLE.format('article-ancien-connu'),
+        ARTICLE.format('article-ancien-inconnu'),
+    }
+    assert urls[ARTICLE.format('article-modifie')] == datetime(2024, 2, 20, 12, tzinfo=timezone.utc)
+    assert urls[ARTICLE.format('article-sans-date')] is None
+
+
+def test_missing_and_invalid_sitemaps_are_skipped(server, session):
+    assert list(iter_sitemap(session, f"{server}/post-sitemap-missing.xml")) == []
+    assert list(iter_sitemap(session, f"{server}/broken-sitemap.xml")) == []
+
+
+def test_read_timeout_does_not_stop_discovery(server, session):
+    urls = [url for url, _ in discover_article_urls(session, f"{server}/index-slow.xml", timeout=0.2)]
+
+    assert ARTICLE.format('article-recent') in urls
+
+
+def test_sitemap_is_read_before_its_entries_are_used(server, session, monkeypatch):
+    responses = []
+    get = session.get
+
+    def recording_get(*args, **kwargs):
+        responses.append(get(*args, **kwargs))
+        return responses[-1]
+
+    monkeypatch.setattr(session, 'get', recording_get)
+    entries = discover_article_urls(session, f"{server}/sitemap_index.xml")
+    next(entries)
+
+    # Index et premier sitemap entièrement lus : aucune connexion ne reste ouverte
+    assert len(responses) == 2
+    assert all(response.raw.closed for response in responses)
+
+
+def test_large_sitemap_is_spooled_to_disk(server, session):
+    stream = download_sitemap(session, f"{server}/post-sitemap.xml.gz", spool_bytes=16, chunk_size=16)
+    try:
+        assert stream.fileobj._rolled
+        assert b'article-recent' in stream.read()
+    finally:
+        stream.close()
+
+
+def test_sitemap_over_the_byte_cap_is_rejected_while_streaming(server, session):
+    assert download_sitemap(session, f"{server}/post-sitemap.xml", max_bytes=64) is None
+
+
+def test_incremental_sitemap_batches_keep_old_unknown_articles(server, monkeypatch):
+    monkeypatch.setattr(scraper_module, 'SITEMAP_INDEX_URL', f"{server}/sitemap_index.xml")
+    known = {ARTICLE.format('article-ancien-connu'), ARTICLE.format('article-modifie')}
+    scraper = BlogDuModerateurScraper(rate_limiter=fast_limiter(), known_url_filter=lambda urls: known.intersection(urls))
+    since = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    try:
+        urls = [url for _, batch in scraper.iter_sitemap_batches(since=since) for url in batch]
+    finally:
+        scraper.close()
+
+    # Connu et inchangé : ignoré ; connu mais modifié depuis `since` : repris ;
+    # jamais récupéré : retenu même avec un <lastmod> ancien
+    assert ARTICLE.format('article-ancien-connu') not in urls
+    assert ARTICLE.format('article-modifie') in urls
+    assert ARTICLE.format('article-ancien-inconnu') in urls
+
+
+def test_sitemap_batches_are_capped(server, monkeypatch):
+    monkeypatch.setattr(scraper_module, 'SITEMAP_INDEX_URL', f"{server}/sitemap_index.xml")
+    scraper = BlogDuModerateurScraper(rate_limiter=fast_limiter())
+    try:
+        batches = list(scraper.iter_sitemap_batches(max_articles=2, batch_size=1))
+    finally:
+        scraper.close()
+
+    assert sum(len(urls) for _, urls in batches) == 2
@@ -0,0 +1,151 @@
+import mongomock
+import pytest
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from article_store import ArticleStore
+from writer import BulkArticleWriter
+
+
+def _article(i, content="Contenu de l'article", **fields):
+    article = {
+        'url': f"https://www.blogdumoderateur.com/article-{i}/", 'title': f"Article {i}",
+        'category': 'Réseaux sociaux', 'subcategory': 'Facebook', 'author': 'Auteur',
+        'content': content, 'images': [], 'table_of_contents': [],
+        'scraped_at': f"2024-02-01T10:00:0{i}",
+    }
+    article.update(fields)
+    return article
+
+
+@pytest.fixture
+def collection():
+    return mongomock.MongoClient().db.articles
+
+
+@pytest.fixture
+def flushed():
+    return []
+
+
+@pytest.fixture
+def writer(collection, flushed):
+    return BulkArticleWriter(collection, batch_size=100, flush_interval=float('inf'), on_flush=flushed.append)
+
+
+def _fail_bulk_write(monkeypatch, target, error):
+    def bulk_write(operations, ordered=True):
+        raise error
+    monkeypatch.setattr(target, 'bulk_write', bulk_write)
+
+
+def test_upserts_are_idempotent(collection, writer, flushed):
+    for i in range(2):
+        writer.add(_article(i))
+    writer.flush()
+    for i in range(2):
+        writer.add(_article(i, scraped_at="2024-03-01T10:00:00"))
+    writer.flush()
+
+    assert writer.stats() == {'inserted': 2, 'updated': 0, 'unchanged': 2, 'duplicates': 0, 'errors': 0}
+    assert collection.count_documents({}) == 2
+    metadata = collection.find_one({'url': _article(0)['url']})
+    # Date de première récupération conservée, corps hors des métadonnées, clés des filtres
+    assert metadata['scraped_at'] == _article(0)['scraped_at']
+    assert 'content' not in metadata
+    assert metadata['category_key'] == 'réseaux sociaux'
+    assert ArticleStore(collection).get_article({'url': _article(0)['url']})['content'] == "Contenu de l'article"
+    assert len(flushed) == 2
+
+
+def test_modified_article_is_updated(collection, writer):
+    writer.add(_article(0))
+    writer.flush()
+    writer.add(_article(0, content="Contenu modifié", title="Nouveau titre"))
+    writer.flush()
+
+    assert writer.updated == 1
+    assert collection.find_one({'url': _article(0)['url']})['title'] == "Nouveau titre"
+    assert ArticleStore(collection).get_body(_article(0)['url'])['content'] == "Contenu modifié"
+
+
+def test_same_url_in_a_batch_is_written_once(collection, writer, flushed):
+    writer.add(_article(0, title="Première version"))
+    writer.add(_article(0, title="Dernière version"))
+    writer.flush()
+
+    assert writer.inserted == 1
+    assert collection.find_one({'url': _article(0)['url']})['title'] == "Dernière version"
+    assert flushed == [[_article(0)['url']]]
+
+
+def test_duplicate_key_counts_as_written(collection, writer, flushed, monkeypatch):
+    # Upsert concurrent d'un autre processus : l'article est bien en base
+    error = BulkWriteError({'writeErrors': [{'index': 0, 'code': 11000, 'errmsg': 'E11000'}],
+                           'nUpserted': 1, 'nMatched': 0, 'nModified': 0})
+    _fail_bulk_write(monkeypatch, collection, error)
+    writer.add(_article(0))
+    writer.add(_article(1))
+    writer.flush()
+
+    assert writer.duplicates == 1 and writer.errors == 0
+    assert flushed == [[_article(0)['url'], _article(1)['url']]]
+
+
+def test_metadata_write_error_excludes_article(collection, writer, flushed, monkeypatch):
+    error = BulkWriteError({'writeErrors': [{'index': 1, 'code': 2, 'errmsg': 'BadValue'}],
+                           'nUpserted': 1, 'nMatched': 0, 'nModified': 0})
+    _fail_bulk_write(monkeypatch, collection, error)
+    writer.add(_article(0))
+    writer.add(_article(1))
+    writer.flush()
+
+    assert writer.errors == 1 and writer.inserted == 1
+    assert flushed == [[_article(0)['url']]]
+
+
+def test_body_write_error_skips_metadata(collection, writer, flushed, monkeypatch):
+    sent = []
+    bulk_write = collection.bulk_write
+
+    def recording_bulk_write(operations, ordered=True):
+        sent.append(operations)
+        return bulk_write(operations, ordered=ordered)
+
+    monkeypatch.setattr(collection, 'bulk_write', recording_bulk_write)
+    error = BulkWriteError({'writeErrors': [{'index': 0, 'code': 2, 'errmsg': 'BadValue'}]})
+    _fail_bulk_write(monkeypatch, writer.store.bodies, error)
+    writer.add(_article(0))
+    writer.add(_article(1))
+    writer.flush()
+
+    # Le corps de l'article 0 n'est pas écrit : ses métadonnées ne sont pas envoyées
+    assert [operation._filter for operation in sent[0]] == [{'url': _article(1)['url']}]
+    assert writer.errors == 1
+    assert flushed == [[_article(1)['url']]]
+
+
+@pytest.mark.parametrize('target', ['metadata', 'bodies'])
+def test_failed_batch_is_not_confirmed(collection, writer, flushed, monkeypatch, target):
+    _fail_bulk_write(monkeypatch, collection if target == 'metadata' else writer.store.bodies,
+                     AutoReconnect("connexion perdue"))
+    for i in range(3):
+        writer.add(_article(i))
+    writer.flush()
+
+    assert writer.errors == 3
+    assert writer.inserted == 0
+    assert flushed == []
+
+
+def test_batch_is_flushed_by_size_and_interval(collection, flushed):
+    writer = BulkArticleWriter(collection, batch_size=2, flush_interval=float('inf'), on_flush=flushed.append)
+    for i in range(3):
+        writer.add(_article(i))
+    assert flushed == [[_article(0)['url'], _article(1)['url']]]
+    writer.close()
+    assert flushed[-1] == [_article(2)['url']]
+
+    flushed.clear()
+    writer = BulkArticleWriter(collection, batch_size=100, flush_interval=0, on_flush=flushed.append)
+    writer.add(_article(3))
+    assert flushed == [[_article(3)['url']]]
@@ -0,0 +1,153 @@
+import time
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+from config import logger, WRITE_BATCH_SIZE, WRITE_FLUSH_INTERVAL
+from article_store import ArticleStore, split_article, BODY_FIELDS
+from mongo_utils import bump_ingest_generation
+from metrics import metrics
+
+# Code d'erreur MongoDB pour une violation d'index unique
+DUPLICATE_KEY_ERROR = 11000
+
+
+class BulkArticleWriter:
+    """
+    Écriture groupée des articles dans MongoDB.
+
+    Les articles sont mis en tampon puis envoyés en un seul bulk_write non
+    ordonné d'upserts (clé : URL de l'article) dès que le lot atteint
+    `batch_size` articles ou que `flush_interval` secondes se sont écoulées
+    depuis la dernière écriture. Les erreurs sont traitées document par
+    document sans interrompre le reste du lot.
+
+    Le corps des articles (contenu compressé, images, sommaire) est écrit via
+    l'ArticleStore dans sa propre collection, avant les métadonnées : un
+    document de métadonnées ne référence jamais un corps absent.
+
+    `on_flush` est appelé après chaque lot confirmé par MongoDB avec la
+    liste des URLs effectivement écrites (point de reprise de la frontière
+    de crawl par exemple) : les articles d'un lot en échec, ou en erreur
+    individuelle, n'y figurent pas.
+    """
+
+    def __init__(self, collection, batch_size=WRITE_BATCH_SIZE, flush_interval=WRITE_FLUSH_INTERVAL,
+                 on_flush=None):
+        self.collection = collection
+        self.store = ArticleStore(collection)
+        self.on_flush = on_flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = {}  # URL -> article (le dernier reçu l'emporte)
+        self._last_flush = time.monotonic()
+
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.duplicates = 0
+        self.errors = 0
+
+    def add(self, article_data):
+        self._buffer[article_data['url']] = article_data
+        if (len(self._buffer) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def _build_operation(self, metadata):
+        fields = {k: v for k, v in metadata.items() if k not in ('_id', 'scraped_at')}
+        # Le corps est stocké séparément : il est retiré des documents écrits avant la séparation
+        update = {'$set': fields, '$unset': {field: "" for field in BODY_FIELDS}}
+        if 'scraped_at' in metadata:
+            # La date de première récupération n'est écrite qu'à l'insertion :
+            # un article ré-analysé à l'identique reste "inchangé"
+            update['$setOnInsert'] = {'scraped_at': metadata['scraped_at']}
+        return UpdateOne({'url': metadata['url']}, update, upsert=True)
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        with metrics.span('db_write_seconds'):
+            self._write_batch()
+
+    def _write_batch(self):
+        articles = list(self._buffer.values())
+        self._buffer = {}
+        operations = []
+        body_operations = []
+        for article in articles:
+            metadata, body = split_article(article)
+            operations.append(self._build_operation(metadata))
+            body_operations.append(self.store.body_operation(article['url'], body))
+
+        failed = set()  # Index des articles non écrits
+        try:
+            self.store.bodies.bulk_write(body_operations, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get('writeErrors', []):
+                self.errors += 1
+                failed.add(error['index'])
+                logger.error(f"Erreur sauvegarde du corps {articles[error['index']]['url']}: {error.get('errmsg')}")
+        except PyMongoError as e:
+            self.errors += len(operations)
+            logger.error(f"Erreur sauvegarde du lot (corps des articles): {e}")
+            return
+
+        # Les métadonnées d'un article dont le corps n'a pas été écrit ne sont pas envoyées
+        positions = [i for i in range(len(articles)) if i not in failed]
+        details = {}
+        try:
+            if positions:
+                result = self.collection.bulk_write([operations[i] for i in positions], ordered=False)
+                details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            for error in details.get('writeErrors', []):
+                index = positions[error['index']]
+                article = articles[index]
+                if error.get('code') == DUPLICATE_KEY_ERROR:
+                    self.duplicates += 1
+                    logger.info(f"Article déjà existant: {article['title']}")
+                else:
+                    self.errors += 1
+                    failed.add(index)
+                    logger.error(f"Erreur sauvegarde {article['url']}: {error.get('errmsg')}")
+        except PyMongoError as e:
+            # Échec du lot entier (connexion, etc.) : rien n'a été confirmé
+            self.errors += len(positions)
+            logger.error(f"Erreur sauvegarde du lot: {e}")
+            return
+
+        inserted = details.get('nUpserted', 0)
+        updated = details.get('nModified', 0)
+        self.inserted += inserted
+        self.updated += updated
+        self.unchanged += details.get('nMatched', 0) - updated
+        metrics.increment('articles_written_total', inserted + details.get('nMatched', 0))
+        logger.info(f"Écriture groupée: {inserted} nouveaux, {updated} mis à jour sur {len(operations)} articles")
+        if inserted or updated:
+            self._bump_generation()
+        if self.on_flush:
+            # Un doublon d'URL (article déjà en base) compte comme écrit
+            self.on_flush([article['url'] for i, article in enumerate(articles) if i not in failed])
+
+    def _bump_generation(self):
+        try:
+            bump_ingest_generation(self.collection)
+        except PyMongoError as e:
+            # Sans incrément, le cache du front expire simplement à son TTL
+            logger.warning(f"Compteur de génération non mis à jour: {e}")
+
+    def stats(self):
+        return {
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'duplicates': self.duplicates,
+            'errors': self.errors
+        }
+
+    def close(self):
+        """Écrit les articles restants dans le tampon."""
+        self.flush()
+        logger.info(f"Bilan des écritures: {self.stats()}")